@@ -212,6 +212,18 @@ elements.searchButton.addEventListener('click', async () => {
         const taskId = response.task_id;
         console.log('Search task created:', taskId);
         
+        // Cached searches come back complete; no need to poll
+        if (response.status === 'completed' && response.jobs) {
+            appState.searchResults = response.jobs;
+            appState.lastSearchResponse = {
+                jobs: response.jobs,
+                count: response.count
+            };
+            displayJobResults();
+            hideLoading();
+            return;
+        }
+        
         // Start polling for results
         await pollTaskStatus(taskId, query, location);
         
@@ -279,8 +291,8 @@ async function pollTaskStatus(taskId, query, location) {
                 hideLoading();
                 alert(`Search failed: ${taskData.error_message || 'Unknown error'}`);
                 return;
-            } else if (taskData.status === 'processing' || taskData.status === 'pending') {
-                // Still processing - continue polling
+            } else {
+                // Still processing (pending, processing, waiting_external) - continue polling
                 if (attempts < maxAttempts) {
                     setTimeout(poll, interval);
                 } else {
@@ -391,7 +403,8 @@ elements.generateKitButton.addEventListener('click', async () => {
             {
                 job_id: appState.selectedJob.job_id,
                 resume_s3_key: appState.resumeS3Key,
-                user_context: elements.userContext.value
+                user_context: elements.userContext.value,
+                stream: true
             }
         );
         
@@ -402,12 +415,55 @@ elements.generateKitButton.addEventListener('click', async () => {
         // Scroll to kit display
         elements.kitDisplaySection.scrollIntoView({ behavior: 'smooth' });
         
+        if (response.generation_status === 'generating') {
+            pollKitProgress(response.kit_id);
+        }
+        
     } catch (error) {
         hideLoading();
         alert(`Kit generation failed: ${error.message}`);
     }
 });
 
+// Show a streaming kit's paragraphs as they are written
+async function pollKitProgress(kitId) {
+    const interval = 1000;
+    const maxAttempts = 180;
+    let attempts = 0;
+    
+    const poll = async () => {
+        attempts++;
+        try {
+            const data = await apiCall(`${API_CONFIG.ENDPOINTS.GET_KITS}?kit_id=${kitId}&include_body=true`);
+            const kit = data.kits && data.kits[0];
+            if (!kit) {
+                throw new Error('Kit not found');
+            }
+            
+            if (kit.generation_status === 'failed') {
+                alert(`Kit generation failed: ${kit.error_message || 'Unknown error'}`);
+                return;
+            }
+            
+            if (kit.generation_status === 'generating') {
+                displayKit({ ...kit, cover_letter: kit.partial_cover_letter || 'Generating...' });
+            } else {
+                appState.currentKit = kit;
+                displayKit(kit);
+                return;
+            }
+        } catch (error) {
+            console.error('Kit polling error:', error);
+        }
+        
+        if (attempts < maxAttempts) {
+            setTimeout(poll, interval);
+        }
+    };
+    
+    poll();
+}
+
 function displayKit(kit) {
     elements.coverLetterDisplay.value = kit.cover_letter || 'No cover letter generated';
     
@@ -557,13 +613,18 @@ function displayFormFillResult(result) {
     elements.formFillStatus.className = 'status-message success';
     elements.formFillStatus.style.display = 'block';
     
-    // Display screenshot if available
-    if (result.screenshot_url) {
-        console.log('[Form Fill] Screenshot URL:', result.screenshot_url);
+    // Display screenshot if available (prefer the stored thumbnail)
+    const storedScreenshots = result.screenshot_urls || {};
+    const thumbnailUrl = storedScreenshots.thumbnail || storedScreenshots.original;
+    const fullUrl = storedScreenshots.full || storedScreenshots.original || result.screenshot_url;
+    if (thumbnailUrl || result.screenshot_url) {
+        console.log('[Form Fill] Screenshot URL:', thumbnailUrl || result.screenshot_url);
         elements.screenshotContainer.innerHTML = `
             <div class="screenshot">
                 <h4>Form Screenshot</h4>
-                <img src="${result.screenshot_url}" alt="Filled form screenshot" style="max-width: 100%; border-radius: 8px; margin-top: 10px;">
+                <a href="${fullUrl}" target="_blank" rel="noopener">
+                    <img src="${thumbnailUrl || result.screenshot_url}" alt="Filled form screenshot" style="max-width: 100%; border-radius: 8px; margin-top: 10px;">
+                </a>
             </div>
         `;
     } else {
@@ -0,0 +1,110 @@
+"""
+Local stand-in for the Yutori Research API
+
+Accepts research tasks, completes them after a delay and, when the task
+was created with a webhook_url, POSTs the final payload there (more than
+once with --deliveries, to exercise duplicate callbacks). Point the
+backend at it with YUTORI_BASE_URL=http://localhost:8090 and run the API
+locally (e.g. `sam local start-api`) with RESEARCH_CALLBACK_URL set to the
+local /webhooks/research route.
+
+    python scripts/yutori_stub_server.py --port 8090 --delay 3
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+TASKS = {}
+LOCK = threading.Lock()
+
+SAMPLE_RESULT = """1. Senior Software Engineer at TechCorp Inc - San Francisco, CA
+   Salary: $150k - $200k. Posted 2 days ago.
+   Apply: https://example.com/jobs/techcorp-senior-swe
+
+2. Backend Engineer at StartupXYZ - Remote
+   Salary: $120k - $160k. Posted 1 week ago.
+   Apply: https://example.com/jobs/startupxyz-backend
+"""
+
+
+def complete_task(task_id: str, delay: float, deliveries: int = 1) -> None:
+    time.sleep(delay)
+    with LOCK:
+        task = TASKS[task_id]
+        task.update(status='succeeded', result=SAMPLE_RESULT)
+        payload = dict(task)
+
+    webhook_url = payload.pop('webhook_url', None)
+    for _ in range(deliveries if webhook_url else 0):
+        request = urllib.request.Request(
+            webhook_url,
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                print(f"Callback for {task_id} -> {response.status}")
+        except Exception as e:
+            print(f"Callback for {task_id} failed: {e}")
+
+
+def make_handler(delay: float, deliveries: int = 1):
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            if body.get('status') == 'running':
+                self.send_header('Retry-After', '1')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path != '/v1/research/tasks':
+                self._send(404, {'error': 'Not found'})
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            task_id = uuid.uuid4().hex
+            with LOCK:
+                TASKS[task_id] = {
+                    'task_id': task_id,
+                    'status': 'running',
+                    'query': body.get('query'),
+                    'webhook_url': body.get('webhook_url')
+                }
+            threading.Thread(target=complete_task, args=(task_id, delay, deliveries), daemon=True).start()
+            self._send(201, {'task_id': task_id, 'status': 'running'})
+
+        def do_GET(self):
+            prefix = '/v1/research/tasks/'
+            task_id = self.path[len(prefix):] if self.path.startswith(prefix) else None
+            with LOCK:
+                task = dict(TASKS.get(task_id) or {})
+            if not task:
+                self._send(404, {'error': 'Task not found'})
+                return
+            task.pop('webhook_url', None)
+            self._send(200, task)
+
+    return StubHandler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in for the Yutori Research API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--delay', type=float, default=3.0, help='Seconds until tasks complete')
+    parser.add_argument('--deliveries', type=int, default=1, help='Times each webhook callback is sent')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.delay, args.deliveries))
+    print(f"Yutori stub listening on {args.host}:{args.port}")
+    server.serve_forever()
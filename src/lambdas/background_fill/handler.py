@@ -2,11 +2,13 @@
 Background Lambda function to fill forms using TinyFish Web Agent API
 """
 import json
-import os
-import requests
 from typing import Dict, Any
 
 from shared.dynamodb_utils import DynamoDBClient
+from shared.http_session import get_http_session
+from shared.rate_limit import guarded_call
+from shared.screenshot_utils import ingest_screenshot
+from shared.tinyfish import TINYFISH_RUN_URL, build_tinyfish_payload, parse_tinyfish_result, tinyfish_headers
 
 
 def fill_form_with_tinyfish(job_url: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -15,68 +17,22 @@ def fill_form_with_tinyfish(job_url: str, application_data: Dict[str, Any]) -> D
     
     TinyFish API docs: https://docs.mino.ai/
     """
-    api_key = os.environ.get('TINYFISH_API_KEY')
+    headers = tinyfish_headers()
     
-    if not api_key:
-        raise ValueError("TINYFISH_API_KEY not configured")
-    
-    # Mino API endpoint (TinyFish rebranded to Mino)
-    mino_url = "https://mino.ai/v1/automation/run"
-    
-    headers = {
-        "X-API-Key": api_key,
-        "Content-Type": "application/json"
-    }
-    
-    # Create automation goal with instructions
-    goal = f"""
-Navigate to this job application page and fill out the form, then SUBMIT it.
-
-Application URL: {job_url}
-
-Fill in these details:
-- Full Name: {application_data.get('full_name', 'Not provided')}
-- Email: {application_data.get('email', 'Not provided')}
-- Phone: {application_data.get('phone', 'Not provided')}
-
-If there's a cover letter field, paste this:
-{application_data.get('cover_letter', 'Not provided')}
-
-If there's a resume upload field, note that resume URL is: {application_data.get('resume_url', 'Not provided')}
-
-Additional information:
-- LinkedIn: {application_data.get('linkedin', 'Not provided')}
-- Portfolio: {application_data.get('portfolio', 'Not provided')}
-- Years of Experience: {application_data.get('years_experience', 'Not provided')}
-
-Instructions:
-1. Navigate to the application page
-2. Fill in all visible form fields with the appropriate data
-3. Click the "Submit" or "Apply" button to submit the application
-4. Wait for confirmation that the application was submitted
-5. Return a JSON object with all fields you filled in the format: {{"field_name": "value_filled", "submitted": true}}
-"""
-
-    payload = {
-        "url": job_url,
-        "goal": goal,
-        "browserProfile": "stealth",  # Use stealth mode to avoid bot detection
-        "responseFormat": "json"
-    }
-    
-    response = requests.post(mino_url, headers=headers, json=payload, timeout=320)
-    response.raise_for_status()
+    def send():
+        response = get_http_session().post(
+            TINYFISH_RUN_URL,
+            headers=headers,
+            json=build_tinyfish_payload(job_url, application_data),
+            timeout=320
+        )
+        response.raise_for_status()
+        return response
     
-    result = response.json()
+    # Shared TinyFish quota and circuit breaker
+    response = guarded_call('tinyfish', headers['X-API-Key'], send)
     
-    return {
-        'session_id': result.get('sessionId'),
-        'status': result.get('status'),
-        'screenshot_url': result.get('screenshotUrl'),
-        'filled_fields': result.get('resultJson', {}),
-        'logs': result.get('logs', []),
-        'message': 'Form filled and submitted successfully'
-    }
+    return parse_tinyfish_result(response.json())
 
 
 def lambda_handler(event, context):
@@ -98,6 +54,14 @@ def lambda_handler(event, context):
         # Fill form using TinyFish
         result = fill_form_with_tinyfish(application_url, application_data)
         
+        # Persist the screenshot to S3 with thumbnail; the remote URL is a fallback
+        screenshots = {}
+        if result.get('screenshot_url'):
+            try:
+                screenshots = ingest_screenshot(result['screenshot_url'], task_id, 'final')
+            except Exception as screenshot_error:
+                print(f"Screenshot ingestion failed for task {task_id}: {screenshot_error}")
+        
         # Update task with success
         dynamodb.update_task_status(
             task_id=task_id,
@@ -106,11 +70,13 @@ def lambda_handler(event, context):
             result={
                 'session_id': result.get('session_id'),
                 'screenshot_url': result.get('screenshot_url'),
+                'screenshots': screenshots,
                 'message': result.get('message'),
                 'job_title': job_title,
                 'company': company,
                 'application_url': application_url
-            }
+            },
+            screenshot_s3_keys=list(screenshots.values())
         )
         
         return {'statusCode': 200, 'body': json.dumps(result)}
@@ -0,0 +1,88 @@
+"""
+Background Lambda function to stream one application kit
+"""
+import json
+import time
+
+from shared.dynamodb_utils import DynamoDBClient
+from shared.kit_generation import build_kit, stream_kit_content
+from shared.resume_text import extract_resume_text
+from shared.s3_utils import create_storage_client
+
+
+# Minimum seconds between partial writes; the first paragraph is written at once
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+def lambda_handler(event, context):
+    """
+    Generate a kit, persisting paragraphs and bullets as they are produced
+    
+    The kit record created by generate_kit starts as
+    generation_status "generating"; partial_cover_letter and
+    resume_bullets are updated while Yutori streams, so GET /kits shows
+    the letter filling in. The finished kit replaces the record.
+    
+    Event:
+    {
+        "kit_id": "...",
+        "job_id": "job_123",
+        "resume_s3_key": "resumes/demo_user/resume.pdf",
+        "user_context": "..."
+    }
+    """
+    kit_id = event.get('kit_id')
+    job_id = event.get('job_id')
+    resume_s3_key = event.get('resume_s3_key')
+    user_context = event.get('user_context', '')
+    
+    dynamodb = DynamoDBClient()
+    
+    try:
+        job = dynamodb.get_job(job_id)
+        if not job:
+            raise ValueError(f"Job {job_id} not found")
+        
+        storage = create_storage_client()
+        resume_text = extract_resume_text(storage.get_resume(resume_s3_key))
+        
+        paragraphs, bullets = [], []
+        last_flush = 0.0
+        for chunk in stream_kit_content(job, resume_text, user_context):
+            if chunk['type'] == 'paragraph':
+                paragraphs.append(chunk['text'])
+            else:
+                bullets.append(chunk['text'])
+            
+            if time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS:
+                dynamodb.update_kit_fields(
+                    kit_id,
+                    partial_cover_letter='\n\n'.join(paragraphs),
+                    resume_bullets=bullets
+                )
+                last_flush = time.monotonic()
+        
+        if not paragraphs:
+            raise ValueError('Generation returned no cover letter')
+        
+        content = {'cover_letter': '\n\n'.join(paragraphs), 'resume_bullets': bullets}
+        kit = build_kit(kit_id, job_id, content, storage, metadata={'streamed': True})
+        
+        # Replaces the in-progress record, dropping the partial fields
+        dynamodb.create_kit(kit.to_dynamodb())
+        
+        print(f"Streamed kit {kit_id}: {len(paragraphs)} paragraphs, {len(bullets)} bullets")
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'kit_id': kit_id, 'generation_status': 'complete'})
+        }
+    
+    except Exception as e:
+        print(f"Error in background_kit: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        
+        dynamodb.update_kit_fields(kit_id, generation_status='failed', error_message=str(e))
+        
+        return {'statusCode': 500, 'body': json.dumps({'error': str(e)})}
@@ -0,0 +1,91 @@
+"""
+Plain-text extraction from uploaded resumes
+"""
+import re
+import zlib
+from typing import List
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf is optional; without it a basic stream scan is used
+    PdfReader = None
+
+
+MAX_RESUME_CHARS = 20000
+
+STREAM_PATTERN = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+TEXT_OPERATOR = re.compile(rb'\((?:\\.|[^\\)])*\)\s*T[jJ\']|\[(?:[^\]]*)\]\s*TJ|T\*|ET')
+STRING_LITERAL = re.compile(rb'\(((?:\\.|[^\\)])*)\)')
+ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'', b'f': b'', b'(': b'(', b')': b')', b'\\': b'\\'}
+
+
+def _unescape(literal: bytes) -> bytes:
+    return re.sub(rb'\\([nrtbf()\\]|[0-7]{1,3})',
+                  lambda m: ESCAPES.get(m.group(1)) or bytes([int(m.group(1), 8) & 0xFF]),
+                  literal)
+
+
+def _scan_pdf_text(data: bytes) -> str:
+    """Pull string operands of text operators out of (Flate) content streams"""
+    lines: List[str] = []
+    for match in STREAM_PATTERN.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+
+        current = []
+        for op in TEXT_OPERATOR.finditer(stream):
+            token = op.group(0)
+            if token in (b'T*', b'ET'):
+                if current:
+                    lines.append(''.join(current))
+                    current = []
+                continue
+            for literal in STRING_LITERAL.findall(token):
+                current.append(_unescape(literal).decode('latin-1'))
+        if current:
+            lines.append(''.join(current))
+    return '\n'.join(line.strip() for line in lines if line.strip())
+
+
+def extract_resume_text(data: bytes) -> str:
+    """
+    Best-effort text of a resume file (PDF or plain text)
+
+    Uses pypdf when installed; otherwise scans the PDF's content streams,
+    which covers most single-font generated resumes. Output is capped at
+    MAX_RESUME_CHARS.
+    """
+    if not data.startswith(b'%PDF'):
+        return data.decode('utf-8', errors='replace')[:MAX_RESUME_CHARS]
+
+    text = ''
+    if PdfReader is not None:
+        import io
+        try:
+            reader = PdfReader(io.BytesIO(data))
+            text = '\n'.join(page.extract_text() or '' for page in reader.pages)
+        except Exception as e:
+            print(f"pypdf failed, falling back to stream scan: {str(e)}")
+
+    if not text.strip():
+        text = _scan_pdf_text(data)
+    return text[:MAX_RESUME_CHARS]
+
+
+def load_resume_text(storage, resume_hash: str, resume_bytes: bytes) -> str:
+    """
+    The stored text of a resume, extracted and saved on first use
+
+    Args:
+        storage: S3Client (or another storage backend)
+        resume_hash: Content hash of the resume file (see resume_content_hash)
+        resume_bytes: The resume file, parsed only if no text is stored
+    """
+    text = storage.get_resume_text(resume_hash)
+    if text is None:
+        text = extract_resume_text(resume_bytes)
+        storage.put_resume_text(resume_hash, text)
+    return text
@@ -0,0 +1,157 @@
+"""
+Background Lambda function to generate application kits for many jobs
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from shared.bullet_bank import load_bullet_bank
+from shared.dynamodb_utils import DynamoDBClient
+from shared.kit_generation import (
+    apply_bullet_bank, build_kit, content_kit_id, generate_kit_content, kit_backend,
+    kit_is_complete, resume_content_hash
+)
+from shared.kit_templates import render_kits
+from shared.resume_text import extract_resume_text
+from shared.s3_utils import create_storage_client
+from shared.yutori_client import YutoriClient
+
+
+CONCURRENCY = int(os.environ.get('KIT_BATCH_CONCURRENCY', 8))
+WRITE_BATCH_SIZE = 25  # DynamoDB BatchWriteItem limit
+
+
+def lambda_handler(event, context):
+    """
+    Generate kits for a batch of jobs and record the outcome on the task
+    
+    The jobs are resolved with one BatchGetItem pass and the resume is read
+    and parsed once. Jobs whose content-keyed kit already exists and is
+    complete are returned without regenerating. The rest are generated concurrently
+    (bounded by KIT_BATCH_CONCURRENCY and the shared Yutori rate limit)
+    and written in batches as they complete. With the template (mock)
+    backend every kit is rendered up front in one pass; with Yutori, a job
+    whose generation fails gets a template kit instead ("fallback": true).
+    
+    Event:
+    {
+        "task_id": "...",
+        "job_ids": ["job_123", ...],
+        "resume_s3_key": "resumes/demo_user/resume.pdf",
+        "user_context": "..."
+    }
+    """
+    task_id = event.get('task_id')
+    job_ids = event.get('job_ids', [])
+    resume_s3_key = event.get('resume_s3_key')
+    user_context = event.get('user_context', '')
+    
+    dynamodb = DynamoDBClient()
+    
+    try:
+        dynamodb.update_task_status(task_id, 'processing')
+        
+        jobs = dynamodb.get_jobs_batch(job_ids)
+        failed = [{'job_id': job_id, 'error': 'Job not found'} for job_id in job_ids if job_id not in jobs]
+        
+        storage = create_storage_client()
+        resume_bytes = storage.get_resume(resume_s3_key)
+        resume_text = extract_resume_text(resume_bytes)
+        resume_hash = resume_content_hash(resume_bytes)
+        yutori = YutoriClient()
+        
+        # Finished kits from identical inputs are reused as is; failed or
+        # in-progress streaming kits under the same ID are regenerated
+        kit_ids = {job_id: content_kit_id(job, resume_hash, user_context) for job_id, job in jobs.items()}
+        existing = {
+            kit_id: kit for kit_id, kit in dynamodb.get_kits_batch(list(kit_ids.values())).items()
+            if kit_is_complete(kit)
+        }
+        kits = [
+            {
+                'job_id': job_id,
+                'kit_id': kit_id,
+                'cover_letter_s3_key': existing[kit_id].get('cover_letter_s3_key', ''),
+                'cached': True
+            }
+            for job_id, kit_id in kit_ids.items() if kit_id in existing
+        ]
+        
+        todo = [jobs[job_id] for job_id in job_ids if job_id in jobs and kit_ids[job_id] not in existing]
+        backend = kit_backend()
+        bullet_bank = load_bullet_bank(storage, resume_hash, resume_bytes)
+        rendered = {}
+        if backend == 'mock':
+            contents = apply_bullet_bank(render_kits((job, user_context) for job in todo), todo, bullet_bank)
+            rendered = dict(zip((job['job_id'] for job in todo), contents))
+        
+        def generate(job):
+            job_id = job['job_id']
+            if job_id in rendered:
+                return build_kit(kit_ids[job_id], job_id, rendered[job_id], storage,
+                                 metadata={'batch_task_id': task_id, 'fallback': False}), False
+            try:
+                content = generate_kit_content(job, resume_text, user_context, yutori, backend)
+                kit_id, fallback = kit_ids[job_id], False
+            except Exception as e:
+                print(f"Generation failed for job {job_id}, using template: {str(e)}")
+                content = generate_kit_content(job, resume_text, user_context,
+                                               backend='mock', bullet_bank=bullet_bank)
+                kit_id, fallback = content_kit_id(job, resume_hash, user_context, backend='mock'), True
+            return build_kit(kit_id, job_id, content, storage,
+                             metadata={'batch_task_id': task_id, 'fallback': fallback}), fallback
+        
+        pending_writes = []
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            futures = {executor.submit(generate, job): job['job_id'] for job in todo}
+            
+            for future in as_completed(futures):
+                job_id = futures[future]
+                try:
+                    kit, fallback = future.result()
+                except Exception as e:
+                    print(f"Kit generation failed for job {job_id}: {str(e)}")
+                    failed.append({'job_id': job_id, 'error': str(e)})
+                    continue
+                
+                kits.append({
+                    'job_id': job_id,
+                    'kit_id': kit.kit_id,
+                    'cover_letter_s3_key': kit.cover_letter_s3_key,
+                    'cached': False,
+                    'fallback': fallback
+                })
+                pending_writes.append(kit.to_dynamodb())
+                if len(pending_writes) >= WRITE_BATCH_SIZE:
+                    dynamodb.create_kits(pending_writes)
+                    pending_writes = []
+        
+        if pending_writes:
+            dynamodb.create_kits(pending_writes)
+        
+        print(f"Kit batch {task_id}: {len(kits)} generated, {len(failed)} failed")
+        
+        dynamodb.update_task_status(
+            task_id,
+            'completed' if kits else 'failed',
+            error_message=None if kits else 'No kits could be generated',
+            result={
+                'kits': kits,
+                'failed': failed,
+                'count': len(kits)
+            }
+        )
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'task_id': task_id, 'generated': len(kits), 'failed': len(failed)})
+        }
+    
+    except Exception as e:
+        print(f"Error in background_kit_batch: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        
+        dynamodb.update_task_status(task_id, 'failed', error_message=str(e))
+        
+        return {'statusCode': 500, 'body': json.dumps({'error': str(e)})}
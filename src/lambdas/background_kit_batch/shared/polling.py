@@ -0,0 +1,128 @@
+"""
+Adaptive polling strategy for long-running external tasks
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+class PollingStrategy:
+    """
+    Decide how long to wait between status checks
+
+    Starts with a few quick checks so fast tasks are picked up within about
+    a second of completing, then backs off exponentially with jitter. Server
+    hints (Retry-After or an ETA in the status body) override the computed
+    delay but never go below fast_interval, and every wait is clipped to
+    the deadline.
+    """
+
+    def __init__(self, initial_delay: float = 0.5, fast_checks: int = 4,
+                 fast_interval: float = 1.0, multiplier: float = 1.6,
+                 max_delay: float = 30.0, jitter: float = 0.2,
+                 timeout: Optional[float] = 300.0,
+                 deadline: Optional[float] = None):
+        """
+        Args:
+            initial_delay: Wait before the first check (seconds)
+            fast_checks: Number of checks at fast_interval before backing off
+            fast_interval: Interval for the quick initial checks
+            multiplier: Exponential backoff factor after the fast phase
+            max_delay: Upper bound on any single wait
+            jitter: Fractional +/- randomisation applied to computed delays
+            timeout: Seconds from now to give up (ignored if deadline is set)
+            deadline: Absolute time.monotonic() value to give up at
+        """
+        self.initial_delay = initial_delay
+        self.fast_checks = fast_checks
+        self.fast_interval = fast_interval
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+        if deadline is None and timeout is not None:
+            deadline = time.monotonic() + timeout
+        self.deadline = deadline
+        self.attempts = 0
+
+    @classmethod
+    def from_lambda_context(cls, context, safety_margin: float = 30.0,
+                            **kwargs) -> 'PollingStrategy':
+        """Use the invoking Lambda's remaining time, minus a safety margin"""
+        remaining = context.get_remaining_time_in_millis() / 1000.0 - safety_margin
+        return cls(deadline=time.monotonic() + max(remaining, 0.0), **kwargs)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (inf if none)"""
+        if self.deadline is None:
+            return float('inf')
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def next_delay(self, hint: Optional[float] = None) -> float:
+        """Compute the next wait, preferring a server hint when given"""
+        if hint is not None and hint >= 0:
+            # A hint of 0 (an ETA that has run out, a past Retry-After date)
+            # must not turn polling into a tight loop
+            delay = min(max(hint, self.fast_interval), self.max_delay)
+        elif self.attempts == 0:
+            delay = self.initial_delay
+        elif self.attempts <= self.fast_checks:
+            delay = self.fast_interval
+        else:
+            backoff = self.fast_interval * self.multiplier ** (self.attempts - self.fast_checks)
+            backoff *= random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay = min(backoff, self.max_delay)
+
+        self.attempts += 1
+        return min(delay, self.remaining())
+
+    def wait(self, hint: Optional[float] = None) -> bool:
+        """
+        Sleep until the next check
+
+        The last wait is clipped to the deadline and still followed by a
+        check, so a task finishing right at the deadline is not missed.
+
+        Returns:
+            False if the deadline had already passed and polling should stop
+        """
+        if self.expired():
+            return False
+        time.sleep(self.next_delay(hint))
+        return True
+
+    async def wait_async(self, hint: Optional[float] = None) -> bool:
+        """Non-blocking wait() for asyncio callers"""
+        if self.expired():
+            return False
+        await asyncio.sleep(self.next_delay(hint))
+        return True
+
+
+def server_hint(headers: Dict[str, str], body: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """
+    Extract a suggested wait (seconds) from a status response
+
+    Honours a Retry-After header (delta-seconds or HTTP date) and ETA fields
+    in the body ('retry_after', 'eta_seconds' or 'estimated_seconds_remaining').
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+    for field in ('retry_after', 'eta_seconds', 'estimated_seconds_remaining'):
+        value = (body or {}).get(field)
+        if isinstance(value, (int, float)) and value >= 0:
+            return float(value)
+
+    return None
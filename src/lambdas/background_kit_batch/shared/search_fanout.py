@@ -0,0 +1,181 @@
+"""
+Fan-out planning and merging for broad job searches
+"""
+import math
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional
+
+
+DEFAULT_CONCURRENCY = 4
+# Results one research task is asked for; the default search (20) is one task
+DEFAULT_PAGE_SIZE = 20
+MAX_SUB_QUERIES = 8
+
+# Extra results requested per sub-query to make up for cross-query duplicates
+OVERFETCH = 2
+
+# Alternative titles searched when one query cannot cover max_results
+TITLE_SYNONYMS = {
+    'software engineer': ['software developer', 'backend engineer', 'full stack engineer'],
+    'software developer': ['software engineer', 'application developer'],
+    'frontend engineer': ['front end developer', 'ui engineer'],
+    'backend engineer': ['backend developer', 'server engineer'],
+    'data scientist': ['machine learning scientist', 'data analyst'],
+    'data engineer': ['analytics engineer', 'etl developer'],
+    'machine learning engineer': ['ml engineer', 'ai engineer'],
+    'product manager': ['product owner', 'technical product manager'],
+    'devops engineer': ['site reliability engineer', 'platform engineer'],
+    'designer': ['product designer', 'ux designer'],
+}
+
+SENIORITY_LEVELS = ['senior', 'mid-level', 'junior']
+SENIORITY_TERMS = re.compile(
+    r'\b(senior|sr|junior|jr|mid|mid-level|lead|staff|principal|entry|intern|head)\b'
+)
+
+# Separators for a list of locations; commas are part of "City, ST"
+LOCATION_SEPARATORS = re.compile(r'\s*(?:;|\||/|\bor\b)\s*', re.IGNORECASE)
+
+
+def split_locations(location: Optional[str]) -> List[Optional[str]]:
+    """Split "Seattle, WA; Remote" style input into individual locations"""
+    locations = [part for part in LOCATION_SEPARATORS.split(location or '') if part.strip(' ,')]
+    return locations or [location or None]
+
+
+def title_variants(query: str) -> List[str]:
+    """The query followed by known synonyms for its job title"""
+    normalized = ' '.join(query.lower().split())
+    variants = [query]
+    for title, synonyms in TITLE_SYNONYMS.items():
+        if title in normalized:
+            variants.extend(normalized.replace(title, synonym) for synonym in synonyms)
+            break
+    return variants
+
+
+def plan_search(query: str, location: Optional[str] = None, max_results: int = 20,
+                page_size: Optional[int] = None,
+                max_sub_queries: int = MAX_SUB_QUERIES) -> List[Dict[str, Any]]:
+    """
+    Split a search into independent sub-queries
+
+    Every listed location gets at least one sub-query. Further sub-queries
+    (only when max_results exceeds what one query returns) vary the title
+    by synonym and then by seniority, spread round-robin across locations.
+
+    Returns:
+        List of {'query', 'location', 'max_results'} dicts; a single entry
+        means the search does not need fanning out
+    """
+    page_size = page_size or int(os.environ.get('SEARCH_FANOUT_PAGE_SIZE', DEFAULT_PAGE_SIZE))
+    locations = split_locations(location)
+    wanted = min(max(math.ceil(max_results / page_size), len(locations)), max_sub_queries)
+
+    titles = title_variants(query)
+    if SENIORITY_TERMS.search(query.lower()):
+        variants = titles
+    else:
+        variants = titles + [f"{level} {title}" for level in SENIORITY_LEVELS for title in titles]
+
+    plan = []
+    for variant in variants:
+        for loc in locations:
+            if len(plan) >= wanted:
+                break
+            plan.append({'query': variant, 'location': loc})
+
+    per_query = math.ceil(max_results / len(plan)) + (OVERFETCH if len(plan) > 1 else 0)
+    for sub_query in plan:
+        sub_query['max_results'] = min(per_query, max_results)
+    return plan
+
+
+def dedupe_key(job: Dict[str, Any]) -> str:
+    """Identity of a posting across sub-queries: its URL, else title and company"""
+    url = (job.get('url') or '').split('?')[0].rstrip('/').lower()
+    if url and 'example.com' not in url:
+        return url
+    title = ' '.join((job.get('title') or '').lower().split())
+    company = ' '.join((job.get('company') or '').lower().split())
+    return f"{title}|{company}"
+
+
+def merge_jobs(batches: Iterable[Iterable[Dict[str, Any]]],
+               limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield unique jobs from batches in arrival order, stopping at limit"""
+    seen = set()
+    for batch in batches:
+        for job in batch:
+            key = dedupe_key(job)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield job
+            if limit is not None and len(seen) >= limit:
+                return
+
+
+def run_concurrently(plan: List[Dict[str, Any]],
+                     worker: Callable[[Dict[str, Any]], List[Dict[str, Any]]],
+                     concurrency: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Run worker over each sub-query and yield result batches as they finish
+
+    A sub-query that fails is logged and skipped; if every one fails the
+    last error is raised. Closing the generator early cancels sub-queries
+    that have not started.
+    """
+    concurrency = concurrency or int(os.environ.get('SEARCH_FANOUT_CONCURRENCY', DEFAULT_CONCURRENCY))
+    executor = ThreadPoolExecutor(max_workers=min(concurrency, len(plan)))
+    pending = {executor.submit(worker, sub_query): sub_query for sub_query in plan}
+    succeeded = 0
+    last_error = None
+
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                sub_query = pending.pop(future)
+                try:
+                    batch = future.result()
+                except Exception as e:
+                    print(f"Sub-query {sub_query['query']!r} in {sub_query['location']} failed: {str(e)}")
+                    last_error = e
+                    continue
+                succeeded += 1
+                yield batch
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    if not succeeded and last_error is not None:
+        raise last_error
+
+
+def fan_out_search(search: Callable[[Dict[str, Any]], List[Dict[str, Any]]],
+                   query: str, location: Optional[str] = None, max_results: int = 20,
+                   concurrency: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Plan, run and merge a broad search
+
+    Args:
+        search: Runs one sub-query dict and returns its jobs
+        query: Job search query
+        location: Location, or several separated by ';', '|', '/' or 'or'
+        max_results: Maximum number of unique jobs to yield
+        concurrency: Maximum sub-queries in flight
+
+    Yields:
+        Unique jobs as soon as the sub-query that found them completes
+    """
+    plan = plan_search(query, location, max_results)
+    print(f"Fanning out search for {query!r} into {len(plan)} sub-queries")
+    batches = run_concurrently(plan, search, concurrency)
+    try:
+        yield from merge_jobs(batches, limit=max_results)
+    finally:
+        batches.close()
@@ -0,0 +1,40 @@
+"""
+Signed callback URLs for external task completion webhooks
+"""
+import hashlib
+import hmac
+import os
+from typing import Optional
+from urllib.parse import quote
+
+
+def _secret() -> bytes:
+    secret = os.environ.get('WEBHOOK_SECRET')
+    if not secret:
+        raise ValueError("WEBHOOK_SECRET not configured")
+    return secret.encode('utf-8')
+
+
+def callback_token(task_id: str) -> str:
+    """HMAC token binding a callback to one of our task IDs"""
+    return hmac.new(_secret(), task_id.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def research_callback_url(task_id: str) -> Optional[str]:
+    """
+    Callback URL for a research task, or None when webhook mode is off
+
+    Webhook mode is enabled by setting RESEARCH_CALLBACK_URL to the public
+    base URL of the research webhook route.
+    """
+    base_url = os.environ.get('RESEARCH_CALLBACK_URL')
+    if not base_url:
+        return None
+    return f"{base_url.rstrip('/')}/{quote(task_id)}?token={callback_token(task_id)}"
+
+
+def verify_callback_token(task_id: str, token: Optional[str]) -> bool:
+    """Check a callback's token in constant time"""
+    if not task_id or not token:
+        return False
+    return hmac.compare_digest(callback_token(task_id), token)
@@ -2,18 +2,34 @@
 Background Lambda function to perform Yutori job search asynchronously
 """
 import json
-import hashlib
-from datetime import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-from shared.yutori_client import YutoriClient
+from shared.yutori_client import YutoriClient, ResearchTaskTimeout
 from shared.dynamodb_utils import DynamoDBClient
-from shared.models import Job, JobStatus
+from shared.polling import PollingStrategy
+from shared.s3_utils import create_storage_client
+from shared.search_fanout import merge_jobs, plan_search, run_concurrently
+from shared.search_results import complete_search_task, fail_search_task
+from shared.webhooks import research_callback_url
+
+
+# Fallback poll for webhook-mode tasks whose callback never arrives
+WEBHOOK_FALLBACK_POLL_SECONDS = 600
+
+# Pipeline checkpoints recorded on the task as checkpoint_stage
+STAGE_RESEARCH_CREATED = 'research_created'
+STAGE_RESULT_STORED = 'result_stored'
 
 
 def lambda_handler(event, context):
     """
     Execute Yutori job search and update task status
     
+    Safe to re-invoke: the Yutori task ID and the raw research result are
+    checkpointed on the task record, so a retry after a timeout or crash
+    resumes polling or parsing instead of starting a new research task.
+    
     Event:
     {
         "task_id": "...",
@@ -28,90 +44,45 @@ def lambda_handler(event, context):
         location = event.get('location', '')
         max_results = event.get('max_results', 20)
         
-        print(f"Starting background search for task {task_id}: {query}")
-        
         # Initialize clients
         dynamodb = DynamoDBClient()
-        yutori = YutoriClient()
+        task = dynamodb.get_task(task_id) or {'task_id': task_id}
+        
+        if task.get('status') in ('completed', 'failed'):
+            print(f"Task {task_id} already {task['status']}; nothing to do")
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'task_id': task_id, 'status': task['status']})
+            }
+        
+        if task.get('checkpoint_stage'):
+            print(f"Resuming task {task_id} from checkpoint {task['checkpoint_stage']}")
+        else:
+            print(f"Starting background search for task {task_id}: {query}")
         
         # Update task status to processing
         dynamodb.update_task_status(task_id, 'processing')
         
         try:
-            # Call Yutori Research API (this can take 10+ minutes)
-            # For now, use mock data but structure is ready for real API
-            print(f"Calling Yutori API for: {query} in {location}")
-            
-            # Real Yutori call (uncomment when ready):
-            # yutori_jobs = yutori.search_jobs(query, location, max_results)
-            
-            # Mock data for testing (remove when Yutori is ready)
-            mock_jobs_data = [
-                {
-                    'title': f'{query.title()} - Senior',
-                    'company': 'TechCorp Inc',
-                    'location': location or 'San Francisco, CA',
-                    'description': f'We are looking for an experienced {query} to join our team. Must have 5+ years of experience.',
-                    'url': 'https://example.com/job/1',
-                    'posted_date': '2 days ago',
-                    'salary_range': '$120k - $180k'
-                },
-                {
-                    'title': f'{query.title()} - Mid Level',
-                    'company': 'StartupXYZ',
-                    'location': location or 'San Francisco, CA',
-                    'description': f'Join our growing team as a {query}. Work on cutting-edge technology.',
-                    'url': 'https://example.com/job/2',
-                    'posted_date': '1 week ago',
-                    'salary_range': '$100k - $150k'
-                },
-                {
-                    'title': f'{query.title()}',
-                    'company': 'BigTech Co',
-                    'location': location or 'Remote',
-                    'description': f'Remote {query} position with competitive salary and benefits.',
-                    'url': 'https://example.com/job/3',
-                    'posted_date': '3 days ago',
-                    'salary_range': '$130k - $200k'
-                }
-            ]
-            
-            # Save jobs to DynamoDB
-            jobs = []
-            for job_data in mock_jobs_data[:max_results]:
-                job = Job(
-                    job_id=hashlib.sha256(f"{job_data['title']}_{job_data['company']}".encode()).hexdigest()[:16],
-                    title=job_data['title'],
-                    company=job_data['company'],
-                    location=job_data['location'],
-                    description=job_data['description'],
-                    url=job_data['url'],
-                    source='yutori_research',  # Will be real source when Yutori integrated
-                    status=JobStatus.FOUND
+            if os.environ.get('SEARCH_BACKEND', 'yutori') == 'mock':
+                # Canned results for local testing without a Yutori key
+                jobs = complete_search_task(
+                    dynamodb, task_id, mock_jobs_data(query, location), max_results,
+                    query=query, location=location
+                )
+            else:
+                jobs = run_research_pipeline(
+                    dynamodb, YutoriClient(), task, query, location, max_results, context
                 )
-                
-                # Save job to DynamoDB
-                dynamodb.create_job(job.to_dynamodb())
-                
-                # Add to results
-                job_dict = job.dict()
-                job_dict['posted_date'] = job_data.get('posted_date')
-                job_dict['salary_range'] = job_data.get('salary_range')
-                jobs.append(job_dict)
-            
-            # Update task with results
-            result_data = {
-                'jobs': jobs,
-                'count': len(jobs)
-            }
-            
-            dynamodb.update_task_status(
-                task_id,
-                'completed',
-                result=result_data
-            )
             
-            print(f"Task {task_id} completed with {len(jobs)} jobs")
+            if jobs is None:
+                return {
+                    'statusCode': 202,
+                    'body': json.dumps({
+                        'task_id': task_id,
+                        'status': 'waiting_external'
+                    })
+                }
             
             return {
                 'statusCode': 200,
@@ -121,16 +92,19 @@ def lambda_handler(event, context):
                     'jobs_found': len(jobs)
                 })
             }
-            
+        
         except Exception as search_error:
             # Update task with error
             error_message = str(search_error)
             print(f"Search failed for task {task_id}: {error_message}")
             
-            dynamodb.update_task_status(
+            fail_search_task(
+                dynamodb,
                 task_id,
-                'failed',
-                error_message=error_message
+                error_message,
+                query=query,
+                location=location,
+                max_results=max_results
             )
             
             return {
@@ -159,3 +133,211 @@ def lambda_handler(event, context):
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
         }
+
+
+def run_research_pipeline(dynamodb, yutori, task, query, location, max_results, context):
+    """
+    Run the Yutori search from the task's last checkpoint
+    
+    Stages: create research task -> wait for result (stored in S3) ->
+    parse and persist jobs. Job IDs are content-derived, so repeating the
+    last stage after a crash is harmless.
+    
+    Broad searches in inline mode fan out into concurrent sub-queries; their
+    research task IDs and then their merged jobs are checkpointed. Webhook
+    and poller modes track a single research task.
+    
+    Returns:
+        Saved jobs, or None if completion was handed to the webhook/poller
+    """
+    task_id = task['task_id']
+    stage = task.get('checkpoint_stage')
+    external_task_id = task.get('external_task_id')
+    
+    callback_url = research_callback_url(task_id)
+    mode = os.environ.get('RESEARCH_COMPLETION_MODE') or ('webhook' if callback_url else 'inline')
+    
+    storage = create_storage_client()
+    if stage == STAGE_RESULT_STORED:
+        status_data = json.loads(storage.get_object_cached(task['research_result_s3_key']))
+        if 'jobs' in status_data:
+            # Merged fan-out result
+            return complete_search_task(
+                dynamodb, task_id, status_data['jobs'], max_results, query=query, location=location
+            )
+    elif task.get('sub_tasks') or (
+        mode == 'inline' and not external_task_id and len(plan_search(query, location, max_results)) > 1
+    ):
+        return run_fan_out(dynamodb, yutori, storage, task, query, location, max_results, context)
+    
+    # Stage 1: create the research task exactly once
+    if not external_task_id:
+        print(f"Calling Yutori API for: {query} in {location}")
+        external_task_id = yutori.create_research_task(
+            query, location, max_results,
+            callback_url=callback_url if mode == 'webhook' else None
+        )
+        dynamodb.update_task_fields(
+            task_id,
+            external_task_id=external_task_id,
+            checkpoint_stage=STAGE_RESEARCH_CREATED
+        )
+        stage = STAGE_RESEARCH_CREATED
+    
+    # Webhook / poller modes: exit now; research_webhook or task_poller
+    # persists the jobs later. In webhook mode the poller is only a safety
+    # net for lost callbacks.
+    if mode in ('webhook', 'poller') and stage == STAGE_RESEARCH_CREATED:
+        hand_off_to_poller(
+            dynamodb, task_id, external_task_id,
+            poll_after=WEBHOOK_FALLBACK_POLL_SECONDS if mode == 'webhook' else 0
+        )
+        print(f"Task {task_id} waiting for Yutori task {external_task_id} ({mode})")
+        return None
+    
+    # Stage 2: wait for the result and checkpoint it
+    if stage != STAGE_RESULT_STORED:
+        polling = PollingStrategy.from_lambda_context(context) if context else PollingStrategy()
+        try:
+            status_data = yutori.wait_for_research_task(external_task_id, polling)
+        except ResearchTaskTimeout:
+            # Out of Lambda time; let the central poller finish this task
+            hand_off_to_poller(dynamodb, task_id, external_task_id)
+            print(f"Task {task_id} handed to poller at Lambda deadline")
+            return None
+        
+        result_key = storage.upload_json_artifact(status_data, 'research_results', task_id)
+        dynamodb.update_task_fields(
+            task_id,
+            research_result_s3_key=result_key,
+            checkpoint_stage=STAGE_RESULT_STORED
+        )
+    
+    # Stage 3: parse and persist
+    jobs_data = yutori.parse_research_result(status_data, query, location)
+    return complete_search_task(
+        dynamodb, task_id, jobs_data, max_results, query=query, location=location
+    )
+
+
+def run_fan_out(dynamodb, yutori, storage, task, query, location, max_results, context):
+    """
+    Run a broad search as concurrent sub-queries and checkpoint the merged jobs
+    
+    Every sub-query's research task is created up front and the IDs are
+    checkpointed on the task (sub_tasks), so a retry after a timeout or
+    crash waits on the same research tasks instead of starting new ones.
+    Sub-queries that fail or are still running at the deadline are
+    skipped, so the search completes with partial results as long as one
+    of them succeeds.
+    """
+    task_id = task['task_id']
+    sub_tasks = task.get('sub_tasks')
+    if not sub_tasks:
+        sub_tasks = create_sub_tasks(yutori, plan_search(query, location, max_results))
+        dynamodb.update_task_fields(
+            task_id,
+            sub_tasks=sub_tasks,
+            checkpoint_stage=STAGE_RESEARCH_CREATED
+        )
+    
+    print(f"Waiting on {len(sub_tasks)} sub-query research tasks for task {task_id}")
+    deadline = (PollingStrategy.from_lambda_context(context) if context else PollingStrategy()).deadline
+    
+    def wait_for_sub_task(sub_task):
+        # Each sub-query backs off independently within the shared deadline
+        status_data = yutori.wait_for_research_task(
+            sub_task['external_task_id'], PollingStrategy(deadline=deadline)
+        )
+        return list(yutori.parse_research_result(status_data, sub_task['query'], sub_task['location']))
+    
+    try:
+        batches = run_concurrently(sub_tasks, wait_for_sub_task)
+        jobs_data = list(merge_jobs(batches, limit=max_results))
+    except ResearchTaskTimeout:
+        raise Exception("All search sub-queries timed out")
+    
+    result_key = storage.upload_json_artifact(
+        {'status': 'succeeded', 'jobs': jobs_data}, 'research_results', task_id
+    )
+    dynamodb.update_task_fields(
+        task_id,
+        research_result_s3_key=result_key,
+        checkpoint_stage=STAGE_RESULT_STORED
+    )
+    return complete_search_task(
+        dynamodb, task_id, jobs_data, max_results, query=query, location=location
+    )
+
+
+def create_sub_tasks(yutori, plan):
+    """
+    Start a research task for every sub-query in the plan, concurrently
+    
+    Sub-queries whose task could not be created are dropped; raises the
+    last error if none could be.
+    """
+    def create(sub_query):
+        try:
+            return {
+                'query': sub_query['query'],
+                'location': sub_query['location'],
+                'external_task_id': yutori.create_research_task(
+                    sub_query['query'], sub_query['location'], sub_query['max_results']
+                )
+            }
+        except Exception as e:
+            print(f"Creating sub-query {sub_query['query']!r} in {sub_query['location']} failed: {str(e)}")
+            return e
+    
+    with ThreadPoolExecutor(max_workers=len(plan)) as executor:
+        results = list(executor.map(create, plan))
+    
+    sub_tasks = [result for result in results if not isinstance(result, Exception)]
+    if not sub_tasks:
+        raise results[-1]
+    return sub_tasks
+
+
+def hand_off_to_poller(dynamodb, task_id, external_task_id, poll_after=0):
+    """
+    Register the research task with the central poller and release the worker
+    
+    A no-op if the webhook already finished the task, so a fast callback
+    is never followed by a second completion from the poller.
+    """
+    if not dynamodb.mark_task_outstanding(task_id, external_task_id, 'research', poll_after=poll_after):
+        print(f"Task {task_id} already finished by callback; not handing off")
+
+
+def mock_jobs_data(query, location):
+    """Canned search results for SEARCH_BACKEND=mock"""
+    return [
+        {
+            'title': f'{query.title()} - Senior',
+            'company': 'TechCorp Inc',
+            'location': location or 'San Francisco, CA',
+            'description': f'We are looking for an experienced {query} to join our team. Must have 5+ years of experience.',
+            'url': 'https://example.com/job/1',
+            'posted_date': '2 days ago',
+            'salary_range': '$120k - $180k'
+        },
+        {
+            'title': f'{query.title()} - Mid Level',
+            'company': 'StartupXYZ',
+            'location': location or 'San Francisco, CA',
+            'description': f'Join our growing team as a {query}. Work on cutting-edge technology.',
+            'url': 'https://example.com/job/2',
+            'posted_date': '1 week ago',
+            'salary_range': '$100k - $150k'
+        },
+        {
+            'title': f'{query.title()}',
+            'company': 'BigTech Co',
+            'location': location or 'Remote',
+            'description': f'Remote {query} position with competitive salary and benefits.',
+            'url': 'https://example.com/job/3',
+            'posted_date': '3 days ago',
+            'salary_range': '$130k - $200k'
+        }
+    ]
@@ -0,0 +1,191 @@
+"""
+Resume bullet bank: the user's own bullets, ranked per job by similarity
+"""
+import re
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from .resume_text import extract_resume_text
+from .text_vectors import (
+    SparseVector, dot, np, smooth_idf, term_counts, tfidf_vector, top_indices
+)
+
+
+BANK_FORMAT_VERSION = 1
+MAX_BULLETS = 200
+MIN_BULLETS = 3
+MIN_WORDS = 4
+MAX_WORDS = 60
+BULLETS_PER_KIT = 5
+
+BULLET_MARKER = re.compile(r'^\s*(?:[•●▪■◦‣►✓*\-–—]|o\s|\d{1,2}[.)]\s)\s*')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
+def extract_bullets(resume_text: str) -> List[str]:
+    """
+    Accomplishment lines from resume text
+
+    Marked lines (•, -, *, numbered) are bullets; unmarked lines that start
+    lowercase continue the previous bullet (PDF line wrapping). Resumes with
+    too few marked lines fall back to their longer sentences.
+    """
+    groups: List[List[str]] = []
+    current: Optional[List[str]] = None
+    for line in (resume_text or '').splitlines():
+        stripped = line.strip()
+        if not stripped:
+            current = None
+            continue
+        marker = BULLET_MARKER.match(line)
+        if marker:
+            current = [line[marker.end():].strip()]
+            groups.append(current)
+        elif current is not None and stripped[0].islower():
+            current.append(stripped)
+        else:
+            current = None
+    candidates = [' '.join(parts) for parts in groups]
+
+    if len(candidates) < MIN_BULLETS:
+        text = ' '.join((resume_text or '').split())
+        candidates = SENTENCE_SPLIT.split(text)
+
+    seen, result = set(), []
+    for candidate in candidates:
+        candidate = candidate.strip().rstrip(';')
+        words = len(candidate.split())
+        key = candidate.lower()
+        if MIN_WORDS <= words <= MAX_WORDS and key not in seen:
+            seen.add(key)
+            result.append(candidate)
+    return result[:MAX_BULLETS]
+
+
+class BulletBank:
+    """
+    A resume's bullets with precomputed sparse TF-IDF vectors
+
+    IDF is fitted on the bullets themselves, so terms that distinguish one
+    accomplishment from another carry the most weight. Job descriptions
+    are projected onto the bank's vocabulary; ranking many jobs is one
+    matrix product when NumPy is installed.
+    """
+
+    def __init__(self, bullets: List[str], vocabulary: Dict[str, int], idf: List[float],
+                 vectors: List[SparseVector]):
+        self.bullets = bullets
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.vectors = vectors
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.bullets)
+
+    @classmethod
+    def build(cls, resume_text: str) -> 'BulletBank':
+        bullets = extract_bullets(resume_text)
+        counts = [term_counts(bullet) for bullet in bullets]
+
+        document_frequency: Dict[str, int] = {}
+        for bullet_counts in counts:
+            for term in bullet_counts:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+
+        vocabulary = {term: index for index, term in enumerate(sorted(document_frequency))}
+        idf = [smooth_idf(document_frequency[term], len(bullets)) for term in sorted(document_frequency)]
+        vectors = [tfidf_vector(bullet_counts, vocabulary, idf) for bullet_counts in counts]
+        return cls(bullets, vocabulary, idf, vectors)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON form: vectors as parallel index/weight lists"""
+        return {
+            'version': BANK_FORMAT_VERSION,
+            'bullets': self.bullets,
+            'terms': sorted(self.vocabulary, key=self.vocabulary.get),
+            'idf': [round(value, 5) for value in self.idf],
+            'vectors': [
+                [list(vector), [round(value, 5) for value in vector.values()]]
+                for vector in self.vectors
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BulletBank':
+        vocabulary = {term: index for index, term in enumerate(data['terms'])}
+        vectors = [dict(zip(indices, values)) for indices, values in data['vectors']]
+        return cls(data['bullets'], vocabulary, data['idf'], vectors)
+
+    def job_vector(self, text: str) -> SparseVector:
+        """TF-IDF vector of a job description over the bank's vocabulary"""
+        return tfidf_vector(term_counts(text), self.vocabulary, self.idf)
+
+    def rank(self, text: str, top_n: int = BULLETS_PER_KIT) -> List[Tuple[str, float]]:
+        """Best matching bullets for one job as (bullet, cosine similarity)"""
+        return self.rank_many([text], top_n)[0]
+
+    def rank_many(self, texts: Sequence[str],
+                  top_n: int = BULLETS_PER_KIT) -> List[List[Tuple[str, float]]]:
+        """
+        Best matching bullets for many jobs
+
+        Bullets that share no terms with a job keep their resume order
+        after the matches, so every job gets top_n bullets when the bank
+        has them.
+        """
+        if not self.bullets:
+            return [[] for _ in texts]
+        job_vectors = [self.job_vector(text) for text in texts]
+
+        if np is None:
+            return [
+                [(self.bullets[i], score)
+                 for i, score in top_indices((dot(job, bullet) for bullet in self.vectors), top_n)]
+                for job in job_vectors
+            ]
+
+        jobs = np.zeros((len(job_vectors), len(self.vocabulary)))
+        for row, vector in enumerate(job_vectors):
+            if vector:
+                jobs[row, list(vector)] = list(vector.values())
+        scores = jobs @ self._bullet_matrix().T
+
+        # Stable sort on negated scores keeps resume order among ties
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :top_n]
+        return [
+            [(self.bullets[i], float(scores[row, i])) for i in order[row]]
+            for row in range(len(job_vectors))
+        ]
+
+    def _bullet_matrix(self):
+        """Dense bullets x vocabulary matrix; small, built once per bank"""
+        if self._matrix is None:
+            matrix = np.zeros((len(self.vectors), len(self.vocabulary)))
+            for row, vector in enumerate(self.vectors):
+                if vector:
+                    matrix[row, list(vector)] = list(vector.values())
+            self._matrix = matrix
+        return self._matrix
+
+
+def load_bullet_bank(storage, resume_hash: str, resume_bytes: bytes) -> BulletBank:
+    """
+    The stored bank for a resume, built and saved on first use
+
+    Args:
+        storage: S3Client (or another storage backend)
+        resume_hash: Content hash of the resume file (see resume_content_hash)
+        resume_bytes: The resume file, parsed only if the bank must be built
+    """
+    data = storage.get_bullet_bank(resume_hash)
+    if data and data.get('version') == BANK_FORMAT_VERSION:
+        return BulletBank.from_dict(data)
+
+    bank = BulletBank.build(extract_resume_text(resume_bytes))
+    storage.put_bullet_bank(resume_hash, bank.to_dict())
+    return bank
+
+
+def format_bullet(text: str) -> str:
+    """Bullet text in the kit style ("• ...")"""
+    return text if text.startswith('• ') else f"• {text}"
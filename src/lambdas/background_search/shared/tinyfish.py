@@ -0,0 +1,73 @@
+"""
+TinyFish (Mino) web agent requests shared by the sync and async clients
+"""
+import os
+from typing import Dict, Any
+
+
+# Mino API endpoint (TinyFish rebranded to Mino)
+TINYFISH_RUN_URL = "https://mino.ai/v1/automation/run"
+
+
+def tinyfish_headers() -> Dict[str, str]:
+    """Request headers; raises if no API key is configured"""
+    api_key = os.environ.get('TINYFISH_API_KEY')
+
+    if not api_key:
+        raise ValueError("TINYFISH_API_KEY not configured")
+
+    return {
+        "X-API-Key": api_key,
+        "Content-Type": "application/json"
+    }
+
+
+def build_tinyfish_payload(job_url: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the automation run request that fills and submits an application"""
+    # Create automation goal with instructions
+    goal = f"""
+Navigate to this job application page and fill out the form, then SUBMIT it.
+
+Application URL: {job_url}
+
+Fill in these details:
+- Full Name: {application_data.get('full_name', 'Not provided')}
+- Email: {application_data.get('email', 'Not provided')}
+- Phone: {application_data.get('phone', 'Not provided')}
+
+If there's a cover letter field, paste this:
+{application_data.get('cover_letter', 'Not provided')}
+
+If there's a resume upload field, note that resume URL is: {application_data.get('resume_url', 'Not provided')}
+
+Additional information:
+- LinkedIn: {application_data.get('linkedin', 'Not provided')}
+- Portfolio: {application_data.get('portfolio', 'Not provided')}
+- Years of Experience: {application_data.get('years_experience', 'Not provided')}
+
+Instructions:
+1. Navigate to the application page
+2. Fill in all visible form fields with the appropriate data
+3. Click the "Submit" or "Apply" button to submit the application
+4. Wait for confirmation that the application was submitted
+5. Return a JSON object with all fields you filled in the format: {{"field_name": "value_filled", "submitted": true}}
+"""
+
+    return {
+        "url": job_url,
+        "goal": goal,
+        "browserProfile": "stealth",  # Use stealth mode to avoid bot detection
+        "responseFormat": "json"
+    }
+
+
+def parse_tinyfish_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a TinyFish run response to our fill result"""
+    return {
+        'session_id': result.get('sessionId'),
+        'status': result.get('status'),
+        'screenshot_url': result.get('screenshotUrl'),
+        'filled_fields': result.get('resultJson', {}),
+        'logs': result.get('logs', []),
+        'message': 'Form filled and submitted successfully'
+    }
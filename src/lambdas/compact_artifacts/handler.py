@@ -0,0 +1,93 @@
+"""
+Scheduled Lambda function to compact old artifacts into indexed archives
+"""
+import json
+import os
+
+from shared.dynamodb_utils import DynamoDBClient
+from shared.s3_utils import create_storage_client
+from shared.compaction import compact_prefixes
+
+
+# Leave time to flush the archive in progress before the Lambda times out
+SAFETY_MARGIN_MS = 60 * 1000
+
+COVER_LETTER_PREFIX = 'cover-letters/'
+
+
+def record_cover_letter_archives(dynamodb, index):
+    """
+    Store each compacted cover letter's archive location on its kit
+    
+    Keys are cover-letters/{user}/{job_id}/{kit_id}_{suffix}.txt. Letters
+    written before kit IDs were in the key (cover-letters/{user}/{job_id}_{ts}.txt)
+    are matched through the job's kits. A letter no kit points at stays
+    readable through the catalog.
+    """
+    kits_by_job = {}
+    for s3_key, location in index.items():
+        if not s3_key.startswith(COVER_LETTER_PREFIX):
+            continue
+        parts = s3_key.split('/')
+        name = parts[-1].rsplit('.', 1)[0]
+        if len(parts) == 4:
+            kit_ids = [name.rsplit('_', 1)[0]]
+        else:
+            job_id = name.rsplit('_', 1)[0]
+            if job_id not in kits_by_job:
+                kits_by_job[job_id] = dynamodb.get_kits_by_job(job_id)
+            kit_ids = [kit['kit_id'] for kit in kits_by_job[job_id]
+                       if kit.get('cover_letter_s3_key') == s3_key]
+        
+        location = {field: location[field] for field in ('archive', 'offset', 'length')}
+        recorded = [kit_id for kit_id in kit_ids
+                    if dynamodb.set_cover_letter_archive(kit_id, s3_key, location)]
+        if not recorded:
+            print(f"No kit references {s3_key}; it stays readable through the catalog")
+
+
+def lambda_handler(event, context):
+    """
+    Pack small objects older than the minimum age into archive blobs
+    
+    Event (all optional, defaults from environment):
+    {
+        "prefixes": ["artifacts/", "cover-letters/"],
+        "min_age_days": 30
+    }
+    """
+    try:
+        event = event or {}
+        prefixes = event.get('prefixes') or [
+            p.strip() for p in os.environ.get('COMPACTION_PREFIXES', 'artifacts/,cover-letters/').split(',')
+            if p.strip()
+        ]
+        min_age_days = int(event.get('min_age_days', os.environ.get('COMPACTION_MIN_AGE_DAYS', 30)))
+        
+        def should_stop():
+            return context is not None and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS
+        
+        dynamodb = DynamoDBClient()
+        results = compact_prefixes(
+            create_storage_client(),
+            prefixes,
+            min_age_seconds=min_age_days * 86400,
+            should_stop=should_stop,
+            on_archived=lambda index: record_cover_letter_archives(dynamodb, index)
+        )
+        
+        print(f"Compaction finished: {json.dumps(results)}")
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'results': results})
+        }
+    
+    except Exception as e:
+        print(f"Error in compact_artifacts: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
@@ -0,0 +1,596 @@
+"""
+S3 utilities for storing and retrieving artifacts
+"""
+import boto3
+from botocore.exceptions import ClientError
+import os
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple, Union, BinaryIO
+from contextlib import contextmanager
+from datetime import datetime
+import codecs
+import json
+import mmap
+import random
+import time
+import uuid
+
+from .object_cache import LocalObjectCache, get_object_cache
+
+
+# Default chunk size for streamed reads (1 MB)
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Conditional read-modify-write attempts before giving up on a contended object
+MAX_CONDITIONAL_ATTEMPTS = 8
+
+
+def _is_missing(error: ClientError) -> bool:
+    """True if a ClientError means the object does not exist"""
+    return error.response.get('Error', {}).get('Code') in ('NoSuchKey', '404')
+
+
+def _is_conflict(error: ClientError) -> bool:
+    """True if a conditional write lost to a concurrent writer"""
+    return error.response.get('Error', {}).get('Code') in (
+        'PreconditionFailed', 'ConditionalRequestConflict', '412', '409'
+    )
+
+
+class S3Client:
+    """S3 client wrapper for artifact storage"""
+    
+    def __init__(self, object_cache: Optional[LocalObjectCache] = None):
+        self.s3 = boto3.client('s3')
+        self.bucket_name = os.environ['S3_BUCKET_NAME']
+        self.object_cache = object_cache or get_object_cache()
+    
+    def upload_resume(self, file_content: bytes, user_id: str = "demo_user", 
+                     content_type: str = "application/pdf") -> str:
+        """Upload resume to S3"""
+        timestamp = int(datetime.now().timestamp())
+        key = f"resumes/{user_id}/resume_{timestamp}.pdf"
+        
+        self._put_object(
+            key,
+            file_content,
+            content_type=content_type,
+            metadata={
+                'user_id': user_id,
+                'uploaded_at': str(timestamp)
+            }
+        )
+        
+        self._add_to_resume_manifest(user_id, {
+            'key': key,
+            'uploaded_at': timestamp,
+            'size': len(file_content),
+            'content_type': content_type
+        })
+        
+        return key
+    
+    def get_resume(self, s3_key: str) -> bytes:
+        """Get resume from S3 (served from the local cache when unchanged)"""
+        return self.get_object_cached(s3_key)
+    
+    def iter_resume(self, s3_key: str,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream resume from S3 in fixed-size chunks"""
+        return self.iter_object(s3_key, chunk_size=chunk_size)
+    
+    def get_resume_range(self, s3_key: str, start: int,
+                         end: Optional[int] = None) -> bytes:
+        """Get a byte window of a resume (e.g. the first pages for preview)"""
+        return self.get_object_range(s3_key, start, end)
+    
+    def get_bullet_bank(self, resume_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the stored bullet bank for a resume's content, or None"""
+        data = self._get_optional(f"bullet-banks/{resume_hash}.json")
+        return json.loads(data.decode('utf-8')) if data is not None else None
+    
+    def put_bullet_bank(self, resume_hash: str, bank: Dict[str, Any]) -> str:
+        """Store a resume's bullet bank, keyed by the resume's content hash"""
+        key = f"bullet-banks/{resume_hash}.json"
+        self._put_object(
+            key,
+            json.dumps(bank, separators=(',', ':')).encode('utf-8'),
+            content_type='application/json'
+        )
+        return key
+    
+    def get_resume_text(self, resume_hash: str) -> Optional[str]:
+        """Get the stored extracted text for a resume's content, or None"""
+        data = self._get_optional(f"resume-text/{resume_hash}.txt")
+        return data.decode('utf-8') if data is not None else None
+    
+    def put_resume_text(self, resume_hash: str, text: str) -> str:
+        """Store a resume's extracted text, keyed by the resume's content hash"""
+        key = f"resume-text/{resume_hash}.txt"
+        self._put_object(key, text.encode('utf-8'), content_type='text/plain')
+        return key
+    
+    def get_user_index(self, user_id: str, name: str) -> Optional[bytes]:
+        """Get a serialized per-user index (served from the local cache when unchanged)"""
+        return self._get_optional(f"indexes/{user_id}/{name}")
+    
+    def update_user_index(self, user_id: str, name: str,
+                          update: Callable[[Optional[bytes]], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Read-modify-write a per-user index with conditional puts
+        
+        update receives the stored index (None if there is none) and returns
+        the new one, or None to leave it as is. It runs again on a fresh
+        read if another writer changed the index in between, so concurrent
+        updates never drop each other's entries.
+        
+        Returns:
+            The index that was written, or None if nothing was written
+        """
+        return self._update_object(f"indexes/{user_id}/{name}", update,
+                                   content_type='application/octet-stream')
+    
+    def upload_cover_letter(self, content: str, job_id: str, kit_id: str,
+                           user_id: str = "demo_user") -> str:
+        """
+        Upload generated cover letter to S3
+        
+        Kit IDs are derived from the request content, so each upload also
+        gets a random suffix: concurrent generations of the same kit never
+        overwrite each other's letter.
+        """
+        timestamp = int(datetime.now().timestamp())
+        key = f"cover-letters/{user_id}/{job_id}/{kit_id}_{uuid.uuid4().hex[:8]}.txt"
+        
+        self._put_object(
+            key,
+            content.encode('utf-8'),
+            content_type='text/plain',
+            metadata={
+                'user_id': user_id,
+                'job_id': job_id,
+                'kit_id': kit_id,
+                'created_at': str(timestamp)
+            }
+        )
+        
+        return key
+    
+    def get_cover_letter(self, s3_key: str,
+                         archive_location: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Get cover letter from S3 (served from the local cache when unchanged)
+        
+        A compacted letter whose archive location is known (kits record it
+        as cover_letter_archive) is read with a single ranged GET.
+        """
+        if archive_location:
+            from .compaction import ArchiveStore
+            return ArchiveStore(self).read_at(archive_location).decode('utf-8')
+        return self.get_object_cached(s3_key).decode('utf-8')
+    
+    def delete_cover_letter(self, s3_key: str) -> None:
+        """Delete a cover letter that no kit references"""
+        self._delete_objects([s3_key])
+    
+    def iter_cover_letter(self, s3_key: str,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Stream cover letter text from S3
+        
+        Chunks are decoded incrementally, so multi-byte UTF-8 characters
+        split across chunk boundaries are handled correctly.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        for chunk in self.iter_object(s3_key, chunk_size=chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    def iter_object(self, s3_key: str,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Stream any object from S3 without buffering it in memory
+        
+        Args:
+            s3_key: Object key
+            chunk_size: Maximum bytes per yielded chunk
+        
+        Yields:
+            Successive chunks of the object body
+        """
+        response = self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+        body = response['Body']
+        try:
+            for chunk in body.iter_chunks(chunk_size=chunk_size):
+                yield chunk
+        finally:
+            body.close()
+    
+    def get_object_range(self, s3_key: str, start: int,
+                         end: Optional[int] = None) -> bytes:
+        """
+        Fetch a byte window of an object with a ranged GET
+        
+        Args:
+            s3_key: Object key
+            start: First byte offset (inclusive)
+            end: Last byte offset (inclusive); None reads to end of object
+        
+        Returns:
+            The requested bytes (shorter if the object ends first)
+        """
+        if start < 0 or (end is not None and end < start):
+            raise ValueError(f"Invalid byte range: {start}-{end}")
+        
+        byte_range = f"bytes={start}-{end if end is not None else ''}"
+        response = self.s3.get_object(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            Range=byte_range
+        )
+        return response['Body'].read()
+    
+    def get_object_cached(self, s3_key: str) -> bytes:
+        """
+        Get an object through the local /tmp cache
+        
+        A cached copy is revalidated with If-None-Match, so an unchanged
+        object costs a 304 instead of a full transfer. Objects that have
+        been compacted into an archive are read with a ranged GET.
+        """
+        try:
+            return self._get_cached_direct(s3_key)
+        except ClientError as e:
+            if not _is_missing(e):
+                raise
+            from .compaction import ArchiveStore
+            archived = ArchiveStore(self).read(s3_key)
+            if archived is None:
+                raise
+            return archived
+    
+    def _get_cached_direct(self, s3_key: str) -> bytes:
+        """Get a live (non-archived) object through the local /tmp cache"""
+        uncached = self._refresh_cached(s3_key)
+        if uncached is not None:
+            return uncached
+        
+        data = self.object_cache.read_bytes(s3_key)
+        if data is None:
+            # Evicted between revalidation and read; fall back to a plain GET
+            response = self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+            return response['Body'].read()
+        return data
+    
+    @contextmanager
+    def open_cached(self, s3_key: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        """
+        Memory-map an object through the local /tmp cache
+        
+        Yields a read-only mmap of the cached file. Objects too large for
+        the cache are yielded as bytes instead.
+        """
+        uncached = self._refresh_cached(s3_key)
+        if uncached is not None:
+            yield uncached
+            return
+        
+        with self.object_cache.open_mmap(s3_key) as mapped:
+            yield mapped
+    
+    def _refresh_cached(self, s3_key: str) -> Optional[bytes]:
+        """
+        Make sure the cache holds the current version of an object
+        
+        Returns:
+            None if the cache is now fresh, otherwise the object body for
+            objects that are too large to cache
+        """
+        cache = self.object_cache
+        params = {'Bucket': self.bucket_name, 'Key': s3_key}
+        etag = cache.get_etag(s3_key)
+        if etag:
+            params['IfNoneMatch'] = etag
+        
+        try:
+            response = self.s3.get_object(**params)
+        except ClientError as e:
+            status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            if etag and (status == 304 or e.response.get('Error', {}).get('Code') in ('304', 'NotModified')):
+                return None
+            raise
+        
+        body = response['Body']
+        if response.get('ContentLength', 0) > cache.max_bytes:
+            return body.read()
+        
+        cache.put(s3_key, response['ETag'], body.iter_chunks(chunk_size=DEFAULT_CHUNK_SIZE))
+        return None
+    
+    def upload_screenshot(self, image_data: Union[bytes, BinaryIO], task_id: str, 
+                         step: str, content_type: str = 'image/png',
+                         extension: str = 'png') -> str:
+        """Upload screenshot from browser automation (bytes or a file object)"""
+        timestamp = int(datetime.now().timestamp())
+        key = f"screenshots/{task_id}/{step}_{timestamp}.{extension}"
+        
+        self._put_object(
+            key,
+            image_data,
+            content_type=content_type,
+            metadata={
+                'task_id': task_id,
+                'step': step,
+                'timestamp': str(timestamp)
+            }
+        )
+        
+        return key
+    
+    def upload_json_artifact(self, data: Dict[str, Any], artifact_type: str,
+                            reference_id: str) -> str:
+        """Upload JSON artifact (e.g., job search results, filled form data)"""
+        timestamp = int(datetime.now().timestamp())
+        key = f"artifacts/{artifact_type}/{reference_id}_{timestamp}.json"
+        
+        self._put_object(
+            key,
+            json.dumps(data, indent=2).encode('utf-8'),
+            content_type='application/json',
+            metadata={
+                'artifact_type': artifact_type,
+                'reference_id': reference_id,
+                'timestamp': str(timestamp)
+            }
+        )
+        
+        return key
+    
+    def get_presigned_url(self, s3_key: str, expiration: int = 3600) -> str:
+        """Generate presigned URL for temporary access"""
+        url = self.s3.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket_name,
+                'Key': s3_key
+            },
+            ExpiresIn=expiration
+        )
+        return url
+    
+    def list_user_resumes(self, user_id: str = "demo_user",
+                          limit: Optional[int] = None) -> list:
+        """
+        List resumes for a user, most recent first
+        
+        Reads the per-user manifest (a single GET regardless of history
+        size). If no manifest exists yet, it is rebuilt from a paginated
+        listing of the user's prefix.
+        """
+        entries = self._load_resume_manifest(user_id)
+        if entries is None:
+            entries = self._rebuild_resume_manifest(user_id)
+        
+        keys = [entry['key'] for entry in entries]
+        return keys[:limit] if limit else keys
+    
+    def list_user_resumes_page(self, user_id: str = "demo_user",
+                               page_size: int = 100,
+                               continuation_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        List one page of a user's resumes directly from S3
+        
+        Returns:
+            Dict with 'keys' and 'next_token' (None on the last page)
+        """
+        params = {
+            'Bucket': self.bucket_name,
+            'Prefix': f"resumes/{user_id}/",
+            'MaxKeys': page_size
+        }
+        if continuation_token:
+            params['ContinuationToken'] = continuation_token
+        
+        response = self.s3.list_objects_v2(**params)
+        return {
+            'keys': [obj['Key'] for obj in response.get('Contents', [])],
+            'next_token': response.get('NextContinuationToken')
+        }
+    
+    def _resume_manifest_key(self, user_id: str) -> str:
+        # Kept outside resumes/{user_id}/ so prefix listings never include it
+        return f"manifests/resumes/{user_id}.json"
+    
+    def _load_resume_manifest(self, user_id: str) -> Optional[list]:
+        """Load manifest entries, or None if the manifest does not exist"""
+        data = self._get_optional(self._resume_manifest_key(user_id))
+        if data is None:
+            return None
+        return json.loads(data.decode('utf-8')).get('resumes', [])
+    
+    def _add_to_resume_manifest(self, user_id: str, entry: Dict[str, Any]) -> None:
+        """
+        Prepend a newly uploaded resume to the user's manifest
+        
+        The write is conditional on the manifest being unchanged since it
+        was read, so concurrent uploads retry instead of dropping entries.
+        """
+        def add(manifest: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            if manifest is None:
+                # First upload under the manifest scheme; backfill from S3
+                entries = self._list_resume_entries(user_id)
+            else:
+                entries = manifest.get('resumes', [])
+            entries = [e for e in entries if e['key'] != entry['key']]
+            entries.insert(0, entry)
+            return {'user_id': user_id, 'resumes': entries}
+        
+        self._update_json(self._resume_manifest_key(user_id), add)
+    
+    def _rebuild_resume_manifest(self, user_id: str) -> list:
+        """
+        Rebuild a user's manifest by walking every page of their prefix
+        
+        Only written if no manifest exists, so a concurrent upload's
+        manifest entry is never overwritten by this listing.
+        """
+        entries = self._list_resume_entries(user_id)
+        self._put_object_if(
+            self._resume_manifest_key(user_id),
+            json.dumps({'user_id': user_id, 'resumes': entries}).encode('utf-8'),
+            content_type='application/json',
+            etag=None
+        )
+        return entries
+    
+    def _list_resume_entries(self, user_id: str) -> list:
+        entries = [
+            {
+                'key': obj['key'],
+                'uploaded_at': obj['last_modified'],
+                'size': obj['size']
+            }
+            for obj in self._list_prefix(f"resumes/{user_id}/")
+        ]
+        entries.sort(key=lambda e: e['uploaded_at'], reverse=True)
+        return entries
+    
+    def _update_json(self, s3_key: str,
+                     update: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]],
+                     attempts: int = MAX_CONDITIONAL_ATTEMPTS) -> Dict[str, Any]:
+        """
+        Read-modify-write a JSON object with optimistic concurrency
+        
+        update receives the current document (None if the object doesn't
+        exist) and returns the new one. It is called again with a fresh
+        read whenever another writer changed the object in between.
+        
+        Returns:
+            The document that was written
+        """
+        documents = []
+        
+        def serialize(data: Optional[bytes]) -> bytes:
+            documents.append(update(json.loads(data.decode('utf-8')) if data is not None else None))
+            return json.dumps(documents[-1], separators=(',', ':')).encode('utf-8')
+        
+        self._update_object(s3_key, serialize, content_type='application/json', attempts=attempts)
+        return documents[-1]
+    
+    def _update_object(self, s3_key: str,
+                       update: Callable[[Optional[bytes]], Optional[bytes]],
+                       content_type: str,
+                       attempts: int = MAX_CONDITIONAL_ATTEMPTS) -> Optional[bytes]:
+        """
+        Read-modify-write an object with optimistic concurrency
+        
+        update receives the current body (None if the object doesn't exist)
+        and returns the new body, or None to leave the object unchanged.
+        
+        Returns:
+            The body that was written, or None if update wrote nothing
+        """
+        for attempt in range(attempts):
+            data, etag = self._get_with_etag(s3_key)
+            body = update(data)
+            if body is None:
+                return None
+            if self._put_object_if(s3_key, body, content_type=content_type, etag=etag):
+                return body
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        raise RuntimeError(f"Gave up updating {s3_key} after {attempts} conflicting writes")
+    
+    # Storage primitives (overridden by alternative backends)
+    def _put_object(self, s3_key: str, body: Union[bytes, BinaryIO],
+                    content_type: str,
+                    metadata: Optional[Dict[str, str]] = None) -> None:
+        """Write an object to the bucket"""
+        self.s3.put_object(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            Body=body,
+            ContentType=content_type,
+            Metadata=metadata or {}
+        )
+    
+    def _put_object_if(self, s3_key: str, body: bytes, content_type: str,
+                       etag: Optional[str]) -> bool:
+        """
+        Write an object only if nobody else has since it was read
+        
+        Args:
+            etag: ETag that was read, or None to write only if the object
+                doesn't exist yet
+        
+        Returns:
+            False if the write lost a race and should be retried
+        """
+        condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=body,
+                ContentType=content_type,
+                **condition
+            )
+            return True
+        except ClientError as e:
+            if _is_conflict(e):
+                return False
+            raise
+    
+    def _get_with_etag(self, s3_key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Read an object and its ETag directly from S3, or (None, None) if it does not exist"""
+        try:
+            response = self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if _is_missing(e):
+                return None, None
+            raise
+        return response['Body'].read(), response['ETag']
+    
+    def _get_optional(self, s3_key: str) -> Optional[bytes]:
+        """Read a live object through the cache, or None if it does not exist"""
+        try:
+            return self._get_cached_direct(s3_key)
+        except ClientError as e:
+            if _is_missing(e):
+                return None
+            raise
+    
+    def _delete_objects(self, s3_keys: List[str]) -> None:
+        """Delete objects in batches of up to 1000 keys"""
+        for i in range(0, len(s3_keys), 1000):
+            batch = s3_keys[i:i + 1000]
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+    
+    def _list_prefix(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """Walk every page of a prefix listing"""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield {
+                    'key': obj['Key'],
+                    'size': obj['Size'],
+                    'last_modified': int(obj['LastModified'].timestamp())
+                }
+
+
+def create_storage_client() -> S3Client:
+    """
+    Create the artifact storage client for this deployment
+    
+    Uses S3 by default. Set STORAGE_BACKEND=filesystem (and
+    LOCAL_STORAGE_ROOT) to store artifacts on local disk instead.
+    """
+    if os.environ.get('STORAGE_BACKEND', 's3').lower() == 'filesystem':
+        from .local_storage import FilesystemS3Client
+        return FilesystemS3Client()
+    return S3Client()
@@ -0,0 +1,259 @@
+"""
+Streaming extraction of structured job postings from research output
+"""
+import json
+import re
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
+
+
+# Start of a new posting: "1. ...", "2) ...", "## 3. ..." or "- **Title** ..."
+RECORD_START = re.compile(r'^(?:#{1,4}\s+(?:\d{1,3}[.)]\s+)?|\d{1,3}[.)]\s+|[-*]\s+\*\*(?=[^*]+\*\*))')
+SEPARATOR = re.compile(r'^(?:-{3,}|\*{3,}|_{3,})$')
+
+# "Label: value" pairs, several of which may share one line
+FIELD_LABELS = {
+    'title': 'title', 'job title': 'title', 'position': 'title', 'role': 'title',
+    'company': 'company', 'company name': 'company', 'employer': 'company',
+    'location': 'location',
+    'url': 'url', 'link': 'url', 'apply': 'url', 'application url': 'url',
+    'application link': 'url', 'apply at': 'url', 'apply here': 'url',
+    'salary': 'salary_range', 'salary range': 'salary_range', 'compensation': 'salary_range',
+    'pay': 'salary_range',
+    'posted': 'posted_date', 'date posted': 'posted_date', 'posted date': 'posted_date',
+    'posted on': 'posted_date',
+    'description': 'description', 'summary': 'description',
+    'job description': 'description', 'job description summary': 'description',
+}
+FIELD_PATTERN = re.compile(
+    r'(?:^|(?<=[\s.;|(]))(?P<label>' +
+    '|'.join(sorted((re.escape(label) for label in FIELD_LABELS), key=len, reverse=True)) +
+    r')\s*:\s*',
+    re.IGNORECASE
+)
+
+URL_PATTERN = re.compile(r'https?://[^\s<>()\[\]"\']+')
+MARKDOWN_LINK = re.compile(r'\[([^\]]+)\]\((https?://[^)\s]+)\)')
+SALARY_PATTERN = re.compile(
+    r'\$\s?\d[\d,.]*\s?[kK]?(?:\s?(?:-|–|to)\s?\$?\s?\d[\d,.]*\s?[kK]?)?(?:\s?(?:/|per\s)\s?(?:yr|year|hour|hr))?'
+)
+POSTED_PATTERN = re.compile(
+    r'\bposted(?:\s+on)?\s+((?:\d+\+?\s+\w+\s+ago)|today|yesterday|just now|'
+    r'(?:on\s+)?[A-Z][a-z]{2,8}\.?\s+\d{1,2}(?:,\s*\d{4})?|\d{4}-\d{2}-\d{2})',
+    re.IGNORECASE
+)
+
+# Heading shapes: "Title at Company - Location", "Title | Company | Location"
+HEADING_AT = re.compile(r'^(?P<title>.+?)\s+at\s+(?P<company>.+?)(?:\s+[-–—|(]\s*(?P<location>[^)]+?)\)?)?$')
+HEADING_SPLIT = re.compile(r'\s+[-–—|]\s+')
+
+# Sentence break inside a field value ("Salary: $150k. Posted 2 days ago")
+SENTENCE_BREAK = re.compile(r'\.\s+(?=[A-Z])')
+
+MAX_DESCRIPTION_LENGTH = 500
+
+
+def _clean(value: str) -> str:
+    """Strip markdown emphasis, bullets and trailing punctuation"""
+    value = value.replace('**', '').replace('__', '').replace('`', '')
+    return value.strip().strip('*_').strip(' \t-–—:|,;').rstrip('.').strip()
+
+
+class JobExtractor:
+    """
+    Incremental parser for research result text
+
+    Feed text in arbitrary chunks; complete postings are yielded as soon as
+    the start of the next one (or the end of input) is seen. Only the
+    current partial line and the posting under construction are buffered,
+    so each character is examined a bounded number of times.
+
+        extractor = JobExtractor(default_location='Remote')
+        for chunk in chunks:
+            for job in extractor.feed(chunk):
+                ...
+        for job in extractor.close():
+            ...
+    """
+
+    def __init__(self, default_location: Optional[str] = None,
+                 source: str = 'yutori_research'):
+        self.default_location = default_location
+        self.source = source
+        self._partial: List[str] = []
+        self._record: Optional[Dict[str, Any]] = None
+        self._description: List[str] = []
+        self._description_length = 0
+
+    def feed(self, chunk: str) -> Iterator[Dict[str, Any]]:
+        """Consume a chunk of text and yield postings completed by it"""
+        if '\n' not in chunk:
+            # Buffer pieces of a long line instead of re-concatenating each time
+            self._partial.append(chunk)
+            return
+        lines = chunk.split('\n')
+        lines[0] = ''.join(self._partial) + lines[0]
+        self._partial = [lines.pop()]
+        for line in lines:
+            yield from self._line(line)
+
+    def close(self) -> Iterator[Dict[str, Any]]:
+        """Flush the final line and posting"""
+        if self._partial:
+            yield from self._line(''.join(self._partial))
+            self._partial = []
+        yield from self._finish()
+
+    def _line(self, raw: str) -> Iterator[Dict[str, Any]]:
+        line = raw.strip()
+        if not line:
+            return
+        if SEPARATOR.match(line):
+            yield from self._finish()
+            return
+
+        start = RECORD_START.match(line)
+        text = (line[start.end():] if start else line).replace('**', '').replace('__', '')
+        fields = self._fields(text)
+
+        if start or ('title' in fields and self._record and self._record.get('title')):
+            yield from self._finish()
+            self._record = {}
+            if start:
+                heading = FIELD_PATTERN.split(text, maxsplit=1)[0]
+                self._heading(heading)
+
+        if self._record is None:
+            # Preamble before the first posting
+            return
+
+        for name, value in fields.items():
+            if value and not self._record.get(name):
+                self._record[name] = value
+
+        if not fields and not start:
+            self._add_description(line)
+
+        if 'url' not in self._record:
+            link = MARKDOWN_LINK.search(line) or URL_PATTERN.search(line)
+            if link:
+                self._record['url'] = link.group(link.lastindex or 0).rstrip('.,;')
+        if 'salary_range' not in self._record:
+            salary = SALARY_PATTERN.search(line)
+            if salary:
+                self._record['salary_range'] = salary.group(0).strip()
+        if 'posted_date' not in self._record:
+            posted = POSTED_PATTERN.search(line)
+            if posted:
+                self._record['posted_date'] = _clean(posted.group(1))
+
+    def _fields(self, text: str) -> Dict[str, str]:
+        """Extract "Label: value" pairs from one line"""
+        matches = list(FIELD_PATTERN.finditer(text))
+        fields = {}
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            name = FIELD_LABELS[match.group('label').lower()]
+            value = text[match.end():end]
+            if name == 'url':
+                link = MARKDOWN_LINK.search(value) or URL_PATTERN.search(value)
+                value = link.group(link.lastindex or 0) if link else ''
+            elif name != 'description':
+                value = SENTENCE_BREAK.split(value, maxsplit=1)[0]
+            fields.setdefault(name, _clean(value))
+        return fields
+
+    def _heading(self, heading: str) -> None:
+        """Parse title, company and location from a posting's first line"""
+        link = MARKDOWN_LINK.search(heading)
+        if link:
+            self._record['url'] = link.group(2)
+            heading = heading[:link.start()] + link.group(1) + heading[link.end():]
+        heading = _clean(URL_PATTERN.sub('', heading))
+        if not heading:
+            return
+
+        match = HEADING_AT.match(heading)
+        if match:
+            parts = [match.group('title'), match.group('company'), match.group('location')]
+        else:
+            parts = HEADING_SPLIT.split(heading) + [None, None]
+
+        for name, value in zip(('title', 'company', 'location'), parts):
+            if value and _clean(value):
+                self._record[name] = _clean(value)
+
+    def _add_description(self, line: str) -> None:
+        if self._description_length >= MAX_DESCRIPTION_LENGTH:
+            return
+        text = _clean(URL_PATTERN.sub('', line))
+        if text:
+            self._description.append(text)
+            self._description_length += len(text) + 1
+
+    def _finish(self) -> Iterator[Dict[str, Any]]:
+        record, description = self._record, self._description
+        self._record, self._description, self._description_length = None, [], 0
+
+        if not record or not record.get('title'):
+            return
+        if not record.get('company') and not record.get('url'):
+            return
+
+        if not record.get('description') and description:
+            record['description'] = ' '.join(description)[:MAX_DESCRIPTION_LENGTH]
+        yield normalize_job(record, self.default_location, self.source)
+
+
+def normalize_job(record: Dict[str, Any], default_location: Optional[str] = None,
+                  source: str = 'yutori_research') -> Dict[str, Any]:
+    """Coerce a parsed or structured posting into the job dict save_jobs expects"""
+    def text(*names: str) -> str:
+        for name in names:
+            value = record.get(name)
+            if value:
+                return str(value).strip()
+        return ''
+
+    return {
+        'title': text('title', 'job_title', 'position'),
+        'company': text('company', 'company_name', 'employer') or 'Unknown company',
+        'location': text('location') or default_location or 'Remote',
+        'description': text('description', 'summary', 'job_description')[:MAX_DESCRIPTION_LENGTH],
+        'url': text('url', 'application_url', 'apply_url', 'link'),
+        'salary_range': text('salary_range', 'salary', 'compensation') or None,
+        'posted_date': text('posted_date', 'date_posted', 'posted') or None,
+        'source': source
+    }
+
+
+def extract_jobs(result: Union[str, Iterable[str], Dict[str, Any], List[Any], None],
+                 default_location: Optional[str] = None,
+                 source: str = 'yutori_research') -> Iterator[Dict[str, Any]]:
+    """
+    Yield jobs from a research result
+
+    Accepts structured output (a list of job objects, or a dict with a
+    'jobs' list, possibly JSON-encoded) or free text, given whole or as an
+    iterable of chunks.
+    """
+    if result is None:
+        return
+
+    if isinstance(result, str) and result.lstrip()[:1] in ('[', '{'):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            pass
+
+    if isinstance(result, dict):
+        result = result.get('jobs') or result.get('results') or []
+    if isinstance(result, list):
+        for record in result:
+            if isinstance(record, dict) and (record.get('title') or record.get('job_title')):
+                yield normalize_job(record, default_location, source)
+        return
+
+    extractor = JobExtractor(default_location, source)
+    for chunk in ([result] if isinstance(result, str) else result):
+        yield from extractor.feed(chunk)
+    yield from extractor.close()
@@ -66,17 +66,26 @@ class ApplicationKit(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
     def to_dynamodb(self) -> Dict[str, Any]:
-        """Convert to DynamoDB item format"""
-        return {
+        """
+        Convert to DynamoDB item format
+        
+        When the cover letter has been stored in S3, only its key and length
+        are kept in the item so kit listings don't scale with letter size.
+        """
+        item = {
             "kit_id": self.kit_id,
             "job_id": self.job_id,
             "user_id": self.user_id,
-            "cover_letter": self.cover_letter,
             "resume_bullets": self.resume_bullets,
             "cover_letter_s3_key": self.cover_letter_s3_key or "",
+            "cover_letter_length": len(self.cover_letter),
             "created_at": self.created_at,
+            "generation_status": "complete",
             "metadata": self.metadata or {}
         }
+        if not self.cover_letter_s3_key:
+            item["cover_letter"] = self.cover_letter
+        return item
 
 
 class FormFillTask(BaseModel):
@@ -0,0 +1,161 @@
+"""
+Disk-backed LRU cache for S3 objects in the Lambda /tmp directory
+"""
+import hashlib
+import mmap
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional, Union
+
+
+DEFAULT_CACHE_DIR = '/tmp/s3-object-cache'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB of the 512 MB default /tmp
+
+
+class LocalObjectCache:
+    """
+    Size-capped LRU cache of S3 object bodies stored as files in /tmp
+
+    Each entry records the object's ETag so callers can revalidate with
+    If-None-Match and only re-download when the object changed. The index
+    lives in memory; files left behind by a previous process are discarded
+    on startup because their ETags are unknown.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or os.environ.get('OBJECT_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes or int(os.environ.get('OBJECT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path_for(self, key: str) -> str:
+        """Map an S3 key to a flat, filesystem-safe cache path"""
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest)
+
+    def get_etag(self, key: str) -> Optional[str]:
+        """Return the cached ETag for a key, if present"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry['etag'] if entry else None
+
+    def touch(self, key: str) -> Optional[str]:
+        """Mark a key as recently used and return its file path"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            self._entries.move_to_end(key)
+            return entry['path']
+
+    def put(self, key: str, etag: str,
+            chunks: Union[bytes, Iterable[bytes]]) -> Optional[str]:
+        """
+        Store an object body under its key and ETag
+
+        The body is written to a temp file and renamed into place, so readers
+        never see a partial file. Objects larger than the cache are not kept.
+
+        Returns:
+            Path of the cached file, or None if the object was too large
+        """
+        if isinstance(chunks, (bytes, bytearray)):
+            chunks = [chunks]
+
+        path = self._path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        size = 0
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                size += len(chunk)
+                f.write(chunk)
+
+        if size > self.max_bytes:
+            os.remove(tmp_path)
+            self.evict(key)
+            return None
+
+        with self._lock:
+            os.replace(tmp_path, path)
+            old = self._entries.pop(key, None)
+            if old:
+                self._total_bytes -= old['size']
+            self._entries[key] = {'etag': etag, 'size': size, 'path': path}
+            self._total_bytes += size
+            self._evict_to_fit()
+
+        return path
+
+    def evict(self, key: str) -> None:
+        """Drop a key from the cache"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._total_bytes -= entry['size']
+                self._remove_file(entry['path'])
+
+    def _evict_to_fit(self) -> None:
+        """Evict least recently used entries until under the size cap"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry['size']
+            self._remove_file(entry['path'])
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def read_bytes(self, key: str) -> Optional[bytes]:
+        """Read a cached object fully, or None on miss"""
+        path = self.touch(key)
+        if not path:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @contextmanager
+    def open_mmap(self, key: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        """
+        Memory-map a cached object for zero-copy reads
+
+        Yields a read-only mmap (or b'' for empty objects, which cannot be
+        mapped). Raises KeyError on cache miss.
+        """
+        path = self.touch(key)
+        if not path:
+            raise KeyError(key)
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapped
+            finally:
+                mapped.close()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total_bytes
+
+
+_object_cache: Optional[LocalObjectCache] = None
+
+
+def get_object_cache() -> LocalObjectCache:
+    """Return the container-wide cache, reused across warm invocations"""
+    global _object_cache
+    if _object_cache is None:
+        _object_cache = LocalObjectCache()
+    return _object_cache
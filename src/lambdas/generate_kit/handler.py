@@ -2,11 +2,121 @@
 Lambda function to generate application kit (cover letter + resume bullets)
 """
 import json
-import hashlib
-from datetime import datetime
+import os
+import time
 
-from shared.models import ApplicationKit, Job
+import boto3
+
+from shared.bullet_bank import load_bullet_bank
 from shared.dynamodb_utils import DynamoDBClient
+from shared.kit_generation import (
+    build_kit, cached_kit_response, content_kit_id, generate_kit_content,
+    kit_is_complete, pending_kit_item, resume_content_hash
+)
+from shared.s3_utils import create_storage_client
+
+
+# Synchronous endpoint; generation stays on the mock until it moves off the API path
+KIT_BACKEND = 'mock'
+
+# A streaming kit not updated for this long is assumed dead and restarted
+STREAM_STALE_SECONDS = 300
+
+
+def start_streaming_kit(dynamodb, s3_client, job_data, resume_s3_key, resume_hash, user_context):
+    """
+    Start (or join) a streaming generation and return the 202/200 response
+    
+    The kit record is created up front with generation_status "generating"
+    and the background worker fills it in; clients poll
+    GET /kits?kit_id=... and see paragraphs as they are written.
+    """
+    job_id = job_data['job_id']
+    kit_id = content_kit_id(job_data, resume_hash, user_context)
+    
+    existing_kit = dynamodb.get_kit(kit_id)
+    status = existing_kit.get('generation_status', 'complete') if existing_kit else None
+    stale = status == 'generating' and \
+        time.time() - int(existing_kit.get('updated_at', 0)) > STREAM_STALE_SECONDS
+    
+    if status in ('complete', 'generating') and not stale:
+        print(f"Kit {kit_id} for job {job_id} is {status}")
+        return {
+            'statusCode': 200 if status == 'complete' else 202,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                **cached_kit_response(existing_kit, s3_client),
+                'message': f"Application kit {'already generated' if status == 'complete' else 'in progress'}"
+            })
+        }
+    
+    item = pending_kit_item(kit_id, job_id, metadata={'streamed': True})
+    if existing_kit:
+        # Retry a failed or abandoned generation in place, unless another
+        # request restarted it or it finished since it was read
+        started = dynamodb.replace_kit_if_unchanged(item, status, existing_kit.get('updated_at'))
+    else:
+        started = dynamodb.create_kit_if_absent(item)
+    if not started:
+        # An identical request started the same kit first
+        return {
+            'statusCode': 202,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                **cached_kit_response(dynamodb.get_kit(kit_id) or item, s3_client),
+                'message': 'Application kit in progress'
+            })
+        }
+    
+    boto3.client('lambda').invoke(
+        FunctionName=os.environ.get('BACKGROUND_KIT_FUNCTION'),
+        InvocationType='Event',  # Async invocation
+        Payload=json.dumps({
+            'kit_id': kit_id,
+            'job_id': job_id,
+            'resume_s3_key': resume_s3_key,
+            'user_context': user_context
+        })
+    )
+    
+    print(f"Started streaming kit {kit_id} for job {job_id}")
+    
+    return {
+        'statusCode': 202,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({
+            'kit_id': kit_id,
+            'cover_letter': '',
+            'resume_bullets': [],
+            'generation_status': 'generating',
+            'cached': False,
+            'message': f"Generating; poll /kits?kit_id={kit_id} for progress"
+        })
+    }
+
+
+def cached_kit_result(kit, s3_client):
+    """200 response for a kit that was already generated"""
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({
+            **cached_kit_response(kit, s3_client),
+            'message': 'Application kit already generated'
+        })
+    }
 
 
 def lambda_handler(event, context):
@@ -17,8 +127,16 @@ def lambda_handler(event, context):
     {
         "job_id": "job_123",
         "resume_s3_key": "resumes/demo_user/resume.pdf",
-        "user_context": "5 years Python experience, AWS expert..."
+        "user_context": "5 years Python experience, AWS expert...",
+        "stream": false
     }
+    
+    With "stream": true the kit is generated in the background and the
+    response is 202 with the kit_id and generation_status "generating";
+    GET /kits?kit_id=... returns the paragraphs and bullets written so far.
+    
+    Repeating a request with the same job, resume content and context
+    returns the existing kit ("cached": true) without generating again.
     """
     try:
         # Parse request
@@ -26,6 +144,7 @@ def lambda_handler(event, context):
         job_id = body.get('job_id')
         resume_s3_key = body.get('resume_s3_key')
         user_context = body.get('user_context', '')
+        stream = bool(body.get('stream', False))
         
         if not job_id or not resume_s3_key:
             return {
@@ -51,34 +170,37 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Job not found'})
             }
         
-        # For now, generate mock kit (Yutori integration would go here)
-        # In production, this would call Yutori API with job description + resume
-        cover_letter = generate_mock_cover_letter(
-            job_data.get('title'),
-            job_data.get('company'),
-            user_context
-        )
+        # Identical inputs map to the same kit; return it without regenerating
+        s3_client = create_storage_client()
+        resume_bytes = s3_client.get_resume(resume_s3_key)
+        resume_hash = resume_content_hash(resume_bytes)
+        
+        if stream:
+            return start_streaming_kit(dynamodb, s3_client, job_data, resume_s3_key,
+                                       resume_hash, user_context)
+        
+        kit_id = content_kit_id(job_data, resume_hash, user_context, backend=KIT_BACKEND)
         
-        resume_bullets = generate_mock_resume_bullets(
-            job_data.get('title'),
-            user_context
-        )
+        existing_kit = dynamodb.get_kit(kit_id)
+        if existing_kit and kit_is_complete(existing_kit):
+            print(f"Returning cached kit {kit_id} for job {job_id}")
+            return cached_kit_result(existing_kit, s3_client)
         
-        # Create kit ID
-        kit_id = hashlib.sha256(
-            f"{job_id}_{resume_s3_key}_{datetime.now().isoformat()}".encode()
-        ).hexdigest()[:16]
+        # Template letter with the resume's own bullets ranked for this job
+        bullet_bank = load_bullet_bank(s3_client, resume_hash, resume_bytes)
+        content = generate_kit_content(job_data, '', user_context, backend=KIT_BACKEND,
+                                       bullet_bank=bullet_bank)
         
-        # Create ApplicationKit model
-        kit = ApplicationKit(
-            kit_id=kit_id,
-            job_id=job_id,
-            cover_letter=cover_letter,
-            resume_bullets=resume_bullets
-        )
+        # Store the letter body in S3; DynamoDB keeps only the key
+        kit = build_kit(kit_id, job_id, content, s3_client)
         
-        # Save to DynamoDB
-        dynamodb.create_kit(kit.to_dynamodb())
+        # Save to DynamoDB; a concurrent identical request may have won the race
+        if not dynamodb.create_kit_unless_complete(kit.to_dynamodb()):
+            print(f"Kit {kit_id} for job {job_id} was stored first by another request")
+            winner = dynamodb.get_kit(kit_id, consistent_read=True)
+            if winner:
+                s3_client.delete_cover_letter(kit.cover_letter_s3_key)
+                return cached_kit_result(winner, s3_client)
         
         return {
             'statusCode': 200,
@@ -88,8 +210,10 @@ def lambda_handler(event, context):
             },
             'body': json.dumps({
                 'kit_id': kit_id,
-                'cover_letter': cover_letter,
-                'resume_bullets': resume_bullets,
+                'cover_letter': kit.cover_letter,
+                'cover_letter_s3_key': kit.cover_letter_s3_key,
+                'resume_bullets': kit.resume_bullets,
+                'cached': False,
                 'message': 'Application kit generated successfully'
             })
         }
@@ -107,31 +231,3 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-
-def generate_mock_cover_letter(job_title: str, company: str, user_context: str) -> str:
-    """Generate a mock cover letter based on job and user context"""
-    context_snippet = user_context[:100] if user_context else "my extensive background"
-    
-    return f"""Dear Hiring Manager,
-
-I am writing to express my strong interest in the {job_title} position at {company}. With {context_snippet}, I am confident in my ability to contribute effectively to your team.
-
-Throughout my career, I have developed a comprehensive skill set that aligns well with the requirements of this role. My experience has equipped me with strong technical abilities, problem-solving skills, and a collaborative mindset that would make me a valuable addition to {company}.
-
-I am particularly drawn to {company} because of its reputation for innovation and excellence in the industry. I am excited about the opportunity to bring my expertise to your team and contribute to your continued success.
-
-Thank you for considering my application. I look forward to the opportunity to discuss how my background and skills would benefit {company}.
-
-Sincerely,
-[Your Name]"""
-
-
-def generate_mock_resume_bullets(job_title: str, user_context: str) -> list:
-    """Generate mock resume bullets tailored to the job"""
-    return [
-        f"• Led development of scalable solutions resulting in 40% improvement in system performance and reliability",
-        f"• Collaborated with cross-functional teams to deliver high-impact projects aligned with {job_title} responsibilities",
-        f"• Implemented best practices and modern technologies to enhance product quality and user experience",
-        f"• Mentored junior team members and contributed to knowledge sharing initiatives",
-        f"• Demonstrated strong problem-solving abilities in fast-paced, dynamic environments"
-    ]
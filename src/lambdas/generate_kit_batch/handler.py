@@ -0,0 +1,122 @@
+"""
+Lambda function to generate application kits for many jobs (async pattern)
+"""
+import json
+import os
+import hashlib
+from datetime import datetime
+import boto3
+
+from shared.dynamodb_utils import DynamoDBClient
+
+
+MAX_BATCH_JOBS = int(os.environ.get('KIT_BATCH_MAX_JOBS', 100))
+
+
+def lambda_handler(event, context):
+    """
+    Create a batch kit generation task and trigger background processing
+    
+    Request body:
+    {
+        "job_ids": ["job_123", "job_456", ...],
+        "resume_s3_key": "resumes/demo_user/resume.pdf",
+        "user_context": "5 years Python experience, AWS expert..."
+    }
+    
+    Returns immediately with task_id; the task result lists the generated
+    kits and any jobs that failed:
+    {
+        "task_id": "...",
+        "status": "pending",
+        "job_count": 2
+    }
+    """
+    try:
+        # Parse request
+        body = json.loads(event.get('body', '{}'))
+        job_ids = list(dict.fromkeys(body.get('job_ids') or []))
+        resume_s3_key = body.get('resume_s3_key')
+        user_context = body.get('user_context', '')
+        
+        if not job_ids or not resume_s3_key:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'job_ids and resume_s3_key are required'})
+            }
+        
+        if len(job_ids) > MAX_BATCH_JOBS:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': f'At most {MAX_BATCH_JOBS} job_ids per batch'})
+            }
+        
+        # Create task ID
+        task_id = hashlib.sha256(
+            f"kit_batch_{resume_s3_key}_{datetime.now().isoformat()}".encode()
+        ).hexdigest()[:16]
+        
+        dynamodb = DynamoDBClient()
+        dynamodb.create_task({
+            'task_id': task_id,
+            'task_type': 'kit_batch',
+            'user_id': 'demo_user',
+            'status': 'pending',
+            'job_ids': job_ids,
+            'resume_s3_key': resume_s3_key,
+            'created_at': int(datetime.now().timestamp()),
+            'updated_at': int(datetime.now().timestamp())
+        })
+        
+        # Invoke background Lambda asynchronously
+        lambda_client = boto3.client('lambda')
+        lambda_client.invoke(
+            FunctionName=os.environ.get('BACKGROUND_KIT_BATCH_FUNCTION'),
+            InvocationType='Event',  # Async invocation
+            Payload=json.dumps({
+                'task_id': task_id,
+                'job_ids': job_ids,
+                'resume_s3_key': resume_s3_key,
+                'user_context': user_context
+            })
+        )
+        
+        print(f"Created kit batch task {task_id} for {len(job_ids)} jobs")
+        
+        return {
+            'statusCode': 202,  # Accepted
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'task_id': task_id,
+                'status': 'pending',
+                'job_count': len(job_ids),
+                'message': 'Kit batch created. Poll /tasks/{task_id} for results.'
+            })
+        }
+    
+    except Exception as e:
+        print(f"Error in generate_kit_batch: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': str(e),
+                'message': 'Failed to create kit batch'
+            })
+        }
@@ -0,0 +1,195 @@
+"""
+Application kit content generation shared by the single and batch endpoints
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, Iterator, List, Optional
+
+from .bullet_bank import MIN_BULLETS, BulletBank, format_bullet
+from .kit_templates import default_templates, render_kits
+from .models import ApplicationKit
+from .s3_utils import S3Client
+from .yutori_client import YutoriClient
+
+
+# Bump when prompts or post-processing change so cached kits are regenerated
+GENERATOR_VERSION = 3
+
+
+def kit_backend() -> str:
+    """Configured kit generator: 'yutori' (default) or 'mock' (templates)"""
+    return os.environ.get('KIT_BACKEND', 'yutori')
+
+
+def job_fingerprint(job: Dict[str, Any]) -> str:
+    """Hash of the job fields that feed generation"""
+    fields = {name: job.get(name) or ''
+              for name in ('job_id', 'title', 'company', 'location', 'description', 'url')}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def content_kit_id(job: Dict[str, Any], resume_hash: str, user_context: str,
+                   backend: Optional[str] = None) -> str:
+    """
+    Deterministic kit ID for a generation input
+
+    The same job content, resume content, context and generator always map
+    to the same kit, so an existing kit under this ID can be returned as is.
+
+    Args:
+        resume_hash: sha256 hex digest of the resume file
+    """
+    backend = backend or kit_backend()
+    generator = f"{backend}:v{GENERATOR_VERSION}"
+    if backend == 'mock':
+        # Template edits change the output, so they get new kits
+        generator += f":{default_templates().fingerprint}"
+    key = '|'.join([
+        job_fingerprint(job),
+        resume_hash,
+        hashlib.sha256((user_context or '').strip().encode('utf-8')).hexdigest(),
+        generator
+    ])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+
+def resume_content_hash(resume_bytes: bytes) -> str:
+    """Hash of a resume file's bytes, used in kit cache keys"""
+    return hashlib.sha256(resume_bytes).hexdigest()
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Text a job is matched on: its title and description"""
+    return f"{job.get('title') or ''}\n{job.get('description') or ''}"
+
+
+def apply_bullet_bank(contents: List[Dict[str, Any]], jobs: List[Dict[str, Any]],
+                      bank: Optional[BulletBank]) -> List[Dict[str, Any]]:
+    """
+    Swap template bullets for the resume's own bullets ranked for each job
+
+    All jobs are ranked in one batch. Contents are left as they are when
+    the resume yields fewer than MIN_BULLETS bullets.
+    """
+    if bank is None or len(bank) < MIN_BULLETS:
+        return contents
+    ranked = bank.rank_many([job_text(job) for job in jobs])
+    for content, bullets in zip(contents, ranked):
+        content['resume_bullets'] = [format_bullet(text) for text, _ in bullets]
+    return contents
+
+
+def generate_kit_content(job: Dict[str, Any], resume_text: str, user_context: str = '',
+                         yutori: Optional[YutoriClient] = None,
+                         backend: Optional[str] = None,
+                         bullet_bank: Optional[BulletBank] = None) -> Dict[str, Any]:
+    """
+    Generate the cover letter and resume bullets for one job
+
+    Uses Yutori unless the backend (KIT_BACKEND by default) is 'mock', in
+    which case the letter comes from the templates and the bullets from
+    bullet_bank when given.
+
+    Returns:
+        Dict with 'cover_letter' and 'resume_bullets'
+    """
+    if (backend or kit_backend()) == 'mock':
+        return apply_bullet_bank(render_kits([(job, user_context)]), [job], bullet_bank)[0]
+
+    resume = f"{resume_text}\n\nAdditional context: {user_context}" if user_context else resume_text
+    return (yutori or YutoriClient()).generate_application_kit(
+        job.get('description', ''),
+        resume,
+        job.get('title', ''),
+        job.get('company', '')
+    )
+
+
+def stream_kit_content(job: Dict[str, Any], resume_text: str, user_context: str = '',
+                       yutori: Optional[YutoriClient] = None,
+                       backend: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """
+    generate_kit_content() as a stream of paragraph and bullet events
+
+    Yields {'type': 'paragraph' | 'bullet', 'text': ...} in generation order.
+    """
+    if (backend or kit_backend()) == 'mock':
+        content = generate_kit_content(job, resume_text, user_context, backend='mock')
+        for paragraph in content['cover_letter'].split('\n\n'):
+            yield {'type': 'paragraph', 'text': paragraph.strip()}
+        for bullet in content['resume_bullets']:
+            yield {'type': 'bullet', 'text': bullet}
+        return
+
+    resume = f"{resume_text}\n\nAdditional context: {user_context}" if user_context else resume_text
+    yield from (yutori or YutoriClient()).stream_application_kit(
+        job.get('description', ''),
+        resume,
+        job.get('title', ''),
+        job.get('company', '')
+    )
+
+
+def pending_kit_item(kit_id: str, job_id: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Placeholder kit record for a streaming generation
+
+    The worker fills partial_cover_letter and resume_bullets as text
+    arrives, then replaces the record with the finished kit.
+    """
+    now = int(time.time())
+    return {
+        'kit_id': kit_id,
+        'job_id': job_id,
+        'user_id': 'demo_user',
+        'generation_status': 'generating',
+        'partial_cover_letter': '',
+        'resume_bullets': [],
+        'cover_letter_s3_key': '',
+        'created_at': now,
+        'updated_at': now,
+        'metadata': metadata or {}
+    }
+
+
+def kit_is_complete(kit: Dict[str, Any]) -> bool:
+    """Whether a stored kit is finished (kits from before streaming have no status)"""
+    return kit.get('generation_status', 'complete') == 'complete'
+
+
+def build_kit(kit_id: str, job_id: str, content: Dict[str, Any],
+              storage: S3Client, metadata: Optional[Dict[str, Any]] = None) -> ApplicationKit:
+    """Store the cover letter in S3 and return the kit model to persist"""
+    # Store the letter body in S3; DynamoDB keeps only the key
+    cover_letter_s3_key = storage.upload_cover_letter(content['cover_letter'], job_id, kit_id)
+
+    return ApplicationKit(
+        kit_id=kit_id,
+        job_id=job_id,
+        cover_letter=content['cover_letter'],
+        resume_bullets=content['resume_bullets'],
+        cover_letter_s3_key=cover_letter_s3_key,
+        metadata=metadata
+    )
+
+
+def cached_kit_response(kit: Dict[str, Any], storage: S3Client) -> Dict[str, Any]:
+    """
+    Response fields for an existing kit, reading the letter back from S3
+
+    Kits still being streamed return the text generated so far.
+    """
+    cover_letter = kit.get('cover_letter', kit.get('partial_cover_letter'))
+    if cover_letter is None and kit.get('cover_letter_s3_key'):
+        cover_letter = storage.get_cover_letter(kit['cover_letter_s3_key'],
+                                                kit.get('cover_letter_archive'))
+    return {
+        'kit_id': kit['kit_id'],
+        'cover_letter': cover_letter or '',
+        'cover_letter_s3_key': kit.get('cover_letter_s3_key', ''),
+        'resume_bullets': kit.get('resume_bullets', []),
+        'generation_status': kit.get('generation_status', 'complete'),
+        'cached': True
+    }
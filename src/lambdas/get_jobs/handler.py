@@ -1,55 +1,168 @@
 """
-Lambda function to upload resume
+Lambda function to list saved jobs
 """
 import json
-import base64
+import time
+from decimal import Decimal
 
-from shared.s3_utils import S3Client
+from shared.dynamodb_utils import DynamoDBClient
+from shared.keyword_index import INDEX_REFRESH_SECONDS, index_jobs_for_search, load_keyword_index
+from shared.kit_generation import resume_content_hash
+from shared.relevance import load_relevance_index, update_relevance_index
+from shared.resume_text import load_resume_text
+from shared.s3_utils import create_storage_client
+
+
+USER_ID = 'demo_user'
+MAX_LIMIT = 100
+
+# Recent jobs checked against the indexes on each search or ranked listing
+INDEX_CATCH_UP = 100
+
+# When this container last checked the keyword index for missing jobs
+_keywords_checked_at = 0.0
+
+
+class DecimalEncoder(json.JSONEncoder):
+    """Helper class to convert DynamoDB Decimal types to JSON"""
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj % 1 == 0 else float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+
+def fetch_page(dynamodb, ranked, status, limit, offset):
+    """
+    Read one page of jobs, in ranked order, from (job_id, score) pairs
+    
+    Jobs are fetched 100 at a time until the page is filled, so only the
+    jobs around the requested page are read from DynamoDB.
+    """
+    jobs = []
+    wanted = offset + limit
+    for start in range(0, len(ranked), MAX_LIMIT):
+        chunk = ranked[start:start + MAX_LIMIT]
+        found = dynamodb.get_jobs_batch([job_id for job_id, _ in chunk])
+        for job_id, score in chunk:
+            job = found.get(job_id)
+            if job and (not status or job.get('status') == status):
+                if score is not None:
+                    job['relevance_score'] = round(score, 4)
+                jobs.append(job)
+        if len(jobs) >= wanted:
+            break
+    return jobs[offset:wanted]
+
+
+def search_job_ids(dynamodb, storage, query):
+    """
+    Job IDs matching every keyword in query, newest first
+    
+    The index stays in memory between warm invocations, so a lookup
+    doesn't touch S3 or DynamoDB. Once per refresh interval, recent jobs
+    missing from the index (e.g. if an index update failed) are added.
+    """
+    global _keywords_checked_at
+    
+    index = load_keyword_index(storage, USER_ID)
+    if time.monotonic() - _keywords_checked_at >= INDEX_REFRESH_SECONDS:
+        recent = dynamodb.list_jobs(USER_ID, limit=INDEX_CATCH_UP)
+        if any(job['job_id'] not in index for job in recent):
+            # Oldest first, so newer jobs get later index positions
+            index_jobs_for_search(storage, reversed(recent), USER_ID)
+            index = load_keyword_index(storage, USER_ID)
+        _keywords_checked_at = time.monotonic()
+    
+    started = time.perf_counter()
+    job_ids = index.search(query)
+    print(f"Keyword search {query!r}: {len(job_ids)} matches in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    return job_ids
+
+
+def rank_by_fit(dynamodb, storage, resume_s3_key, candidates=None):
+    """
+    Rank all of the user's jobs (or just candidates) against a resume
+    
+    Every indexed job is scored in one pass. Recent jobs missing from the
+    index are added first. The resume's text is stored by content hash,
+    so the PDF is parsed once rather than on every ranked listing.
+    """
+    index = load_relevance_index(storage, USER_ID)
+    recent = dynamodb.list_jobs(USER_ID, limit=INDEX_CATCH_UP)
+    if any(job['job_id'] not in index for job in recent):
+        index, _ = update_relevance_index(storage, recent, USER_ID)
+    
+    resume_bytes = storage.get_resume(resume_s3_key)
+    resume_text = load_resume_text(storage, resume_content_hash(resume_bytes), resume_bytes)
+    ranked = index.rank(resume_text)
+    if candidates is not None:
+        ranked = [(job_id, score) for job_id, score in ranked if job_id in candidates]
+    return ranked
 
 
 def lambda_handler(event, context):
     """
-    Upload resume to S3
+    List saved jobs
     
-    Request body:
-    {
-        "filename": "resume.pdf",
-        "content": "base64_encoded_pdf"
-    }
+    Query parameters:
+        status: Only jobs with this status (e.g. "saved")
+        limit: Page size (default 20, max 100)
+        offset: Jobs to skip (default 0)
+        q: Keywords that must all appear in the title, company, location
+            or description
+        sort: "recent" (default) or "fit" to rank by relevance to a resume
+        resume_s3_key: Resume to rank against (default: latest upload)
     """
     try:
-        # Parse request
-        body = json.loads(event.get('body', '{}'))
-        filename = body.get('filename', 'resume.pdf')
-        
-        # Support both 'content' and 'file_content' for backwards compatibility
-        file_content_b64 = body.get('content') or body.get('file_content')
-        content_type = body.get('content_type', 'application/pdf')
+        params = event.get('queryStringParameters') or {}
+        status = params.get('status')
+        limit = min(max(int(params.get('limit', 20)), 1), MAX_LIMIT)
+        offset = max(int(params.get('offset', 0)), 0)
+        sort = params.get('sort', 'recent')
+        query = (params.get('q') or '').strip()
         
-        if not file_content_b64:
+        if sort not in ('recent', 'fit'):
             return {
                 'statusCode': 400,
                 'headers': {
                     'Content-Type': 'application/json',
                     'Access-Control-Allow-Origin': '*'
                 },
-                'body': json.dumps({'error': 'content or file_content is required'})
+                'body': json.dumps({'error': 'sort must be "recent" or "fit"'})
             }
         
-        # Decode base64
-        file_content = base64.b64decode(file_content_b64)
+        dynamodb = DynamoDBClient()
+        storage = create_storage_client()
+        result = {'sort': sort}
         
-        # Initialize S3 client
-        s3_client = S3Client()
+        matches = None
+        if query:
+            matches = search_job_ids(dynamodb, storage, query)
+            result['query'] = query
+            result['total_matches'] = len(matches)
         
-        # Upload resume
-        s3_key = s3_client.upload_resume(
-            file_content=file_content,
-            content_type=content_type
-        )
-        
-        # Generate presigned URL
-        url = s3_client.get_presigned_url(s3_key)
+        if sort == 'fit':
+            resume_s3_key = params.get('resume_s3_key') or next(
+                iter(storage.list_user_resumes(USER_ID, limit=1)), None
+            )
+            if not resume_s3_key:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'error': 'Upload a resume to sort jobs by fit'})
+                }
+            ranked = rank_by_fit(dynamodb, storage, resume_s3_key,
+                                 set(matches) if matches is not None else None)
+            result['total_ranked'] = len(ranked)
+            jobs = fetch_page(dynamodb, ranked, status, limit, offset)
+        elif matches is not None:
+            jobs = fetch_page(dynamodb, [(job_id, None) for job_id in matches], status, limit, offset)
+        else:
+            jobs = dynamodb.list_jobs(USER_ID, limit=offset + limit, status=status)[offset:]
         
         return {
             'statusCode': 200,
@@ -58,17 +171,21 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Origin': '*'
             },
             'body': json.dumps({
-                's3_key': s3_key,
-                'filename': filename,
-                'url': url,
-                'message': 'Resume uploaded successfully'
-            })
+                'jobs': jobs,
+                'count': len(jobs),
+                **result
+            }, cls=DecimalEncoder)
         }
     
     except Exception as e:
-        print(f"Error in upload_resume: {str(e)}")
+        print(f"Error in get_jobs: {str(e)}")
+        import traceback
+        traceback.print_exc()
         return {
             'statusCode': 500,
-            'headers': {'Content-Type': 'application/json'},
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
             'body': json.dumps({'error': str(e)})
         }
@@ -0,0 +1,301 @@
+"""
+Filesystem-backed artifact storage for self-hosted deployments
+
+Drop-in replacement for S3Client that keeps the same key layout under a
+local directory. Select it with STORAGE_BACKEND=filesystem; serve presigned
+URLs with:
+
+    python -m shared.local_storage --port 8081
+"""
+import argparse
+import fcntl
+import hashlib
+import hmac
+import json
+import mmap
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, Iterator, List, Tuple, Union, BinaryIO
+from urllib.parse import urlparse, parse_qs, quote, unquote
+
+from .s3_utils import S3Client, DEFAULT_CHUNK_SIZE
+
+
+META_DIR = '.meta'
+DEFAULT_ROOT = '/var/lib/jobscoutai/artifacts'
+DEFAULT_BASE_URL = 'http://localhost:8081'
+
+
+class FilesystemS3Client(S3Client):
+    """S3Client implementation that stores artifacts on local disk"""
+
+    def __init__(self, root: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 secret: Optional[str] = None):
+        self.s3 = None
+        self.bucket_name = 'local'
+        self.object_cache = None  # Reads are already local; no /tmp copy needed
+        self.root = os.path.abspath(root or os.environ.get('LOCAL_STORAGE_ROOT', DEFAULT_ROOT))
+        self.base_url = (base_url or os.environ.get('LOCAL_STORAGE_BASE_URL', DEFAULT_BASE_URL)).rstrip('/')
+        secret = secret or os.environ.get('LOCAL_STORAGE_SECRET')
+        if not secret:
+            raise ValueError("LOCAL_STORAGE_SECRET not configured")
+        self.secret = secret.encode('utf-8')
+        os.makedirs(os.path.join(self.root, META_DIR), exist_ok=True)
+
+    def _path(self, s3_key: str) -> str:
+        """Resolve a key to a path, rejecting keys that escape the root"""
+        path = os.path.abspath(os.path.join(self.root, s3_key))
+        if not path.startswith(self.root + os.sep) or s3_key.startswith(META_DIR + '/'):
+            raise ValueError(f"Invalid key: {s3_key}")
+        return path
+
+    def _meta_path(self, s3_key: str) -> str:
+        return os.path.join(self.root, META_DIR, f"{s3_key}.json")
+
+    @staticmethod
+    def _atomic_write(path: str, chunks) -> None:
+        """Write to a temp file in the target directory, then rename over"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def get_metadata(self, s3_key: str) -> Dict[str, Any]:
+        """Return stored content type, user metadata, size and ETag for a key"""
+        self._path(s3_key)
+        with open(self._meta_path(s3_key)) as f:
+            return json.load(f)
+
+    # Storage primitives
+    def _put_object(self, s3_key: str, body: Union[bytes, BinaryIO],
+                    content_type: str,
+                    metadata: Optional[Dict[str, str]] = None) -> None:
+        path = self._path(s3_key)
+        digest = hashlib.md5()
+        size = 0
+
+        if isinstance(body, (bytes, bytearray)):
+            chunks = [body]
+        else:
+            chunks = iter(lambda: body.read(DEFAULT_CHUNK_SIZE), b'')
+
+        def counted():
+            nonlocal size
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+
+        self._atomic_write(path, counted())
+        self._atomic_write(self._meta_path(s3_key), [json.dumps({
+            'content_type': content_type,
+            'metadata': metadata or {},
+            'size': size,
+            'etag': f'"{digest.hexdigest()}"',
+            'last_modified': int(os.path.getmtime(path))
+        }).encode('utf-8')])
+
+    @contextmanager
+    def _key_lock(self, s3_key: str) -> Iterator[None]:
+        """Exclusive lock on one key, held across a conditional read or write"""
+        lock_path = self._meta_path(s3_key) + '.lock'
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _put_object_if(self, s3_key: str, body: bytes, content_type: str,
+                       etag: Optional[str]) -> bool:
+        with self._key_lock(s3_key):
+            try:
+                current = self.get_metadata(s3_key)['etag']
+            except FileNotFoundError:
+                current = None
+            if current != etag:
+                return False
+            self._put_object(s3_key, body, content_type)
+            return True
+
+    def _get_with_etag(self, s3_key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        with self._key_lock(s3_key):
+            try:
+                with open(self._path(s3_key), 'rb') as f:
+                    data = f.read()
+                return data, self.get_metadata(s3_key)['etag']
+            except FileNotFoundError:
+                return None, None
+
+    def _get_optional(self, s3_key: str) -> Optional[bytes]:
+        try:
+            with self.open_cached(s3_key) as mapped:
+                return bytes(mapped)
+        except FileNotFoundError:
+            return None
+
+    def _delete_objects(self, s3_keys: List[str]) -> None:
+        for s3_key in s3_keys:
+            for path in (self._path(s3_key), self._meta_path(s3_key)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _list_prefix(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        for key in self._iter_keys(prefix):
+            stat = os.stat(self._path(key))
+            yield {
+                'key': key,
+                'size': stat.st_size,
+                'last_modified': int(stat.st_mtime)
+            }
+
+    def _iter_keys(self, prefix: str) -> Iterator[str]:
+        """Yield keys under a prefix in lexicographic order, like S3"""
+        base = os.path.join(self.root, os.path.dirname(prefix))
+        if not os.path.isdir(base):
+            return
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if d != META_DIR)
+            keys = []
+            for name in filenames:
+                if name.startswith('.tmp-'):
+                    continue
+                key = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    keys.append(key)
+            yield from sorted(keys)
+
+    # Reads
+    def iter_object(self, s3_key: str,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(s3_key), 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                yield chunk
+
+    def get_object_range(self, s3_key: str, start: int,
+                         end: Optional[int] = None) -> bytes:
+        if start < 0 or (end is not None and end < start):
+            raise ValueError(f"Invalid byte range: {start}-{end}")
+        with self.open_cached(s3_key) as mapped:
+            return bytes(mapped[start:None if end is None else end + 1])
+
+    def get_object_cached(self, s3_key: str) -> bytes:
+        try:
+            with self.open_cached(s3_key) as mapped:
+                return bytes(mapped)
+        except FileNotFoundError:
+            from .compaction import ArchiveStore
+            archived = ArchiveStore(self).read(s3_key)
+            if archived is None:
+                raise
+            return archived
+
+    @contextmanager
+    def open_cached(self, s3_key: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        with open(self._path(s3_key), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapped
+            finally:
+                mapped.close()
+
+    def list_user_resumes_page(self, user_id: str = "demo_user",
+                               page_size: int = 100,
+                               continuation_token: Optional[str] = None) -> Dict[str, Any]:
+        keys = []
+        next_token = None
+        for key in self._iter_keys(f"resumes/{user_id}/"):
+            if continuation_token and key <= continuation_token:
+                continue
+            if len(keys) == page_size:
+                next_token = keys[-1]
+                break
+            keys.append(key)
+        return {'keys': keys, 'next_token': next_token}
+
+    # Presigned-style access
+    def _sign(self, s3_key: str, expires: int) -> str:
+        message = f"{s3_key}\n{expires}".encode('utf-8')
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def get_presigned_url(self, s3_key: str, expiration: int = 3600) -> str:
+        """Generate an HMAC-signed URL served by this module's HTTP server"""
+        expires = int(time.time()) + expiration
+        signature = self._sign(s3_key, expires)
+        return f"{self.base_url}/{quote(s3_key)}?expires={expires}&signature={signature}"
+
+    def verify_presigned(self, s3_key: str, expires: int, signature: str) -> bool:
+        """Check a presigned token's signature and expiry"""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._sign(s3_key, expires), signature)
+
+
+def _make_handler(client: FilesystemS3Client):
+    class PresignedObjectHandler(BaseHTTPRequestHandler):
+        """Serve objects for valid presigned URLs"""
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            s3_key = unquote(parsed.path.lstrip('/'))
+            params = parse_qs(parsed.query)
+            try:
+                expires = int(params['expires'][0])
+                signature = params['signature'][0]
+            except (KeyError, ValueError):
+                self.send_error(400, 'Missing or invalid token')
+                return
+
+            if not client.verify_presigned(s3_key, expires, signature):
+                self.send_error(403, 'Invalid or expired token')
+                return
+
+            try:
+                meta = client.get_metadata(s3_key)
+                with client.open_cached(s3_key) as mapped:
+                    self.send_response(200)
+                    self.send_header('Content-Type', meta.get('content_type', 'application/octet-stream'))
+                    self.send_header('Content-Length', str(len(mapped)))
+                    self.send_header('ETag', meta.get('etag', ''))
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                    self.end_headers()
+                    self.wfile.write(mapped)
+            except (FileNotFoundError, ValueError):
+                self.send_error(404, 'Not found')
+
+    return PresignedObjectHandler
+
+
+def serve(host: str = '0.0.0.0', port: int = 8081) -> None:
+    """Run a threaded HTTP server for presigned artifact URLs"""
+    client = FilesystemS3Client()
+    server = ThreadingHTTPServer((host, port), _make_handler(client))
+    print(f"Serving artifacts from {client.root} on {host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve local artifacts for presigned URLs')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8081)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -1,56 +1,82 @@
 """
-Lambda function to upload resume
+Lambda function to list application kits
 """
 import json
-import base64
+from decimal import Decimal
 
-from shared.s3_utils import S3Client
+from shared.dynamodb_utils import DynamoDBClient
+from shared.s3_utils import create_storage_client
+
+
+class DecimalEncoder(json.JSONEncoder):
+    """Helper class to convert DynamoDB Decimal types to JSON"""
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj % 1 == 0 else float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+
+def hydrate_kit(kit, s3_client, include_body: bool):
+    """
+    Attach cover letter access to a kit item
+
+    Kits store only the cover letter's S3 key; callers get a presigned URL,
+    and the body itself is fetched only when include_body is requested.
+    Older kits with an inline cover_letter, and kits still streaming
+    (generation_status "generating", text so far in partial_cover_letter),
+    are returned unchanged. Letters compacted into an archive have no
+    object of their own to presign, so their body is always inlined.
+    """
+    s3_key = kit.get('cover_letter_s3_key')
+    if not s3_key:
+        return kit
+
+    archive_location = kit.pop('cover_letter_archive', None)
+    if archive_location:
+        kit['cover_letter'] = s3_client.get_cover_letter(s3_key, archive_location)
+        return kit
+
+    kit['cover_letter_url'] = s3_client.get_presigned_url(s3_key)
+    if include_body:
+        kit['cover_letter'] = s3_client.get_cover_letter(s3_key)
+    return kit
 
 
 def lambda_handler(event, context):
     """
-    Upload resume to S3
-    
-    Request body:
-    {
-        "filename": "resume.pdf",
-        "content": "base64_encoded_pdf"
-    }
+    List application kits
+
+    Query parameters:
+        job_id: List kits for a job
+        kit_id: Get a single kit
+        include_body: "true" to inline cover letter text (default: URL only)
     """
     try:
-        # Parse request
-        body = json.loads(event.get('body', '{}'))
-        filename = body.get('filename', 'resume.pdf')
-        
-        # Support both 'content' and 'file_content' for backwards compatibility
-        file_content_b64 = body.get('content') or body.get('file_content')
-        content_type = body.get('content_type', 'application/pdf')
-        
-        if not file_content_b64:
+        params = event.get('queryStringParameters') or {}
+        job_id = params.get('job_id')
+        kit_id = params.get('kit_id')
+        include_body = params.get('include_body', 'false').lower() == 'true'
+
+        if not job_id and not kit_id:
             return {
                 'statusCode': 400,
                 'headers': {
                     'Content-Type': 'application/json',
                     'Access-Control-Allow-Origin': '*'
                 },
-                'body': json.dumps({'error': 'content or file_content is required'})
+                'body': json.dumps({'error': 'job_id or kit_id is required'})
             }
-        
-        # Decode base64
-        file_content = base64.b64decode(file_content_b64)
-        
-        # Initialize S3 client
-        s3_client = S3Client()
-        
-        # Upload resume
-        s3_key = s3_client.upload_resume(
-            file_content=file_content,
-            content_type=content_type
-        )
-        
-        # Generate presigned URL
-        url = s3_client.get_presigned_url(s3_key)
-        
+
+        dynamodb = DynamoDBClient()
+        if kit_id:
+            kit = dynamodb.get_kit(kit_id)
+            kits = [kit] if kit else []
+        else:
+            kits = dynamodb.get_kits_by_job(job_id)
+
+        s3_client = create_storage_client()
+        kits = [hydrate_kit(kit, s3_client, include_body) for kit in kits]
+
         return {
             'statusCode': 200,
             'headers': {
@@ -58,17 +84,20 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Origin': '*'
             },
             'body': json.dumps({
-                's3_key': s3_key,
-                'filename': filename,
-                'url': url,
-                'message': 'Resume uploaded successfully'
-            })
+                'kits': kits,
+                'count': len(kits)
+            }, cls=DecimalEncoder)
         }
-    
+
     except Exception as e:
-        print(f"Error in upload_resume: {str(e)}")
+        print(f"Error in get_kits: {str(e)}")
+        import traceback
+        traceback.print_exc()
         return {
             'statusCode': 500,
-            'headers': {'Content-Type': 'application/json'},
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
             'body': json.dumps({'error': str(e)})
         }
@@ -0,0 +1,200 @@
+"""
+Inverted keyword index over a user's saved jobs
+"""
+import json
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from .text_vectors import np, tokenize
+
+
+INDEX_NAME = 'job-keywords.bin'
+INDEX_MAGIC = b'KWX1'
+INDEXED_FIELDS = ('title', 'company', 'location', 'description')
+
+# Warm containers reuse a loaded index for this long before re-reading S3
+INDEX_REFRESH_SECONDS = 30
+
+
+class KeywordIndex:
+    """
+    Term -> job postings over title, company, location and description
+
+    Jobs are numbered in the order they are indexed, so appending a job
+    keeps every posting list sorted. The serialized form is the job IDs
+    and terms as a JSON header followed by two flat uint32 arrays (posting
+    offsets and postings); posting lists are only materialized for the
+    terms a query or update touches.
+    """
+
+    def __init__(self):
+        self.job_ids: List[str] = []
+        self.terms: Dict[str, int] = {}
+        self._positions: Dict[str, int] = {}
+        self._offsets = array('I', [0])
+        self._postings_blob = array('I')
+        self._postings: List[Optional[array]] = []
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._positions
+
+    def add(self, job: Dict[str, Any]) -> bool:
+        """Index a job; returns False if it is already indexed"""
+        job_id = job['job_id']
+        if job_id in self._positions:
+            return False
+
+        doc = len(self.job_ids)
+        self._positions[job_id] = doc
+        self.job_ids.append(job_id)
+        text = '\n'.join(str(job.get(field) or '') for field in INDEXED_FIELDS)
+        for term in set(tokenize(text)):
+            term_no = self.terms.get(term)
+            if term_no is None:
+                term_no = self.terms[term] = len(self._postings)
+                self._postings.append(array('I'))
+            self._posting_list(term_no).append(doc)
+        return True
+
+    def add_many(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Index jobs not yet indexed; returns how many were added"""
+        return sum(1 for job in jobs if self.add(job))
+
+    def search(self, query: str) -> List[str]:
+        """
+        Job IDs containing every query term, most recently indexed first
+
+        Returns all jobs for a query with no searchable terms.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return list(reversed(self.job_ids))
+
+        postings = []
+        for term in terms:
+            term_no = self.terms.get(term)
+            if term_no is None:
+                return []
+            postings.append(self._posting_list(term_no))
+
+        # Intersect starting from the rarest term
+        postings.sort(key=len)
+        if np is not None:
+            docs = np.frombuffer(postings[0], dtype=np.uint32)
+            for posting in postings[1:]:
+                docs = np.intersect1d(docs, np.frombuffer(posting, dtype=np.uint32), assume_unique=True)
+                if not len(docs):
+                    return []
+            return [self.job_ids[doc] for doc in docs[::-1].tolist()]
+
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches.intersection_update(posting)
+            if not matches:
+                return []
+        return [self.job_ids[doc] for doc in sorted(matches, reverse=True)]
+
+    def _posting_list(self, term_no: int) -> array:
+        posting = self._postings[term_no]
+        if posting is None:
+            posting = self._postings[term_no] = \
+                self._postings_blob[self._offsets[term_no]:self._offsets[term_no + 1]]
+        return posting
+
+    def to_bytes(self) -> bytes:
+        """Magic, header length, JSON header, posting offsets, postings"""
+        terms = sorted(self.terms, key=self.terms.get)
+        header = json.dumps({'job_ids': self.job_ids, 'terms': terms},
+                            separators=(',', ':')).encode('utf-8')
+
+        offsets, postings = array('I', [0]), array('I')
+        for term_no in range(len(terms)):
+            postings.extend(self._posting_list(term_no))
+            offsets.append(len(postings))
+
+        parts = [INDEX_MAGIC, struct.pack('<I', len(header)), header]
+        for values in (offsets, postings):
+            if sys.byteorder != 'little':
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'KeywordIndex':
+        if data[:4] != INDEX_MAGIC:
+            raise ValueError('Not a keyword index')
+        header_length = struct.unpack('<I', data[4:8])[0]
+        header = json.loads(data[8:8 + header_length].decode('utf-8'))
+
+        index = cls()
+        index.job_ids = header['job_ids']
+        index._positions = {job_id: doc for doc, job_id in enumerate(index.job_ids)}
+        index.terms = {term: term_no for term_no, term in enumerate(header['terms'])}
+
+        position = 8 + header_length
+        offsets_size = 4 * (len(index.terms) + 1)
+        index._offsets = array('I')
+        index._offsets.frombytes(data[position:position + offsets_size])
+        index._postings_blob = array('I')
+        index._postings_blob.frombytes(data[position + offsets_size:])
+        if sys.byteorder != 'little':
+            index._offsets.byteswap()
+            index._postings_blob.byteswap()
+        index._postings = [None] * len(index.terms)
+        return index
+
+
+_loaded: Dict[str, Tuple[float, KeywordIndex]] = {}
+
+
+def _parse_index(data: Optional[bytes], user_id: str) -> KeywordIndex:
+    if data is not None:
+        try:
+            return KeywordIndex.from_bytes(data)
+        except ValueError as e:
+            print(f"Discarding keyword index for {user_id}: {str(e)}")
+    return KeywordIndex()
+
+
+def load_keyword_index(storage, user_id: str = 'demo_user',
+                       max_age: float = INDEX_REFRESH_SECONDS) -> KeywordIndex:
+    """
+    A user's keyword index, kept in memory across warm invocations
+
+    Re-read from storage once it is older than max_age; pass 0 to force a
+    fresh read.
+    """
+    cached = _loaded.get(user_id)
+    if cached and time.monotonic() - cached[0] < max_age:
+        return cached[1]
+
+    index = _parse_index(storage.get_user_index(user_id, INDEX_NAME), user_id)
+    _loaded[user_id] = (time.monotonic(), index)
+    return index
+
+
+def index_jobs_for_search(storage, jobs: Iterable[Dict[str, Any]], user_id: str = 'demo_user') -> int:
+    """
+    Add newly saved jobs to the user's keyword index; returns how many were added
+
+    The index is rewritten with a conditional put and the jobs re-added
+    on a conflict, so concurrent searches, webhooks and listings don't
+    overwrite each other's additions.
+    """
+    jobs = list(jobs)
+    updated: Dict[str, Any] = {}
+
+    def add(data: Optional[bytes]) -> Optional[bytes]:
+        index = _parse_index(data, user_id)
+        updated['index'], updated['added'] = index, index.add_many(jobs)
+        return index.to_bytes() if updated['added'] else None
+
+    storage.update_user_index(user_id, INDEX_NAME, add)
+    _loaded[user_id] = (time.monotonic(), updated['index'])
+    return updated['added']
@@ -0,0 +1,234 @@
+"""
+Precompiled cover letter and resume bullet templates
+
+Templates use str.format fields ({job_title}, {company}, {location},
+{context}, {name}). Each template is parsed and validated once per
+container; rendering is a single format_map call, so a whole batch of
+fallback kits renders in milliseconds.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+
+
+TEMPLATE_FIELDS = frozenset({'job_title', 'company', 'location', 'context', 'name'})
+
+CONTEXT_SNIPPET_CHARS = 100
+DEFAULT_CONTEXT = 'my extensive background'
+DEFAULT_NAME = '[Your Name]'
+
+# Role templates are picked by the first pattern matching the job title
+ROLE_PATTERNS = [
+    ('data', re.compile(r'\b(data|machine learning|ml|analytics?|analyst|scientist)\b', re.I)),
+    ('engineering', re.compile(
+        r'\b(engineer|developer|programmer|sre|devops|architect|swe)\b', re.I)),
+    ('product', re.compile(r'\b(product manager|product owner|program manager)\b', re.I)),
+    ('design', re.compile(r'\b(designer|ux|ui)\b', re.I)),
+]
+
+LETTER_OPENING = """Dear Hiring Manager,
+
+I am writing to express my strong interest in the {job_title} position at {company}. With {context}, I am confident in my ability to contribute effectively to your team.
+
+"""
+
+LETTER_CLOSING = """
+
+I am particularly drawn to {company} because of its reputation for innovation and excellence in the industry. I am excited about the opportunity to bring my expertise to your team and contribute to your continued success.
+
+Thank you for considering my application. I look forward to the opportunity to discuss how my background and skills would benefit {company}.
+
+Sincerely,
+{name}"""
+
+LETTERS = {
+    'default': LETTER_OPENING + (
+        "Throughout my career, I have developed a comprehensive skill set that aligns well with the "
+        "requirements of this role. My experience has equipped me with strong technical abilities, "
+        "problem-solving skills, and a collaborative mindset that would make me a valuable addition "
+        "to {company}."
+    ) + LETTER_CLOSING,
+    'role:engineering': LETTER_OPENING + (
+        "Throughout my career, I have designed, built and operated production systems end to end. "
+        "I care about clean, well-tested code, pragmatic architecture and reliable delivery, and I "
+        "enjoy working closely with product and operations partners to ship software that makes a "
+        "difference at {company}."
+    ) + LETTER_CLOSING,
+    'role:data': LETTER_OPENING + (
+        "Throughout my career, I have turned messy data into reliable pipelines, models and insights "
+        "that drive decisions. I am comfortable across the stack, from SQL and experimentation to "
+        "production machine learning, and I would bring that rigor to the data challenges at {company}."
+    ) + LETTER_CLOSING,
+    'role:product': LETTER_OPENING + (
+        "Throughout my career, I have led cross-functional teams from discovery to launch, grounding "
+        "roadmaps in customer research and clear metrics. I would bring that customer focus and "
+        "execution discipline to the {job_title} role at {company}."
+    ) + LETTER_CLOSING,
+    'role:design': LETTER_OPENING + (
+        "Throughout my career, I have shaped intuitive, accessible experiences through research, "
+        "prototyping and close collaboration with engineering. I would love to bring that craft to "
+        "the products at {company}."
+    ) + LETTER_CLOSING,
+}
+
+BULLETS = {
+    'default': [
+        "• Led development of scalable solutions resulting in 40% improvement in system performance and reliability",
+        "• Collaborated with cross-functional teams to deliver high-impact projects aligned with {job_title} responsibilities",
+        "• Implemented best practices and modern technologies to enhance product quality and user experience",
+        "• Mentored junior team members and contributed to knowledge sharing initiatives",
+        "• Demonstrated strong problem-solving abilities in fast-paced, dynamic environments",
+    ],
+    'role:engineering': [
+        "• Designed and shipped services handling production traffic with 99.9% availability",
+        "• Cut p95 latency by 40% through profiling, caching and query optimization",
+        "• Built CI/CD pipelines and test suites that shortened release cycles from weeks to days",
+        "• Collaborated with cross-functional teams to deliver features aligned with {job_title} responsibilities",
+        "• Mentored engineers through code review, design docs and pairing",
+    ],
+    'role:data': [
+        "• Built batch and streaming pipelines that made key datasets available within minutes",
+        "• Developed and deployed models that improved a core business metric by double digits",
+        "• Designed experiments and dashboards that guided product and go-to-market decisions",
+        "• Partnered with stakeholders to translate {job_title} questions into analyses and tooling",
+        "• Improved data quality with automated validation and lineage tracking",
+    ],
+}
+
+
+class CompiledTemplate:
+    """A template parsed and validated once, rendered with format_map"""
+
+    __slots__ = ('name', 'text', 'fields')
+
+    def __init__(self, name: str, text: str):
+        fields = set()
+        for _, field, spec, conversion in Formatter().parse(text):
+            if field is None:
+                continue
+            if field not in TEMPLATE_FIELDS or spec or conversion:
+                raise ValueError(f"Template {name}: unsupported field {{{field}}}")
+            fields.add(field)
+        self.name = name
+        self.text = text
+        self.fields = frozenset(fields)
+
+    def render(self, values: Dict[str, str]) -> str:
+        return self.text.format_map(values)
+
+
+class TemplateSet:
+    """
+    Letter and bullet templates with per-company and per-role selection
+
+    Templates are keyed 'company:<name>' (normalized company name),
+    'role:<role>' (see ROLE_PATTERNS) or 'default'; the most specific one
+    present is used.
+    """
+
+    def __init__(self, letters: Dict[str, str], bullets: Dict[str, List[str]]):
+        self.letters = {key: CompiledTemplate(key, text) for key, text in letters.items()}
+        self.bullets = {
+            key: [CompiledTemplate(f"{key}[{i}]", text) for i, text in enumerate(texts)]
+            for key, texts in bullets.items()
+        }
+        if 'default' not in self.letters or 'default' not in self.bullets:
+            raise ValueError("Template set needs 'default' letter and bullet templates")
+        source = json.dumps({'letters': letters, 'bullets': bullets}, sort_keys=True)
+        self.fingerprint = hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+
+    def select_keys(self, job: Dict[str, Any]) -> List[str]:
+        """Template keys to try for a job, most specific first"""
+        keys = []
+        company = normalize_company(job.get('company'))
+        if company:
+            keys.append(f"company:{company}")
+        title = job.get('title') or ''
+        for role, pattern in ROLE_PATTERNS:
+            if pattern.search(title):
+                keys.append(f"role:{role}")
+                break
+        keys.append('default')
+        return keys
+
+    def select(self, job: Dict[str, Any]) -> Tuple[CompiledTemplate, List[CompiledTemplate]]:
+        keys = self.select_keys(job)
+        letter = next(self.letters[key] for key in keys if key in self.letters)
+        bullets = next(self.bullets[key] for key in keys if key in self.bullets)
+        return letter, bullets
+
+    def render(self, job: Dict[str, Any], profile: Union[str, Dict[str, Any], None] = None) -> Dict[str, Any]:
+        """Render one kit ({'cover_letter', 'resume_bullets'})"""
+        return self.render_batch([(job, profile)])[0]
+
+    def render_batch(self, pairs: Iterable[Tuple[Dict[str, Any], Union[str, Dict[str, Any], None]]]
+                     ) -> List[Dict[str, Any]]:
+        """
+        Render kits for many (job, profile) pairs in one pass
+
+        A profile is the user_context string or a dict with 'user_context'
+        and 'name'. Template selection is memoized per (company, title),
+        so large batches mostly pay for the format_map calls.
+        """
+        selected: Dict[Tuple[str, str], Tuple[CompiledTemplate, List[CompiledTemplate]]] = {}
+        kits = []
+        for job, profile in pairs:
+            selection_key = (job.get('company') or '', job.get('title') or '')
+            if selection_key not in selected:
+                selected[selection_key] = self.select(job)
+            letter, bullets = selected[selection_key]
+
+            values = template_values(job, profile)
+            kits.append({
+                'cover_letter': letter.render(values),
+                'resume_bullets': [bullet.render(values) for bullet in bullets]
+            })
+        return kits
+
+
+def normalize_company(company: Optional[str]) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', (company or '').lower()).strip()
+
+
+def template_values(job: Dict[str, Any], profile: Union[str, Dict[str, Any], None]) -> Dict[str, str]:
+    """Field values for one (job, profile) pair"""
+    if isinstance(profile, dict):
+        user_context, name = profile.get('user_context'), profile.get('name')
+    else:
+        user_context, name = profile, None
+    return {
+        'job_title': job.get('title') or '',
+        'company': job.get('company') or '',
+        'location': job.get('location') or '',
+        'context': user_context[:CONTEXT_SNIPPET_CHARS] if user_context else DEFAULT_CONTEXT,
+        'name': name or DEFAULT_NAME
+    }
+
+
+@lru_cache(maxsize=1)
+def default_templates() -> TemplateSet:
+    """
+    Container-wide template set, compiled on first use
+
+    The built-in templates can be extended or overridden with a JSON file
+    named by KIT_TEMPLATES_FILE: {"letters": {key: text}, "bullets":
+    {key: [text, ...]}}.
+    """
+    letters, bullets = dict(LETTERS), dict(BULLETS)
+    path = os.environ.get('KIT_TEMPLATES_FILE')
+    if path:
+        with open(path, encoding='utf-8') as f:
+            overrides = json.load(f)
+        letters.update(overrides.get('letters', {}))
+        bullets.update(overrides.get('bullets', {}))
+    return TemplateSet(letters, bullets)
+
+
+def render_kits(pairs: Iterable[Tuple[Dict[str, Any], Union[str, Dict[str, Any], None]]]
+                ) -> List[Dict[str, Any]]:
+    """Render template kits for many (job, profile) pairs"""
+    return default_templates().render_batch(pairs)
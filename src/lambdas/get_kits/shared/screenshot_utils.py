@@ -0,0 +1,112 @@
+"""
+Screenshot ingestion: download, recompress and thumbnail browser screenshots
+"""
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from .http_session import get_http_session
+from .s3_utils import S3Client, create_storage_client
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it only the original is stored
+    Image = None
+
+
+THUMBNAIL_SIZE = (320, 320)
+FULL_JPEG_QUALITY = 80
+THUMBNAIL_JPEG_QUALITY = 70
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # Spill to /tmp above 8 MB
+
+# Reused across warm invocations; Pillow releases the GIL while encoding
+_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def _render(image: 'Image.Image', max_size: Optional[Tuple[int, int]],
+            quality: int) -> bytes:
+    """Re-encode a decoded image as progressive JPEG, optionally downscaled"""
+    if max_size:
+        image.thumbnail(max_size)
+    out = io.BytesIO()
+    image.save(out, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def _decode(spool: tempfile.SpooledTemporaryFile) -> 'Image.Image':
+    """Decode the spooled image once, reading it from the spool in place"""
+    with Image.open(spool) as image:
+        return image.convert('RGB')
+
+
+def _download(source_url: str) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    """Stream a remote image into a spooled temp file"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with get_http_session().get(source_url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', 'image/png')
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            spool.write(chunk)
+    spool.seek(0)
+    return spool, content_type
+
+
+def ingest_screenshot(source_url: str, task_id: str, step: str,
+                      s3_client: Optional[S3Client] = None) -> Dict[str, str]:
+    """
+    Persist a remote screenshot to S3 with compressed renditions
+
+    The original is streamed from the download spool into S3 unchanged, so
+    its compressed bytes are never held in memory. If Pillow is available,
+    the image is decoded once (straight from the spool) and a recompressed
+    full-size JPEG and a thumbnail are rendered and uploaded in the worker
+    pool alongside it.
+
+    Args:
+        source_url: URL of the screenshot (e.g. TinyFish screenshotUrl)
+        task_id: Form fill task ID
+        step: Automation step name (e.g. "final")
+        s3_client: Optional S3Client to reuse
+
+    Returns:
+        Dict mapping rendition name ('original', 'full', 'thumbnail') to S3 key
+    """
+    s3_client = s3_client or create_storage_client()
+    spool, content_type = _download(source_url)
+
+    with spool:
+        extension = content_type.split('/')[-1].split(';')[0] or 'png'
+
+        decoded = None
+        if Image is not None:
+            decoded = _decode(spool)
+            spool.seek(0)
+        else:
+            print("Pillow not installed; storing original screenshot only")
+
+        futures = {
+            'original': _executor.submit(
+                s3_client.upload_screenshot, spool, task_id, step,
+                content_type=content_type, extension=extension
+            )
+        }
+
+        if decoded is not None:
+            # Separate copies, since thumbnail() resizes in place
+            renditions = {
+                'full': (decoded, None, FULL_JPEG_QUALITY),
+                'thumbnail': (decoded.copy(), THUMBNAIL_SIZE, THUMBNAIL_JPEG_QUALITY)
+            }
+            rendered = {
+                name: _executor.submit(_render, image, size, quality)
+                for name, (image, size, quality) in renditions.items()
+            }
+            for name, future in rendered.items():
+                futures[name] = _executor.submit(
+                    s3_client.upload_screenshot, future.result(), task_id,
+                    f"{step}_{name}", content_type='image/jpeg', extension='jpg'
+                )
+
+        return {name: future.result() for name, future in futures.items()}
@@ -5,6 +5,7 @@ import json
 from decimal import Decimal
 
 from shared.dynamodb_utils import DynamoDBClient
+from shared.s3_utils import create_storage_client
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -25,7 +26,7 @@ def lambda_handler(event, context):
     {
         "task_id": "...",
         "status": "pending|processing|completed|failed",
-        "result": {...},  // if completed
+        "result": {...},  // if completed (with presigned screenshot_urls)
         "error_message": "...",  // if failed
         "created_at": 123456789,
         "updated_at": 123456789
@@ -59,6 +60,15 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Task not found'})
             }
         
+        # Sign stored screenshot renditions so the UI can load thumbnails
+        screenshots = (task.get('result') or {}).get('screenshots')
+        if screenshots:
+            s3_client = create_storage_client()
+            task['result']['screenshot_urls'] = {
+                name: s3_client.get_presigned_url(key)
+                for name, key in screenshots.items()
+            }
+        
         # Return task data
         return {
             'statusCode': 200,
@@ -0,0 +1,156 @@
+"""
+Persistence of job search results shared by the search workers
+"""
+import hashlib
+from typing import Dict, Any, Iterable, List, Optional
+
+from .dynamodb_utils import DynamoDBClient
+from .models import Job, JobStatus
+from .keyword_index import index_jobs_for_search
+from .relevance import index_jobs_for_relevance
+from .s3_utils import create_storage_client
+from .search_cache import SearchCache
+from .yutori_client import YutoriClient
+
+
+def job_id_for(title: str, company: str) -> str:
+    """Stable job ID so the same posting found twice maps to one record"""
+    return hashlib.sha256(f"{title}_{company}".encode()).hexdigest()[:16]
+
+
+def save_jobs(dynamodb: DynamoDBClient, jobs_data: Iterable[Dict[str, Any]],
+              max_results: int, source: str = 'yutori_research') -> List[Dict[str, Any]]:
+    """
+    Save job postings to DynamoDB
+
+    Returns:
+        Job dicts for the task result, including posted_date and salary_range
+    """
+    jobs = []
+    for job_data in jobs_data:
+        if len(jobs) >= max_results:
+            break
+
+        job = Job(
+            job_id=job_id_for(job_data['title'], job_data['company']),
+            title=job_data['title'],
+            company=job_data['company'],
+            location=job_data.get('location'),
+            description=job_data.get('description', ''),
+            url=job_data.get('url', ''),
+            source=job_data.get('source', source),
+            status=JobStatus.FOUND
+        )
+
+        # Save job to DynamoDB
+        dynamodb.create_job(job.to_dynamodb())
+
+        # Add to results
+        job_dict = job.dict()
+        job_dict['posted_date'] = job_data.get('posted_date')
+        job_dict['salary_range'] = job_data.get('salary_range')
+        jobs.append(job_dict)
+
+    return jobs
+
+
+def index_saved_jobs(task_id: str, jobs: List[Dict[str, Any]]) -> None:
+    """Add a search's jobs to the user's keyword and relevance indexes"""
+    storage = create_storage_client()
+    for name, index_jobs in (('keyword', index_jobs_for_search), ('relevance', index_jobs_for_relevance)):
+        try:
+            index_jobs(storage, jobs)
+        except Exception as e:
+            # Listings add missing jobs to the indexes themselves
+            print(f"Failed to update {name} index for task {task_id}: {str(e)}")
+
+
+def complete_search_task(dynamodb: DynamoDBClient, task_id: str,
+                         jobs_data: Iterable[Dict[str, Any]],
+                         max_results: int, query: Optional[str] = None,
+                         location: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Save jobs and mark the search task completed with its results
+
+    When the query is given, the results are also written to the shared
+    search cache so identical searches can be answered without Yutori.
+    """
+    jobs = save_jobs(dynamodb, jobs_data, max_results)
+
+    index_saved_jobs(task_id, jobs)
+
+    if query:
+        try:
+            SearchCache(dynamodb).put(query, location, max_results, jobs)
+        except Exception as e:
+            # The cache is an optimisation; never fail the search over it
+            print(f"Failed to cache results for task {task_id}: {str(e)}")
+
+    dynamodb.update_task_status(
+        task_id,
+        'completed',
+        result={
+            'jobs': jobs,
+            'count': len(jobs)
+        }
+    )
+
+    if query:
+        release_search_lease(dynamodb, task_id, query, location, max_results)
+
+    print(f"Task {task_id} completed with {len(jobs)} jobs")
+    return jobs
+
+
+def fail_search_task(dynamodb: DynamoDBClient, task_id: str, error_message: str,
+                     query: Optional[str] = None, location: Optional[str] = None,
+                     max_results: int = 20) -> None:
+    """Mark a search task failed and free its query for the next request"""
+    dynamodb.update_task_status(task_id, 'failed', error_message=error_message)
+    if query:
+        release_search_lease(dynamodb, task_id, query, location, max_results)
+
+
+def release_search_lease(dynamodb: DynamoDBClient, task_id: str, query: str,
+                         location: Optional[str], max_results: int) -> None:
+    """Drop the single-flight lease held by a finished search task"""
+    try:
+        SearchCache(dynamodb).release_lease(query, location, max_results, task_id)
+    except Exception as e:
+        # The lease also expires on its own
+        print(f"Failed to release search lease for task {task_id}: {str(e)}")
+
+
+def finish_research_task(dynamodb: DynamoDBClient, task: Dict[str, Any],
+                         payload: Dict[str, Any]) -> bool:
+    """
+    Apply a Yutori research task payload to our search task
+
+    Used by both the webhook and the central poller.
+
+    Returns:
+        True if the task reached a terminal state
+    """
+    task_id = task['task_id']
+    status = payload.get('status')
+
+    if status == 'failed':
+        fail_search_task(
+            dynamodb, task_id,
+            f"Research task failed: {payload.get('error', 'Unknown error')}",
+            query=task.get('query'), location=task.get('location'),
+            max_results=int(task.get('max_results', 20))
+        )
+        return True
+
+    if status == 'succeeded':
+        jobs_data = YutoriClient().parse_research_result(
+            payload, task.get('query', ''), task.get('location')
+        )
+        complete_search_task(
+            dynamodb, task_id, jobs_data, int(task.get('max_results', 20)),
+            query=task.get('query'), location=task.get('location')
+        )
+        return True
+
+    return False
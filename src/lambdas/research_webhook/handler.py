@@ -0,0 +1,76 @@
+"""
+Lambda function to complete job searches when Yutori calls back
+"""
+import json
+
+from shared.dynamodb_utils import DynamoDBClient
+from shared.search_results import finish_research_task
+from shared.webhooks import verify_callback_token
+
+
+def lambda_handler(event, context):
+    """
+    Receive a research task completion callback
+    
+    Path parameter: task_id (our search task)
+    Query parameter: token (signed when the callback URL was issued)
+    
+    Request body (Yutori research task payload):
+    {
+        "task_id": "...",
+        "status": "succeeded|failed",
+        "result": "...",
+        "error": "..."
+    }
+    """
+    try:
+        task_id = (event.get('pathParameters') or {}).get('task_id')
+        token = (event.get('queryStringParameters') or {}).get('token')
+        
+        if not verify_callback_token(task_id, token):
+            return {
+                'statusCode': 403,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': 'Invalid callback token'})
+            }
+        
+        payload = json.loads(event.get('body') or '{}')
+        
+        dynamodb = DynamoDBClient()
+        task = dynamodb.get_task(task_id)
+        
+        if not task:
+            return {
+                'statusCode': 404,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': 'Task not found'})
+            }
+        
+        # Callbacks may be delivered more than once
+        if task.get('status') in ('completed', 'failed'):
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'task_id': task_id, 'status': task['status']})
+            }
+        
+        status = payload.get('status')
+        if not finish_research_task(dynamodb, task, payload):
+            # Progress notification; nothing to persist yet
+            print(f"Ignoring callback for task {task_id} with status {status}")
+        
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'task_id': task_id, 'received': status})
+        }
+    
+    except Exception as e:
+        print(f"Error in research_webhook: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': str(e)})
+        }
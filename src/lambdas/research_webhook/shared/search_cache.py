@@ -0,0 +1,184 @@
+"""
+Shared cache of job search results keyed by normalized query
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .dynamodb_utils import DynamoDBClient
+
+
+# Canonical forms for common ways of writing the same location
+LOCATION_ALIASES = {
+    'sf': 'san francisco, ca',
+    'san francisco': 'san francisco, ca',
+    'san francisco ca': 'san francisco, ca',
+    'sf bay area': 'san francisco bay area, ca',
+    'bay area': 'san francisco bay area, ca',
+    'nyc': 'new york, ny',
+    'new york': 'new york, ny',
+    'new york city': 'new york, ny',
+    'new york ny': 'new york, ny',
+    'la': 'los angeles, ca',
+    'los angeles': 'los angeles, ca',
+    'seattle': 'seattle, wa',
+    'austin': 'austin, tx',
+    'boston': 'boston, ma',
+    'remote': 'remote',
+    'anywhere': 'remote',
+    'wfh': 'remote',
+    'work from home': 'remote',
+}
+
+DEFAULT_FRESH_SECONDS = 6 * 3600
+DEFAULT_STALE_SECONDS = 18 * 3600
+EMPTY_RESULT_TTL_SECONDS = 15 * 60
+
+# Upper bound on how long one task may own a search; matches the
+# BackgroundSearch timeout so a crashed owner does not block the key for long
+DEFAULT_LEASE_SECONDS = 15 * 60
+LEASE_PREFIX = 'lease#'
+# Write/read rounds before giving up on a lease that keeps changing hands
+MAX_LEASE_ATTEMPTS = 5
+
+
+class SearchLeaseContended(Exception):
+    """Raised when a search lease could neither be taken nor its holder read"""
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    query = re.sub(r'[^\w\s+#.]', ' ', (query or '').lower())
+    return ' '.join(query.split())
+
+
+def normalize_location(location: Optional[str]) -> str:
+    """Canonicalize a location string, resolving common aliases"""
+    location = ' '.join((location or '').lower().replace('.', '').split())
+    # Only a separate trailing word, so "columbus" and "campus" are left alone
+    location = re.sub(r'(?:,\s*|\s+)(?:us|usa|united states)$', '', location).strip(' ,')
+    compact = location.replace(',', '')
+    return LOCATION_ALIASES.get(compact, LOCATION_ALIASES.get(location, location))
+
+
+def search_cache_key(query: str, location: Optional[str], max_results: int) -> str:
+    """Cache key for a search; equivalent spellings map to the same key"""
+    normalized = f"{normalize_query(query)}|{normalize_location(location)}|{int(max_results)}"
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+
+
+def search_lease_key(query: str, location: Optional[str], max_results: int) -> str:
+    """Key of the in-flight lease item stored alongside the cache entry"""
+    return LEASE_PREFIX + search_cache_key(query, location, max_results)
+
+
+class SearchCachePolicy:
+    """
+    Freshness policy for cached searches
+
+    Entries are fresh for fresh_seconds and may then be served stale (while
+    a refresh runs) for another stale_seconds before DynamoDB TTL removes
+    them. Empty results expire quickly so a transient miss isn't pinned.
+    """
+
+    def __init__(self, fresh_seconds: Optional[int] = None,
+                 stale_seconds: Optional[int] = None):
+        self.fresh_seconds = fresh_seconds or int(os.environ.get('SEARCH_CACHE_FRESH_SECONDS', DEFAULT_FRESH_SECONDS))
+        self.stale_seconds = stale_seconds or int(os.environ.get('SEARCH_CACHE_STALE_SECONDS', DEFAULT_STALE_SECONDS))
+
+    def lifetimes(self, jobs: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Return fresh_until and expires_at for a new entry"""
+        now = int(datetime.now().timestamp())
+        if not jobs:
+            return {'fresh_until': now + EMPTY_RESULT_TTL_SECONDS,
+                    'expires_at': now + EMPTY_RESULT_TTL_SECONDS}
+        return {'fresh_until': now + self.fresh_seconds,
+                'expires_at': now + self.fresh_seconds + self.stale_seconds}
+
+
+class SearchCache:
+    """Read and write cached search results in DynamoDB"""
+
+    def __init__(self, dynamodb: Optional[DynamoDBClient] = None,
+                 policy: Optional[SearchCachePolicy] = None):
+        self.dynamodb = dynamodb or DynamoDBClient()
+        self.policy = policy or SearchCachePolicy()
+
+    def get(self, query: str, location: Optional[str],
+            max_results: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up a search
+
+        Returns:
+            Dict with 'jobs', 'count', 'cached_at' and 'fresh' (False when
+            the entry is stale and should be refreshed), or None on miss
+        """
+        item = self.dynamodb.get_cached_search(search_cache_key(query, location, max_results))
+        now = int(datetime.now().timestamp())
+        # DynamoDB TTL deletion is lazy, so check expiry ourselves
+        if not item or int(item['expires_at']) <= now:
+            return None
+
+        jobs = json.loads(item['result_json'])
+        return {
+            'jobs': jobs,
+            'count': len(jobs),
+            'cached_at': int(item['cached_at']),
+            'fresh': int(item['fresh_until']) > now
+        }
+
+    def put(self, query: str, location: Optional[str], max_results: int,
+            jobs: List[Dict[str, Any]]) -> None:
+        """Store a completed search"""
+        item = {
+            'cache_key': search_cache_key(query, location, max_results),
+            'query': normalize_query(query),
+            'location': normalize_location(location),
+            'max_results': int(max_results),
+            # Stored as JSON to avoid Decimal round-tripping of nested values
+            'result_json': json.dumps(jobs, default=str),
+            'cached_at': int(datetime.now().timestamp())
+        }
+        item.update(self.policy.lifetimes(jobs))
+        self.dynamodb.put_cached_search(item)
+
+    def acquire_lease(self, query: str, location: Optional[str], max_results: int,
+                      task_id: str) -> Optional[str]:
+        """
+        Claim an identical search for task_id (single-flight)
+
+        Returns:
+            None if task_id now owns the search and should run it, otherwise
+            the task ID of the in-flight search to attach to
+
+        Raises:
+            SearchLeaseContended: if the lease changed hands on every attempt
+        """
+        lease_key = search_lease_key(query, location, max_results)
+        lease_seconds = int(os.environ.get('SEARCH_LEASE_SECONDS', DEFAULT_LEASE_SECONDS))
+
+        # Retry while the holder releases between our write and read
+        for _ in range(MAX_LEASE_ATTEMPTS):
+            now = int(datetime.now().timestamp())
+            lease = {
+                'cache_key': lease_key,
+                'task_id': task_id,
+                'acquired_at': now,
+                'expires_at': now + lease_seconds
+            }
+            if self.dynamodb.acquire_search_lease(lease, now):
+                return None
+
+            holder = self.dynamodb.get_cached_search(lease_key, consistent_read=True)
+            if holder and int(holder['expires_at']) > now:
+                return holder['task_id']
+
+        raise SearchLeaseContended(f"Could not take or read the search lease {lease_key}")
+
+    def release_lease(self, query: str, location: Optional[str], max_results: int,
+                      task_id: str) -> None:
+        """Release task_id's lease so the next search for the key runs again"""
+        self.dynamodb.release_search_lease(search_lease_key(query, location, max_results), task_id)
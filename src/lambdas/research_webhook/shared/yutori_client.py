@@ -0,0 +1,475 @@
+"""
+Yutori API client for Research and Browsing APIs
+"""
+import json
+import os
+from typing import Dict, Any, Iterator, List, Optional
+
+import requests
+
+from .http_session import get_http_session
+from .job_extractor import extract_jobs
+from .polling import PollingStrategy, server_hint
+from .rate_limit import guarded_call
+from .search_fanout import fan_out_search
+
+
+class ResearchTaskTimeout(Exception):
+    """Raised when a research task is still running at the polling deadline"""
+
+
+class KitStreamParser:
+    """
+    Assemble streamed generate output into whole paragraphs and bullets
+    
+    The streaming generate endpoint sends server-sent events or NDJSON
+    lines, each a JSON object: {"section": "cover_letter" | "resume_bullets",
+    "delta": "..."} for incremental text, or a complete
+    {"cover_letter", "resume_bullets"} payload. Letter text is released a
+    paragraph at a time (on blank lines), bullets a line at a time.
+    """
+    
+    def __init__(self):
+        self.paragraphs: List[str] = []
+        self.bullets: List[str] = []
+        self._buffers = {'cover_letter': '', 'resume_bullets': ''}
+    
+    def feed_line(self, line: str) -> List[Dict[str, str]]:
+        """Parse one line of the stream and return the events it completes"""
+        line = (line or '').strip()
+        if line.startswith('data:'):
+            line = line[5:].strip()
+        elif not line or line.startswith((':', 'event:', 'id:', 'retry:')):
+            return []
+        if line == '[DONE]':
+            return self.close()
+        
+        try:
+            event = json.loads(line)
+        except ValueError:
+            # Bare text lines are letter text
+            event = {'section': 'cover_letter', 'delta': line + '\n'}
+        if not isinstance(event, dict):
+            return []
+        if 'cover_letter' in event or 'resume_bullets' in event:
+            return self.feed_payload(event)
+        
+        section = 'resume_bullets' if event.get('section') == 'resume_bullets' else 'cover_letter'
+        self._buffers[section] += event.get('delta') or event.get('text') or ''
+        return self._drain(section, final=False)
+    
+    def feed_payload(self, data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Take a complete kit payload (a non-streaming response, or the final
+        event); only the paragraphs and bullets not yet emitted are returned
+        """
+        kit = YutoriClientBase._parse_application_kit(data)
+        self._buffers = {'cover_letter': '', 'resume_bullets': ''}
+        events = []
+        paragraphs = [p.strip() for p in kit['cover_letter'].split('\n\n') if p.strip()]
+        for text in paragraphs[len(self.paragraphs):]:
+            self.paragraphs.append(text)
+            events.append({'type': 'paragraph', 'text': text})
+        for text in kit['resume_bullets'][len(self.bullets):]:
+            self.bullets.append(text)
+            events.append({'type': 'bullet', 'text': text})
+        return events
+    
+    def close(self) -> List[Dict[str, str]]:
+        """Flush text left in the buffers at the end of the stream"""
+        return self._drain('cover_letter', final=True) + self._drain('resume_bullets', final=True)
+    
+    def _drain(self, section: str, final: bool) -> List[Dict[str, str]]:
+        separator = '\n\n' if section == 'cover_letter' else '\n'
+        parts = self._buffers[section].split(separator)
+        self._buffers[section] = '' if final else parts.pop()
+        
+        events = []
+        for part in parts:
+            text = part.strip()
+            if not text:
+                continue
+            if section == 'cover_letter':
+                self.paragraphs.append(text)
+                events.append({'type': 'paragraph', 'text': text})
+            else:
+                self.bullets.append(text)
+                events.append({'type': 'bullet', 'text': text})
+        return events
+    
+    @property
+    def cover_letter(self) -> str:
+        return '\n\n'.join(self.paragraphs)
+
+
+class YutoriClientBase:
+    """
+    Configuration, request payloads and response parsing shared by the
+    synchronous YutoriClient and the asyncio AsyncYutoriClient
+    """
+    
+    def __init__(self):
+        self.api_key = os.environ.get('YUTORI_API_KEY')
+        self.base_url = os.environ.get('YUTORI_BASE_URL', 'https://api.yutori.com')
+        self.research_endpoint = os.environ.get('YUTORI_RESEARCH_ENDPOINT', self.base_url)
+        self.browsing_endpoint = os.environ.get('YUTORI_BROWSING_ENDPOINT', self.base_url)
+        self.headers = {
+            'X-API-Key': self.api_key,
+            'Content-Type': 'application/json'
+        }
+    
+    def _research_task_payload(self, query: str, location: Optional[str],
+                               max_results: int,
+                               callback_url: Optional[str]) -> Dict[str, Any]:
+        """Build the research task request for a job search"""
+        research_query = f"Find {max_results} {query} job postings"
+        if location:
+            research_query += f" in {location}"
+        research_query += (
+            ". For each job, provide: title, company name, location, "
+            "job description summary, and application URL."
+        )
+        
+        payload = {
+            "query": research_query,
+            "user_location": location or "San Francisco, CA, US"
+        }
+        if callback_url:
+            payload["webhook_url"] = callback_url
+        return payload
+    
+    def parse_research_result(self, status_data: Dict[str, Any], query: str,
+                               location: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Turn a succeeded research payload into job postings
+        
+        Prefers structured output when the task returned it and otherwise
+        parses the result text. Jobs are yielded as they are recognized, so
+        callers can start saving before the whole result is parsed.
+        """
+        result = status_data.get('structured_result') or status_data.get('result')
+        return extract_jobs(result, default_location=location or None)
+    
+    def _application_kit_payload(self, job_description: str, resume_text: str,
+                                 job_title: str, company: str) -> Dict[str, Any]:
+        """Build the generate request for a cover letter and resume bullets"""
+        return {
+            "task": "generate_application",
+            "context": {
+                "job_description": job_description,
+                "resume": resume_text,
+                "job_title": job_title,
+                "company": company
+            },
+            "instructions": (
+                "Generate a tailored cover letter and 5-7 resume bullet points "
+                "that highlight relevant skills and experience for this specific role. "
+                "The cover letter should be professional, concise (3-4 paragraphs), "
+                "and demonstrate clear understanding of the role requirements."
+            )
+        }
+    
+    @staticmethod
+    def _parse_application_kit(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'cover_letter': data.get('cover_letter', ''),
+            'resume_bullets': data.get('resume_bullets', [])
+        }
+    
+    def _fill_form_payload(self, application_url: str, form_data: Dict[str, str],
+                           stop_before_submit: bool) -> Dict[str, Any]:
+        """Build the browsing automation request for a form fill"""
+        return {
+            "task": "fill_form",
+            "url": application_url,
+            "actions": self._build_form_actions(form_data, stop_before_submit),
+            "capture_screenshots": True,
+            "wait_for_navigation": True
+        }
+    
+    @staticmethod
+    def _parse_fill_result(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'task_id': data.get('task_id'),
+            'status': data.get('status'),
+            'filled_fields': data.get('filled_fields', {}),
+            'screenshots': data.get('screenshots', []),
+            'final_url': data.get('final_url'),
+            'stopped_at': data.get('stopped_at', '')
+        }
+
+    def _build_form_actions(self, form_data: Dict[str, str],
+                           stop_before_submit: bool) -> List[Dict[str, Any]]:
+        """Build action sequence for form filling"""
+        actions = []
+        
+        # Add fill actions for each form field
+        for field_name, value in form_data.items():
+            actions.append({
+                "type": "fill_field",
+                "selector": self._guess_field_selector(field_name),
+                "value": value,
+                "wait_after": 500  # ms
+            })
+        
+        # Add screenshot action before submit
+        actions.append({
+            "type": "screenshot",
+            "name": "before_submit"
+        })
+        
+        # Optionally stop before submit
+        if stop_before_submit:
+            actions.append({
+                "type": "stop",
+                "reason": "Awaiting manual review before submission"
+            })
+        else:
+            actions.append({
+                "type": "click",
+                "selector": "button[type='submit'], input[type='submit']",
+                "wait_after": 2000
+            })
+            actions.append({
+                "type": "screenshot",
+                "name": "after_submit"
+            })
+        
+        return actions
+    
+    def _guess_field_selector(self, field_name: str) -> str:
+        """Generate CSS selector for common form fields"""
+        # Common field name patterns
+        selectors = {
+            'first_name': "input[name*='first'], input[id*='first'], input[placeholder*='First']",
+            'last_name': "input[name*='last'], input[id*='last'], input[placeholder*='Last']",
+            'email': "input[type='email'], input[name*='email'], input[id*='email']",
+            'phone': "input[type='tel'], input[name*='phone'], input[id*='phone']",
+            'resume': "input[type='file'][name*='resume'], input[type='file'][id*='resume']",
+            'cover_letter': "textarea[name*='cover'], textarea[id*='cover']",
+            'linkedin': "input[name*='linkedin'], input[id*='linkedin']",
+            'portfolio': "input[name*='portfolio'], input[id*='website']"
+        }
+        
+        return selectors.get(field_name.lower(), f"input[name='{field_name}'], input[id='{field_name}']")
+
+
+class YutoriClient(YutoriClientBase):
+    """Client for Yutori Research and Browsing APIs"""
+    
+    def __init__(self):
+        super().__init__()
+        # Pooled keep-alive session shared across clients and warm invocations
+        self.session = get_http_session()
+    
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request under the Yutori rate limit and circuit breaker
+        
+        Raises:
+            CircuitOpenError: if Yutori has been failing and the call was not sent
+            RateLimitTimeout: if no quota became available in time
+            requests.HTTPError: for error responses
+        """
+        headers = {**self.headers, **kwargs.pop('headers', {})}
+        
+        def send() -> requests.Response:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+            response.raise_for_status()
+            return response
+        
+        return guarded_call('yutori', self.api_key, send)
+    
+    def search_jobs(self, query: str, location: Optional[str] = None,
+                   max_results: int = 20,
+                   polling: Optional[PollingStrategy] = None,
+                   concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Use Research API to find relevant job postings
+        
+        Broad searches (several locations, or more results than one research
+        task returns) are split into sub-queries that run concurrently and
+        are merged with duplicates removed.
+        
+        Args:
+            query: Job search query (e.g., "software engineer Python")
+            location: Optional location filter; separate several with ';'
+            max_results: Maximum number of results to return
+            polling: Polling strategy; pass PollingStrategy.from_lambda_context
+                to bound polling by the Lambda's remaining time
+            concurrency: Maximum research tasks in flight
+        
+        Returns:
+            List of job postings with title, company, url, description
+        """
+        deadline = polling.deadline if polling else None
+        
+        def run_sub_query(sub_query: Dict[str, Any]) -> List[Dict[str, Any]]:
+            # Each sub-query backs off independently within the shared deadline
+            sub_polling = PollingStrategy(deadline=deadline) if deadline is not None else None
+            return self.run_research_query(
+                sub_query['query'], sub_query['location'], sub_query['max_results'], sub_polling
+            )
+        
+        return list(fan_out_search(run_sub_query, query, location, max_results, concurrency))
+    
+    def run_research_query(self, query: str, location: Optional[str] = None,
+                           max_results: int = 20,
+                           polling: Optional[PollingStrategy] = None) -> List[Dict[str, Any]]:
+        """Run a single research task to completion and parse its jobs"""
+        task_id = self.create_research_task(query, location, max_results)
+        status_data = self.wait_for_research_task(task_id, polling)
+        return list(self.parse_research_result(status_data, query, location))
+    
+    def create_research_task(self, query: str, location: Optional[str] = None,
+                             max_results: int = 20,
+                             callback_url: Optional[str] = None) -> str:
+        """
+        Start a research task for a job search and return its task ID
+        
+        If callback_url is given, Yutori POSTs the final task payload there
+        when the task finishes, so the caller does not need to poll.
+        """
+        response = self._send(
+            'POST',
+            f"{self.base_url}/v1/research/tasks",
+            json=self._research_task_payload(query, location, max_results, callback_url),
+            timeout=60
+        )
+        
+        return response.json().get('task_id')
+    
+    def get_research_task(self, task_id: str) -> requests.Response:
+        """Fetch the raw status response of a research task"""
+        return self._send(
+            'GET',
+            f"{self.base_url}/v1/research/tasks/{task_id}",
+            timeout=10
+        )
+    
+    def wait_for_research_task(self, task_id: str,
+                               polling: Optional[PollingStrategy] = None) -> Dict[str, Any]:
+        """
+        Poll a research task until it succeeds
+        
+        Returns:
+            The final status payload
+        
+        Raises:
+            ResearchTaskTimeout: if the polling deadline passes
+            Exception: if the task fails
+        """
+        polling = polling or PollingStrategy()
+        hint = None
+        
+        while polling.wait(hint):
+            status_response = self.get_research_task(task_id)
+            status_data = status_response.json()
+            
+            if status_data.get('status') == 'succeeded':
+                return status_data
+            elif status_data.get('status') == 'failed':
+                raise Exception(f"Research task failed: {status_data.get('error', 'Unknown error')}")
+            
+            hint = server_hint(status_response.headers, status_data)
+        
+        raise ResearchTaskTimeout("Research task timeout")
+    
+    def generate_application_kit(self, job_description: str, resume_text: str,
+                                job_title: str, company: str) -> Dict[str, Any]:
+        """
+        Use Research API to generate tailored cover letter and resume bullets
+        
+        Args:
+            job_description: Full job posting text
+            resume_text: User's resume content
+            job_title: Job title
+            company: Company name
+        
+        Returns:
+            Dict with 'cover_letter' and 'resume_bullets' keys
+        """
+        response = self._send(
+            'POST',
+            f"{self.research_endpoint}/v1/generate",
+            json=self._application_kit_payload(job_description, resume_text, job_title, company),
+            timeout=90
+        )
+        
+        return self._parse_application_kit(response.json())
+    
+    def stream_application_kit(self, job_description: str, resume_text: str,
+                               job_title: str, company: str) -> Iterator[Dict[str, str]]:
+        """
+        Generate a kit, yielding each paragraph and bullet as it is produced
+        
+        Yields {'type': 'paragraph' | 'bullet', 'text': ...} events, so the
+        first paragraph is available seconds into a generation that takes
+        up to 90s. If the endpoint answers with a plain JSON body instead of
+        a stream, the whole kit is yielded at once.
+        """
+        response = self._send(
+            'POST',
+            f"{self.research_endpoint}/v1/generate",
+            json={
+                **self._application_kit_payload(job_description, resume_text, job_title, company),
+                'stream': True
+            },
+            headers={'Accept': 'text/event-stream, application/x-ndjson, application/json'},
+            timeout=90,
+            stream=True
+        )
+        
+        parser = KitStreamParser()
+        try:
+            content_type = response.headers.get('Content-Type', '')
+            if content_type.startswith('application/json'):
+                yield from parser.feed_payload(response.json())
+                return
+            
+            for line in response.iter_lines(decode_unicode=True):
+                yield from parser.feed_line(line)
+            yield from parser.close()
+        finally:
+            response.close()
+    
+    def fill_application_form(self, application_url: str, 
+                             form_data: Dict[str, str],
+                             stop_before_submit: bool = True) -> Dict[str, Any]:
+        """
+        Use Browsing API to navigate and fill job application form
+        
+        Args:
+            application_url: URL of the job application page
+            form_data: Dictionary of form field names and values
+            stop_before_submit: If True, stop before clicking submit button
+        
+        Returns:
+            Dict with task status, filled fields, and screenshot URLs
+        """
+        response = self._send(
+            'POST',
+            f"{self.browsing_endpoint}/v1/automate",
+            json=self._fill_form_payload(application_url, form_data, stop_before_submit),
+            timeout=300
+        )
+        
+        return self._parse_fill_result(response.json())
+    
+    def get_task_status(self, task_id: str, task_type: str = 'browsing') -> Dict[str, Any]:
+        """
+        Poll external task status
+        
+        Args:
+            task_id: Yutori task ID
+            task_type: 'browsing' (form automation) or 'research'
+        """
+        if task_type == 'research':
+            return self.get_research_task(task_id).json()
+        
+        response = self._send(
+            'GET',
+            f"{self.browsing_endpoint}/v1/tasks/{task_id}",
+            timeout=10
+        )
+        return response.json()
@@ -8,6 +8,8 @@ from datetime import datetime
 import boto3
 
 from shared.dynamodb_utils import DynamoDBClient
+from shared.search_cache import SearchCache, SearchLeaseContended
+from shared.search_results import release_search_lease
 
 
 def lambda_handler(event, context):
@@ -18,10 +20,14 @@ def lambda_handler(event, context):
     {
         "query": "software engineer",
         "location": "San Francisco, CA",
-        "max_results": 10
+        "max_results": 10,
+        "refresh": false  // optional: bypass the search cache
     }
     
-    Returns immediately with task_id:
+    Cached searches return 200 with the jobs and a completed task_id.
+    Identical searches already in flight return that search's task_id
+    (with "coalesced": true) instead of starting another one.
+    Otherwise returns immediately with task_id:
     {
         "task_id": "...",
         "status": "pending",
@@ -65,20 +71,86 @@ def lambda_handler(event, context):
             'created_at': int(datetime.now().timestamp()),
             'updated_at': int(datetime.now().timestamp())
         }
-        dynamodb.create_task(task_data)
         
-        # Invoke background Lambda asynchronously
-        lambda_client = boto3.client('lambda')
-        lambda_client.invoke(
-            FunctionName=os.environ.get('BACKGROUND_SEARCH_FUNCTION'),
-            InvocationType='Event',  # Async invocation
-            Payload=json.dumps({
-                'task_id': task_id,
-                'query': query,
-                'location': location,
-                'max_results': max_results
+        # Answer identical recent searches from the shared cache
+        search_cache = SearchCache(dynamodb)
+        cached = None if body.get('refresh') else search_cache.get(query, location, max_results)
+        if cached:
+            task_data.update({
+                'status': 'completed',
+                'completed_at': int(datetime.now().timestamp()),
+                'result': {
+                    'jobs': cached['jobs'],
+                    'count': cached['count'],
+                    'cached': True,
+                    'cached_at': cached['cached_at']
+                }
             })
-        )
+            dynamodb.create_task(task_data)
+            
+            if not cached['fresh']:
+                # Serve stale results now and refresh the entry in the background,
+                # unless a search for the same key is already running
+                refresh_task = {k: v for k, v in task_data.items() if k not in ('result', 'completed_at')}
+                refresh_task.update(task_id=f"{task_id}r", task_type='job_search_refresh', status='pending')
+                try:
+                    if search_cache.acquire_lease(query, location, max_results, refresh_task['task_id']) is None:
+                        start_search(dynamodb, refresh_task)
+                except Exception as e:
+                    # The stale results are still worth serving
+                    print(f"Failed to start refresh for query: {query}: {str(e)}")
+            
+            print(f"Served search task {task_id} from cache for query: {query}")
+            
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'task_id': task_id,
+                    'status': 'completed',
+                    'cached': True,
+                    'jobs': cached['jobs'],
+                    'count': cached['count'],
+                    'message': 'Search served from cache.'
+                })
+            }
+        
+        # Single-flight: attach to an identical search that is already running
+        try:
+            inflight_task_id = search_cache.acquire_lease(query, location, max_results, task_id)
+        except SearchLeaseContended as e:
+            print(f"Search lease contended for query: {query}: {str(e)}")
+            return {
+                'statusCode': 503,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                    'Retry-After': '1'
+                },
+                'body': json.dumps({'error': 'Search is busy, please retry'})
+            }
+        
+        if inflight_task_id:
+            print(f"Attached search for query: {query} to in-flight task {inflight_task_id}")
+            
+            return {
+                'statusCode': 202,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'task_id': inflight_task_id,
+                    'status': 'pending',
+                    'coalesced': True,
+                    'message': 'Identical search already running. Poll /tasks/{task_id} for results.'
+                })
+            }
+        
+        start_search(dynamodb, task_data)
         
         print(f"Created search task {task_id} for query: {query}")
         
@@ -110,3 +182,43 @@ def lambda_handler(event, context):
                 'message': 'Failed to create search task'
             })
         }
+
+
+def start_search(dynamodb, task_data):
+    """
+    Create a search task that already holds its lease and invoke the worker
+    
+    If either step fails the lease is released, so identical searches don't
+    attach to a task that doesn't exist or will never run.
+    """
+    task_id = task_data['task_id']
+    query, location, max_results = task_data['query'], task_data['location'], task_data['max_results']
+    created = False
+    try:
+        dynamodb.create_task(task_data)
+        created = True
+        # Invoke background Lambda asynchronously
+        enqueue_search(task_id, query, location, max_results)
+    except Exception as e:
+        if created:
+            try:
+                dynamodb.update_task_status(task_id, 'failed', error_message=f"Failed to start search: {str(e)}")
+            except Exception as update_error:
+                print(f"Failed to mark task {task_id} failed: {str(update_error)}")
+        release_search_lease(dynamodb, task_id, query, location, max_results)
+        raise
+
+
+def enqueue_search(task_id: str, query: str, location: str, max_results: int) -> None:
+    """Invoke the background search Lambda asynchronously"""
+    lambda_client = boto3.client('lambda')
+    lambda_client.invoke(
+        FunctionName=os.environ.get('BACKGROUND_SEARCH_FUNCTION'),
+        InvocationType='Event',  # Async invocation
+        Payload=json.dumps({
+            'task_id': task_id,
+            'query': query,
+            'location': location,
+            'max_results': max_results
+        })
+    )
@@ -0,0 +1,124 @@
+"""
+Scheduled Lambda function that polls all outstanding external tasks
+"""
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from shared.async_client import AsyncYutoriClient
+from shared.dynamodb_utils import DynamoDBClient
+from shared.search_results import finish_research_task
+
+
+BATCH_SIZE = int(os.environ.get('POLLER_BATCH_SIZE', 50))
+CONCURRENCY = int(os.environ.get('POLLER_CONCURRENCY', 32))
+MAX_POLL_INTERVAL = 300  # seconds
+SAFETY_MARGIN_MS = 15 * 1000
+
+# boto3 resources are not thread-safe, so each worker thread gets its own
+_thread_local = threading.local()
+
+
+def _thread_dynamodb():
+    if not hasattr(_thread_local, 'dynamodb'):
+        _thread_local.dynamodb = DynamoDBClient()
+    return _thread_local.dynamodb
+
+
+# Completion handlers by external task type
+HANDLERS = {
+    'research': finish_research_task
+}
+
+
+async def poll_task(yutori, task, executor):
+    """
+    Check one outstanding task and dispatch its completion
+    
+    The status request runs on the event loop; the DynamoDB writes that
+    follow run on a worker thread.
+    
+    Returns:
+        'done', 'pending' or 'error'
+    """
+    task_type = task.get('external_task_type', 'research')
+    try:
+        payload = await yutori.get_task_status(task['external_task_id'], task_type=task_type)
+    except Exception as e:
+        print(f"Polling task {task['task_id']} failed: {str(e)}")
+        payload = None
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, apply_status, task, payload)
+
+
+def apply_status(task, payload):
+    """Complete or reschedule a task given its status payload (None on error)"""
+    dynamodb = _thread_dynamodb()
+    task_id = task['task_id']
+    task_type = task.get('external_task_type', 'research')
+    
+    try:
+        if payload is None:
+            outcome = 'error'
+        elif HANDLERS[task_type](dynamodb, task, payload):
+            return 'done'
+        else:
+            outcome = 'pending'
+    except Exception as e:
+        print(f"Completing task {task_id} failed: {str(e)}")
+        outcome = 'error'
+    
+    # Back off: 15s, 30s, 60s ... capped at MAX_POLL_INTERVAL
+    attempts = int(task.get('poll_attempts', 0)) + 1
+    delay = min(15 * 2 ** (attempts - 1), MAX_POLL_INTERVAL)
+    dynamodb.reschedule_task_poll(task_id, int(datetime.now().timestamp()) + delay, attempts)
+    return outcome
+
+
+async def poll_due_tasks(context, counts):
+    """Take batches of due tasks until none remain or time runs short"""
+    dynamodb = DynamoDBClient()
+    
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        async with AsyncYutoriClient(concurrency=CONCURRENCY) as yutori:
+            while context is None or context.get_remaining_time_in_millis() > SAFETY_MARGIN_MS:
+                tasks = dynamodb.list_due_tasks(limit=BATCH_SIZE)
+                if not tasks:
+                    break
+                
+                outcomes = await asyncio.gather(*(poll_task(yutori, task, executor) for task in tasks))
+                for outcome in outcomes:
+                    counts[outcome] += 1
+
+
+def lambda_handler(event, context):
+    """
+    Poll due external tasks in bounded concurrent batches
+    
+    Runs on a schedule; keeps taking batches until none are due or the
+    invocation is close to its timeout. Status requests for a whole batch
+    are in flight together on one event loop.
+    """
+    try:
+        counts = {'done': 0, 'pending': 0, 'error': 0}
+        asyncio.run(poll_due_tasks(context, counts))
+        
+        print(f"Poller finished: {counts}")
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps(counts)
+        }
+    
+    except Exception as e:
+        print(f"Error in task_poller: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
@@ -0,0 +1,249 @@
+"""
+asyncio client for the Yutori and TinyFish APIs
+"""
+import asyncio
+import os
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional; only async workers need it
+    aiohttp = None
+
+from .polling import PollingStrategy, server_hint
+from .rate_limit import guarded_call_async
+from .search_fanout import dedupe_key, plan_search
+from .tinyfish import TINYFISH_RUN_URL, build_tinyfish_payload, parse_tinyfish_result, tinyfish_headers
+from .yutori_client import YutoriClientBase, ResearchTaskTimeout
+
+
+DEFAULT_CONCURRENCY = 32
+MAX_RETRIES = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class AsyncYutoriClient(YutoriClientBase):
+    """
+    Non-blocking client with the same surface as YutoriClient
+
+    All calls share one aiohttp session whose connector pools keep-alive
+    connections, and a semaphore caps the requests in flight, so a single
+    worker can drive many research and form fill tasks at once. Requests
+    go through the same per-key rate limits and circuit breakers as the
+    sync client:
+
+        async with AsyncYutoriClient(concurrency=50) as client:
+            results = await asyncio.gather(*(
+                client.get_task_status(task_id, 'research') for task_id in task_ids
+            ))
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, pool_size: Optional[int] = None):
+        """
+        Args:
+            concurrency: Maximum requests in flight (ASYNC_HTTP_CONCURRENCY)
+            pool_size: Maximum open connections (HTTP_POOL_SIZE)
+        """
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for AsyncYutoriClient")
+        super().__init__()
+        self.concurrency = concurrency or int(os.environ.get('ASYNC_HTTP_CONCURRENCY', DEFAULT_CONCURRENCY))
+        self.pool_size = pool_size or int(os.environ.get('HTTP_POOL_SIZE', self.concurrency))
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> 'AsyncYutoriClient':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Create the session; must be called from the event loop that uses it"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method: str, url: str, json: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None, timeout: float = 60,
+                       api: str = 'yutori') -> Tuple[Dict[str, Any], Mapping[str, str]]:
+        """
+        Send one request under the concurrency limit, rate limit and circuit breaker
+
+        Mirrors the sync session's retry policy: failed connections are
+        retried for every method, throttling and 5xx responses only for
+        GETs, waiting for Retry-After when the server sends it.
+
+        Returns:
+            Decoded JSON body and response headers
+        """
+        await self.open()
+        headers = headers or self.headers
+
+        async def send() -> Tuple[Dict[str, Any], Mapping[str, str]]:
+            async with self._semaphore:
+                async with self._session.request(
+                    method, url, json=json, headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    response.raise_for_status()
+                    return await response.json(content_type=None), response.headers
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return await guarded_call_async(api, headers.get('X-API-Key'), send)
+            except aiohttp.ClientResponseError as e:
+                if method != 'GET' or e.status not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+                    raise
+                delay = server_hint(e.headers or {})
+            except aiohttp.ClientConnectorError:
+                if attempt >= MAX_RETRIES:
+                    raise
+                delay = None
+            # Back off outside the semaphore so waiting doesn't hold a slot
+            await asyncio.sleep(delay if delay is not None else 0.5 * 2 ** attempt)
+
+    async def search_jobs(self, query: str, location: Optional[str] = None,
+                          max_results: int = 20,
+                          polling: Optional[PollingStrategy] = None) -> List[Dict[str, Any]]:
+        """
+        Find job postings, fanning broad searches out into concurrent sub-queries
+
+        Results are merged in completion order with duplicates removed.
+        Sub-queries still running once max_results unique jobs are found
+        are cancelled.
+        """
+        deadline = polling.deadline if polling else None
+        plan = plan_search(query, location, max_results)
+
+        async def run_sub_query(sub_query: Dict[str, Any]) -> List[Dict[str, Any]]:
+            sub_polling = PollingStrategy(deadline=deadline) if deadline is not None else None
+            return await self.run_research_query(
+                sub_query['query'], sub_query['location'], sub_query['max_results'], sub_polling
+            )
+
+        pending = [asyncio.ensure_future(run_sub_query(sub_query)) for sub_query in plan]
+        jobs, seen, last_error = [], set(), None
+        try:
+            for next_done in asyncio.as_completed(pending):
+                try:
+                    batch = await next_done
+                except Exception as e:
+                    print(f"Sub-query failed: {str(e)}")
+                    last_error = e
+                    continue
+                for job in batch:
+                    key = dedupe_key(job)
+                    if key not in seen:
+                        seen.add(key)
+                        jobs.append(job)
+                if len(jobs) >= max_results:
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if not jobs and last_error is not None:
+            raise last_error
+        return jobs[:max_results]
+
+    async def run_research_query(self, query: str, location: Optional[str] = None,
+                                 max_results: int = 20,
+                                 polling: Optional[PollingStrategy] = None) -> List[Dict[str, Any]]:
+        """Run a single research task to completion and parse its jobs"""
+        task_id = await self.create_research_task(query, location, max_results)
+        status_data = await self.wait_for_research_task(task_id, polling)
+        return list(self.parse_research_result(status_data, query, location))
+
+    async def create_research_task(self, query: str, location: Optional[str] = None,
+                                   max_results: int = 20,
+                                   callback_url: Optional[str] = None) -> str:
+        """Start a research task for a job search and return its task ID"""
+        data, _ = await self._request(
+            'POST', f"{self.base_url}/v1/research/tasks",
+            json=self._research_task_payload(query, location, max_results, callback_url),
+            timeout=60
+        )
+        return data.get('task_id')
+
+    async def get_research_task(self, task_id: str) -> Dict[str, Any]:
+        """Fetch the status payload of a research task"""
+        data, _ = await self._request(
+            'GET', f"{self.base_url}/v1/research/tasks/{task_id}", timeout=10
+        )
+        return data
+
+    async def wait_for_research_task(self, task_id: str,
+                                     polling: Optional[PollingStrategy] = None) -> Dict[str, Any]:
+        """
+        Poll a research task until it succeeds
+
+        Raises:
+            ResearchTaskTimeout: if the polling deadline passes
+            Exception: if the task fails
+        """
+        polling = polling or PollingStrategy()
+        hint = None
+
+        while await polling.wait_async(hint):
+            status_data, headers = await self._request(
+                'GET', f"{self.base_url}/v1/research/tasks/{task_id}", timeout=10
+            )
+
+            if status_data.get('status') == 'succeeded':
+                return status_data
+            elif status_data.get('status') == 'failed':
+                raise Exception(f"Research task failed: {status_data.get('error', 'Unknown error')}")
+
+            hint = server_hint(headers, status_data)
+
+        raise ResearchTaskTimeout("Research task timeout")
+
+    async def generate_application_kit(self, job_description: str, resume_text: str,
+                                       job_title: str, company: str) -> Dict[str, Any]:
+        """Generate a tailored cover letter and resume bullets"""
+        data, _ = await self._request(
+            'POST', f"{self.research_endpoint}/v1/generate",
+            json=self._application_kit_payload(job_description, resume_text, job_title, company),
+            timeout=90
+        )
+        return self._parse_application_kit(data)
+
+    async def fill_application_form(self, application_url: str,
+                                    form_data: Dict[str, str],
+                                    stop_before_submit: bool = True) -> Dict[str, Any]:
+        """Start a Browsing API form fill"""
+        data, _ = await self._request(
+            'POST', f"{self.browsing_endpoint}/v1/automate",
+            json=self._fill_form_payload(application_url, form_data, stop_before_submit),
+            timeout=300
+        )
+        return self._parse_fill_result(data)
+
+    async def get_task_status(self, task_id: str, task_type: str = 'browsing') -> Dict[str, Any]:
+        """Poll external task status ('browsing' or 'research')"""
+        if task_type == 'research':
+            return await self.get_research_task(task_id)
+
+        data, _ = await self._request(
+            'GET', f"{self.browsing_endpoint}/v1/tasks/{task_id}", timeout=10
+        )
+        return data
+
+    async def run_tinyfish(self, job_url: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill and submit an application with the TinyFish web agent"""
+        data, _ = await self._request(
+            'POST', TINYFISH_RUN_URL,
+            json=build_tinyfish_payload(job_url, application_data),
+            headers=tinyfish_headers(),
+            timeout=320,
+            api='tinyfish'
+        )
+        return parse_tinyfish_result(data)
@@ -0,0 +1,441 @@
+"""
+DynamoDB utilities for CRUD operations
+"""
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from typing import Dict, Any, List, Optional
+import os
+
+
+class DynamoDBClient:
+    """DynamoDB client wrapper"""
+    
+    def __init__(self):
+        self.dynamodb = boto3.resource('dynamodb')
+        self.jobs_table = self.dynamodb.Table(os.environ['JOBS_TABLE_NAME'])
+        self.kits_table = self.dynamodb.Table(os.environ['KITS_TABLE_NAME'])
+        self.tasks_table = self.dynamodb.Table(os.environ['TASKS_TABLE_NAME'])
+        self.search_cache_table = self.dynamodb.Table(os.environ['SEARCH_CACHE_TABLE_NAME'])
+        self.rate_limit_table = self.dynamodb.Table(os.environ['RATE_LIMIT_TABLE_NAME'])
+    
+    @staticmethod
+    def _set_fields(table, key: Dict[str, Any], fields: Dict[str, Any]) -> None:
+        """SET the given attributes (and updated_at) on one item"""
+        from datetime import datetime
+        
+        fields = dict(fields, updated_at=int(datetime.now().timestamp()))
+        names = {f'#f{i}': name for i, name in enumerate(fields)}
+        values = {f':v{i}': value for i, value in enumerate(fields.values())}
+        
+        table.update_item(
+            Key=key,
+            UpdateExpression='SET ' + ', '.join(f'#f{i} = :v{i}' for i in range(len(fields))),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+    
+    # Jobs table operations
+    def create_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new job entry"""
+        self.jobs_table.put_item(Item=job_data)
+        return job_data
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID"""
+        response = self.jobs_table.get_item(Key={'job_id': job_id})
+        return response.get('Item')
+    
+    def get_jobs_batch(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get many jobs by ID with BatchGetItem
+        
+        Returns:
+            Jobs keyed by job_id; IDs that don't exist are absent
+        """
+        jobs = {}
+        unique_ids = list(dict.fromkeys(job_ids))
+        for start in range(0, len(unique_ids), 100):
+            request = {self.jobs_table.name: {
+                'Keys': [{'job_id': job_id} for job_id in unique_ids[start:start + 100]]
+            }}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(self.jobs_table.name, []):
+                    jobs[item['job_id']] = item
+                request = response.get('UnprocessedKeys')
+        return jobs
+    
+    def update_job_status(self, job_id: str, status: str) -> None:
+        """Update job status"""
+        self.jobs_table.update_item(
+            Key={'job_id': job_id},
+            UpdateExpression='SET #status = :status, updated_at = :updated_at',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={
+                ':status': status,
+                ':updated_at': int(datetime.now().timestamp())
+            }
+        )
+    
+    def list_jobs(self, user_id: str = "demo_user", limit: int = 50,
+                  status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List jobs for a user, most recent first, optionally by status"""
+        params = {
+            'IndexName': 'user-created-index',
+            'KeyConditionExpression': Key('user_id').eq(user_id),
+            'ScanIndexForward': False,  # Most recent first
+            'Limit': limit
+        }
+        if status:
+            params['FilterExpression'] = Attr('status').eq(status)
+        
+        items = []
+        while len(items) < limit:
+            response = self.jobs_table.query(**params)
+            items.extend(response.get('Items', []))
+            if not status or 'LastEvaluatedKey' not in response:
+                break
+            # Filtered pages can come back short; keep reading
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return items[:limit]
+    
+    # Kits table operations
+    def create_kit(self, kit_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new application kit"""
+        self.kits_table.put_item(Item=kit_data)
+        return kit_data
+    
+    def create_kit_if_absent(self, kit_data: Dict[str, Any]) -> bool:
+        """
+        Create a kit unless one with the same kit_id exists
+        
+        Returns:
+            False if the kit already existed (nothing was written)
+        """
+        try:
+            self.kits_table.put_item(
+                Item=kit_data,
+                ConditionExpression='attribute_not_exists(kit_id)'
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+    
+    def replace_kit_if_unchanged(self, kit_data: Dict[str, Any], generation_status: str,
+                                 updated_at: int) -> bool:
+        """
+        Replace a kit only if it still has the status and update time that were read
+        
+        Used to restart a failed or abandoned generation without clobbering
+        a concurrent restart or a generation that has since finished.
+        
+        Returns:
+            False if the kit changed since it was read (nothing was written)
+        """
+        try:
+            self.kits_table.put_item(
+                Item=kit_data,
+                ConditionExpression='generation_status = :status AND updated_at = :updated_at',
+                ExpressionAttributeValues={':status': generation_status, ':updated_at': updated_at}
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+    
+    def create_kit_unless_complete(self, kit_data: Dict[str, Any]) -> bool:
+        """
+        Write a finished kit unless a finished kit with the same kit_id exists
+        
+        Placeholders left by failed or in-progress streaming generations
+        are replaced.
+        
+        Returns:
+            False if a complete kit already existed (nothing was written)
+        """
+        try:
+            self.kits_table.put_item(
+                Item=kit_data,
+                ConditionExpression='attribute_not_exists(kit_id) OR generation_status IN (:generating, :failed)',
+                ExpressionAttributeValues={':generating': 'generating', ':failed': 'failed'}
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+    
+    def get_kits_batch(self, kit_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get many kits by ID with BatchGetItem, keyed by kit_id"""
+        kits = {}
+        unique_ids = list(dict.fromkeys(kit_ids))
+        for start in range(0, len(unique_ids), 100):
+            request = {self.kits_table.name: {
+                'Keys': [{'kit_id': kit_id} for kit_id in unique_ids[start:start + 100]]
+            }}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(self.kits_table.name, []):
+                    kits[item['kit_id']] = item
+                request = response.get('UnprocessedKeys')
+        return kits
+    
+    def create_kits(self, kits: List[Dict[str, Any]]) -> None:
+        """Write many kits with batched writes (25 items per request)"""
+        with self.kits_table.batch_writer() as batch:
+            for kit_data in kits:
+                batch.put_item(Item=kit_data)
+    
+    def get_kit(self, kit_id: str, consistent_read: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a kit by ID"""
+        response = self.kits_table.get_item(
+            Key={'kit_id': kit_id},
+            ConsistentRead=consistent_read
+        )
+        return response.get('Item')
+    
+    def update_kit_fields(self, kit_id: str, **fields: Any) -> None:
+        """Set attributes on a kit (e.g. partial output while streaming)"""
+        self._set_fields(self.kits_table, {'kit_id': kit_id}, fields)
+    
+    def set_cover_letter_archive(self, kit_id: str, s3_key: str,
+                                 location: Dict[str, Any]) -> bool:
+        """
+        Record where a kit's compacted cover letter lives in its archive
+        
+        Returns:
+            False if the kit no longer points at s3_key (nothing was written)
+        """
+        try:
+            self.kits_table.update_item(
+                Key={'kit_id': kit_id},
+                UpdateExpression='SET cover_letter_archive = :location',
+                ConditionExpression='cover_letter_s3_key = :s3_key',
+                ExpressionAttributeValues={':location': location, ':s3_key': s3_key}
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+    
+    def get_kits_by_job(self, job_id: str) -> List[Dict[str, Any]]:
+        """Get all kits for a job"""
+        response = self.kits_table.query(
+            IndexName='job-index',
+            KeyConditionExpression=Key('job_id').eq(job_id)
+        )
+        return response.get('Items', [])
+    
+    # Tasks table operations
+    def create_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new form fill task"""
+        self.tasks_table.put_item(Item=task_data)
+        return task_data
+    
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a task by ID"""
+        response = self.tasks_table.get_item(Key={'task_id': task_id})
+        return response.get('Item')
+    
+    def update_task_status(self, task_id: str, status: str, 
+                          filled_fields: Optional[Dict[str, str]] = None,
+                          error_message: Optional[str] = None,
+                          result: Optional[Dict[str, Any]] = None,
+                          screenshot_s3_keys: Optional[List[str]] = None) -> None:
+        """Update task status and fields"""
+        from datetime import datetime
+        
+        update_expr = 'SET #status = :status, updated_at = :updated_at'
+        expr_names = {'#status': 'status'}
+        expr_values = {
+            ':status': status,
+            ':updated_at': int(datetime.now().timestamp())
+        }
+        
+        if status in ['completed', 'failed']:
+            update_expr += ', completed_at = :completed_at'
+            expr_values[':completed_at'] = int(datetime.now().timestamp())
+        
+        if filled_fields:
+            update_expr += ', filled_fields = :filled_fields'
+            expr_values[':filled_fields'] = filled_fields
+        
+        if error_message:
+            update_expr += ', error_message = :error_message'
+            expr_values[':error_message'] = error_message
+            
+        if result:
+            update_expr += ', #result = :result'
+            expr_names['#result'] = 'result'  # Reserved keyword
+            expr_values[':result'] = result
+        
+        if screenshot_s3_keys:
+            update_expr += ', screenshot_s3_keys = :screenshot_s3_keys'
+            expr_values[':screenshot_s3_keys'] = screenshot_s3_keys
+        
+        if status in ['completed', 'failed']:
+            # Drop the task from the outstanding-poll index
+            update_expr += ' REMOVE poll_state, next_poll_at'
+        
+        self.tasks_table.update_item(
+            Key={'task_id': task_id},
+            UpdateExpression=update_expr,
+            ExpressionAttributeNames=expr_names,
+            ExpressionAttributeValues=expr_values
+        )
+    
+    def update_task_fields(self, task_id: str, **fields: Any) -> None:
+        """Set arbitrary attributes on a task (e.g. external task IDs)"""
+        self._set_fields(self.tasks_table, {'task_id': task_id}, fields)
+    
+    def mark_task_outstanding(self, task_id: str, external_task_id: str,
+                              external_task_type: str, poll_after: int = 0) -> bool:
+        """
+        Mark a task waiting_external and register it for the central poller
+        
+        Outstanding tasks carry poll_state/next_poll_at, which populate the
+        sparse poll-index GSI until the task completes. The write is
+        conditional on the task not having finished, because a fast webhook
+        callback can complete it before the worker gets here.
+        
+        Returns:
+            False if the task was already completed or failed
+        """
+        from datetime import datetime
+        
+        now = int(datetime.now().timestamp())
+        try:
+            self.tasks_table.update_item(
+                Key={'task_id': task_id},
+                UpdateExpression=(
+                    'SET #status = :status, updated_at = :now, '
+                    'external_task_id = :external_task_id, external_task_type = :external_task_type, '
+                    'poll_state = :poll_state, poll_attempts = :zero, next_poll_at = :next_poll_at'
+                ),
+                ConditionExpression='NOT #status IN (:completed, :failed)',
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={
+                    ':status': 'waiting_external',
+                    ':now': now,
+                    ':external_task_id': external_task_id,
+                    ':external_task_type': external_task_type,
+                    ':poll_state': 'pending',
+                    ':zero': 0,
+                    ':next_poll_at': now + poll_after,
+                    ':completed': 'completed',
+                    ':failed': 'failed'
+                }
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+    
+    def list_due_tasks(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List outstanding external tasks whose next poll time has passed"""
+        from datetime import datetime
+        
+        response = self.tasks_table.query(
+            IndexName='poll-index',
+            KeyConditionExpression=(
+                Key('poll_state').eq('pending') &
+                Key('next_poll_at').lte(int(datetime.now().timestamp()))
+            ),
+            Limit=limit
+        )
+        return response.get('Items', [])
+    
+    def reschedule_task_poll(self, task_id: str, next_poll_at: int,
+                             poll_attempts: int) -> None:
+        """Push back an outstanding task's next poll"""
+        self.update_task_fields(
+            task_id,
+            next_poll_at=next_poll_at,
+            poll_attempts=poll_attempts
+        )
+    
+    def get_tasks_by_job(self, job_id: str) -> List[Dict[str, Any]]:
+        """Get all tasks for a job"""
+        response = self.tasks_table.query(
+            IndexName='job-status-index',
+            KeyConditionExpression=Key('job_id').eq(job_id)
+        )
+        return response.get('Items', [])
+    
+    # Search cache table operations
+    def get_cached_search(self, cache_key: str,
+                          consistent_read: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a cached search result (or search lease) by key"""
+        response = self.search_cache_table.get_item(
+            Key={'cache_key': cache_key},
+            ConsistentRead=consistent_read
+        )
+        return response.get('Item')
+    
+    def put_cached_search(self, item: Dict[str, Any]) -> None:
+        """Store a cached search result"""
+        self.search_cache_table.put_item(Item=item)
+    
+    def acquire_search_lease(self, lease: Dict[str, Any], now: int) -> bool:
+        """
+        Take the in-flight lease for a search key
+        
+        Succeeds only if no lease exists or the existing one has expired.
+        
+        Returns:
+            True if the lease was written, False if another task holds it
+        """
+        try:
+            self.search_cache_table.put_item(
+                Item=lease,
+                ConditionExpression='attribute_not_exists(cache_key) OR expires_at <= :now',
+                ExpressionAttributeValues={':now': now}
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+    
+    def release_search_lease(self, lease_key: str, task_id: str) -> None:
+        """Delete a search lease, but only if task_id still owns it"""
+        try:
+            self.search_cache_table.delete_item(
+                Key={'cache_key': lease_key},
+                ConditionExpression='task_id = :task_id',
+                ExpressionAttributeValues={':task_id': task_id}
+            )
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+    
+    # Rate limit table operations
+    def get_rate_bucket(self, bucket_id: str) -> Optional[Dict[str, Any]]:
+        """Get a shared token bucket"""
+        response = self.rate_limit_table.get_item(Key={'bucket_id': bucket_id}, ConsistentRead=True)
+        return response.get('Item')
+    
+    def update_rate_bucket(self, bucket_id: str, tokens_milli: int, updated_at_ms: int,
+                           version: Optional[int]) -> bool:
+        """
+        Write a token bucket if nobody else has since we read it
+        
+        Args:
+            version: Version read, or None if the bucket didn't exist
+        
+        Returns:
+            False if the write lost a race and should be retried
+        """
+        if version is None:
+            condition = 'attribute_not_exists(bucket_id)'
+            values = {}
+        else:
+            condition = 'version = :version'
+            values = {':version': version}
+        
+        try:
+            self.rate_limit_table.put_item(
+                Item={
+                    'bucket_id': bucket_id,
+                    'tokens_milli': tokens_milli,
+                    'updated_at_ms': updated_at_ms,
+                    'version': (version or 0) + 1
+                },
+                ConditionExpression=condition,
+                **({'ExpressionAttributeValues': values} if values else {})
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
@@ -0,0 +1,351 @@
+"""
+Client-side rate limiting and circuit breaking for external APIs
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .dynamodb_utils import DynamoDBClient
+
+
+# Per-API defaults; override with <NAME>_RATE_LIMIT_PER_SECOND / _BURST
+DEFAULT_LIMITS = {
+    'yutori': (5.0, 10),
+    'tinyfish': (1.0, 2),
+}
+
+# Each container leases this many seconds' worth of tokens at a time. Small
+# leases keep containers fair and throughput smooth; larger ones save writes.
+LEASE_SECONDS = 0.25
+MAX_LEASE_ATTEMPTS = 5
+# How long other threads wait while one of them leases from DynamoDB
+LEASE_IN_FLIGHT_WAIT = 0.02
+
+METRICS_NAMESPACE = 'JobScoutAI/ExternalApis'
+
+T = TypeVar('T')
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a token could not be acquired before the deadline"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+def emit_metric(name: str, value: float, unit: str = 'Count', **dimensions: str) -> None:
+    """Log a metric in CloudWatch Embedded Metric Format"""
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [sorted(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': unit}]
+            }]
+        },
+        name: value,
+        **dimensions
+    }))
+
+
+class SharedTokenBucket:
+    """
+    Token bucket stored in DynamoDB and shared by every container
+
+    Tokens are kept as integer milli-tokens together with the last refill
+    time. Leases use optimistic concurrency (conditional on the item's
+    version), so concurrent containers never over-grant.
+    """
+
+    def __init__(self, bucket_id: str, rate: float, burst: int,
+                 dynamodb: Optional[DynamoDBClient] = None):
+        self.bucket_id = bucket_id
+        self.rate = rate
+        self.burst = burst
+        self._dynamodb = dynamodb
+
+    @property
+    def dynamodb(self) -> DynamoDBClient:
+        if self._dynamodb is None:
+            self._dynamodb = DynamoDBClient()
+        return self._dynamodb
+
+    def lease(self, wanted: int) -> Tuple[int, float]:
+        """
+        Take up to wanted tokens
+
+        Returns:
+            (granted, wait): tokens granted, and if none were, seconds until
+            one will be available
+        """
+        for _ in range(MAX_LEASE_ATTEMPTS):
+            now_ms = int(time.time() * 1000)
+            item = self.dynamodb.get_rate_bucket(self.bucket_id)
+            if item:
+                version = int(item['version'])
+                elapsed = max(now_ms - int(item['updated_at_ms']), 0) / 1000.0
+                available = min(int(item['tokens_milli']) + int(elapsed * self.rate * 1000),
+                                self.burst * 1000)
+            else:
+                version = None
+                available = self.burst * 1000
+
+            granted = min(wanted, available // 1000)
+            if granted < 1:
+                return 0, (1000 - available) / 1000.0 / self.rate
+
+            if self.dynamodb.update_rate_bucket(self.bucket_id, available - granted * 1000,
+                                                now_ms, version):
+                return granted, 0.0
+
+        # Heavy contention: back off for roughly one token's time
+        return 0, 1.0 / self.rate
+
+
+class RateLimiter:
+    """
+    Per-container front for a shared token bucket
+
+    Tokens are leased from DynamoDB in small batches and spent locally, so
+    most requests don't touch DynamoDB. Without RATE_LIMIT_TABLE_NAME the
+    bucket is kept in memory and only limits this container.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int,
+                 shared: Optional[SharedTokenBucket] = None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.shared = shared
+        self._tokens = 0.0 if shared else float(burst)
+        self._updated = time.monotonic()
+        self._leasing = False
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Try to take one token without blocking
+
+        The lock only guards local state; a DynamoDB lease runs outside it
+        so other threads aren't stuck behind its network round trips. One
+        thread leases at a time; the rest wait briefly and retry.
+
+        Returns:
+            0 if a token was taken, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            if self.shared is None:
+                now = time.monotonic()
+                self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+                self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            if self.shared is None:
+                return (1 - self._tokens) / self.rate
+            if self._leasing:
+                return LEASE_IN_FLIGHT_WAIT
+            self._leasing = True
+
+        granted, wait = 0, LEASE_IN_FLIGHT_WAIT
+        try:
+            wanted = max(1, min(self.burst, math.ceil(self.rate * LEASE_SECONDS)))
+            granted, wait = self.shared.lease(wanted)
+        finally:
+            with self._lock:
+                self._leasing = False
+                if granted:
+                    self._tokens += granted - 1
+        return 0.0 if granted else wait
+
+    def acquire(self, timeout: Optional[float] = 60.0) -> None:
+        """Block until a token is available"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                break
+            if deadline is not None and time.monotonic() + wait > deadline:
+                emit_metric('RateLimitTimeouts', 1, Api=self.name)
+                raise RateLimitTimeout(f"{self.name} rate limit: no token within {timeout}s")
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            emit_metric('RateLimitWait', waited * 1000, 'Milliseconds', Api=self.name)
+
+    async def acquire_async(self, timeout: Optional[float] = 60.0) -> None:
+        """acquire() for asyncio callers; DynamoDB leases run off the event loop"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+        while True:
+            wait = await loop.run_in_executor(None, self.reserve) if self.shared else self.reserve()
+            if wait <= 0:
+                break
+            if deadline is not None and time.monotonic() + wait > deadline:
+                emit_metric('RateLimitTimeouts', 1, Api=self.name)
+                raise RateLimitTimeout(f"{self.name} rate limit: no token within {timeout}s")
+            await asyncio.sleep(wait)
+            waited += wait
+        if waited:
+            emit_metric('RateLimitWait', waited * 1000, 'Milliseconds', Api=self.name)
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """
+    Whether an error means the upstream is unhealthy
+
+    Throttling, 5xx responses, timeouts and connection errors count; other
+    4xx responses are our fault and don't trip the breaker.
+    """
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(error, (OSError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream is failing
+
+    After failure_threshold consecutive upstream failures the circuit opens
+    and calls raise CircuitOpenError without being sent. After
+    recovery_timeout one trial call is let through (half-open); success
+    closes the circuit, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 is_failure: Callable[[Exception], bool] = is_upstream_failure):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.is_failure = is_failure
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        emit_metric('CircuitRejected', 1, Api=self.name)
+        raise CircuitOpenError(f"{self.name} circuit open; failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"Circuit {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Exception) -> None:
+        if not self.is_failure(error):
+            # Not the upstream's fault; release a half-open trial without judging
+            with self._lock:
+                self._trial_in_flight = False
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit {self.name} opened after {self.failures} failures: {str(error)}")
+                    emit_metric('CircuitOpened', 1, Api=self.name)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, api_key: Optional[str] = None) -> RateLimiter:
+    """
+    Container-wide limiter for an API, keyed by API key
+
+    Quotas come from <NAME>_RATE_LIMIT_PER_SECOND and
+    <NAME>_RATE_LIMIT_BURST. Only a hash of the key is stored.
+    """
+    key_hash = hashlib.sha256((api_key or '').encode()).hexdigest()[:12]
+    bucket_id = f"{name}:{key_hash}"
+    with _registry_lock:
+        if bucket_id not in _limiters:
+            default_rate, default_burst = DEFAULT_LIMITS.get(name, (5.0, 10))
+            prefix = name.upper()
+            rate = float(os.environ.get(f'{prefix}_RATE_LIMIT_PER_SECOND', default_rate))
+            burst = int(os.environ.get(f'{prefix}_RATE_LIMIT_BURST', default_burst))
+            shared = SharedTokenBucket(bucket_id, rate, burst) if os.environ.get('RATE_LIMIT_TABLE_NAME') else None
+            _limiters[bucket_id] = RateLimiter(name, rate, burst, shared)
+        return _limiters[bucket_id]
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Container-wide circuit breaker for an API"""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5)),
+                recovery_timeout=float(os.environ.get('CIRCUIT_RECOVERY_SECONDS', 30))
+            )
+        return _breakers[name]
+
+
+def guarded_call(name: str, api_key: Optional[str], send: Callable[[], T]) -> T:
+    """
+    Send a request under the API's rate limit and circuit breaker
+
+    Args:
+        name: API name ('yutori' or 'tinyfish')
+        api_key: Key the quota belongs to
+        send: Performs the request and raises on HTTP errors
+    """
+    breaker = get_circuit_breaker(name)
+    breaker.before_call()
+    try:
+        get_rate_limiter(name, api_key).acquire()
+        result = send()
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return result
+
+
+async def guarded_call_async(name: str, api_key: Optional[str],
+                             send: Callable[[], Awaitable[T]]) -> T:
+    """guarded_call() for coroutines"""
+    breaker = get_circuit_breaker(name)
+    breaker.before_call()
+    try:
+        await get_rate_limiter(name, api_key).acquire_async()
+        result = await send()
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return result
@@ -0,0 +1,253 @@
+"""
+Resume-to-job relevance scoring with a hashed BM25 index
+"""
+import json
+import math
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from .text_vectors import np, tokenize
+
+
+INDEX_NAME = 'job-vectors.bin'
+INDEX_MAGIC = b'JVX1'
+
+# Terms are hashed into this many features, so the index needs no vocabulary
+N_FEATURES = 1 << 20
+# Each job keeps only its most frequent terms; plenty for ranking by fit
+MAX_TERMS_PER_JOB = 64
+MAX_TERM_COUNT = 0xFF
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def feature_of(term: str) -> int:
+    return zlib.crc32(term.encode('utf-8')) % N_FEATURES
+
+
+def hashed_counts(text: str) -> Tuple[Counter, int]:
+    """Feature counts of a text and its length in tokens"""
+    tokens = tokenize(text)
+    return Counter(feature_of(token) for token in tokens), len(tokens)
+
+
+def job_document(job: Dict[str, Any]) -> str:
+    """Text a job is scored on; the title is repeated to weigh it like a heading"""
+    title = job.get('title') or ''
+    return f"{title}\n{title}\n{job.get('company') or ''}\n{job.get('description') or ''}"
+
+
+class JobRelevanceIndex:
+    """
+    Hashed term-frequency vectors of a user's jobs, scored with BM25
+
+    Vectors are kept in flat arrays (CSR layout: offsets, features,
+    counts), so the index serializes to a compact binary blob and scoring
+    every job against a resume is a handful of NumPy array operations.
+    Without NumPy the same math runs in pure Python, more slowly.
+    """
+
+    def __init__(self):
+        self.job_ids: List[str] = []
+        self.offsets = array('I', [0])
+        self.features = array('I')
+        self.counts = array('B')
+        self.lengths = array('I')
+        self._positions: Dict[str, int] = {}
+        self._document_frequency = None
+        self._doc_of = None
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._positions
+
+    def add(self, job: Dict[str, Any]) -> bool:
+        """Vectorize and append a job; returns False if it is already indexed"""
+        job_id = job['job_id']
+        if job_id in self._positions:
+            return False
+
+        counts, length = hashed_counts(job_document(job))
+        top = sorted(counts.items(), key=lambda item: -item[1])[:MAX_TERMS_PER_JOB]
+        top.sort()
+
+        self._positions[job_id] = len(self.job_ids)
+        self.job_ids.append(job_id)
+        self.features.extend(feature for feature, _ in top)
+        self.counts.extend(min(count, MAX_TERM_COUNT) for _, count in top)
+        self.offsets.append(len(self.features))
+        self.lengths.append(length)
+        self._document_frequency = None
+        self._doc_of = None
+        return True
+
+    def add_many(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Add jobs not yet indexed; returns how many were added"""
+        return sum(1 for job in jobs if self.add(job))
+
+    def scores(self, resume_text: str) -> List[float]:
+        """BM25 score of every job (in job_ids order) for the resume's terms"""
+        if not self.job_ids:
+            return []
+        query = self._query(resume_text)
+        if np is not None:
+            return self._scores_numpy(query).tolist()
+        return self._scores_python(query)
+
+    def rank(self, resume_text: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(job_id, score) pairs, best fit first"""
+        if not self.job_ids:
+            return []
+        query = self._query(resume_text)
+        if np is None:
+            ranked = sorted(zip(self.job_ids, self._scores_python(query)), key=lambda pair: -pair[1])
+            return ranked[:limit] if limit else ranked
+
+        scores = self._scores_numpy(query)
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return [(self.job_ids[i], float(scores[i])) for i in order]
+
+    @staticmethod
+    def _query(resume_text: str) -> Dict[int, float]:
+        resume_counts, _ = hashed_counts(resume_text)
+        # Sublinear weights: a term repeated in the resume counts more, but not linearly
+        return {feature: 1.0 + math.log(count) for feature, count in resume_counts.items()}
+
+    def _idf(self, document_frequency: int) -> float:
+        n = len(self.job_ids)
+        return math.log(1.0 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _scores_numpy(self, query: Dict[int, float]):
+        features = np.frombuffer(self.features, dtype=np.uint32)
+        counts = np.frombuffer(self.counts, dtype=np.uint8).astype(np.float32)
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32).astype(np.float32)
+        if self._document_frequency is None:
+            self._document_frequency = np.bincount(features, minlength=N_FEATURES)
+            offsets = np.frombuffer(self.offsets, dtype=np.uint32)
+            self._doc_of = np.repeat(np.arange(len(self.job_ids)), np.diff(offsets))
+
+        query_features = np.fromiter(query, dtype=np.int64, count=len(query))
+        document_frequency = self._document_frequency[query_features]
+        n = len(self.job_ids)
+        weights = np.zeros(N_FEATURES, dtype=np.float32)
+        weights[query_features] = np.fromiter(query.values(), dtype=np.float32, count=len(query)) * \
+            np.log1p((n - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        matched = np.nonzero(weights[features])[0]
+        docs = self._doc_of[matched]
+        norms = K1 * (1.0 - B + B * lengths / max(float(lengths.mean()), 1.0))
+        term_counts = counts[matched]
+        contributions = weights[features[matched]] * term_counts * (K1 + 1.0) / (term_counts + norms[docs])
+        return np.bincount(docs, weights=contributions, minlength=n)
+
+    def _scores_python(self, query: Dict[int, float]) -> List[float]:
+        if self._document_frequency is None:
+            self._document_frequency = Counter(self.features)
+        weights = {
+            feature: weight * self._idf(self._document_frequency.get(feature, 0))
+            for feature, weight in query.items()
+        }
+        average_length = max(sum(self.lengths) / len(self.lengths), 1.0)
+
+        scores = []
+        for doc, length in enumerate(self.lengths):
+            norm = K1 * (1.0 - B + B * length / average_length)
+            score = 0.0
+            for i in range(self.offsets[doc], self.offsets[doc + 1]):
+                weight = weights.get(self.features[i])
+                if weight:
+                    count = self.counts[i]
+                    score += weight * count * (K1 + 1.0) / (count + norm)
+            scores.append(score)
+        return scores
+
+    def to_bytes(self) -> bytes:
+        """Magic, header length, JSON header (job IDs), then the raw arrays"""
+        header = json.dumps({'job_ids': self.job_ids, 'n_features': N_FEATURES}).encode('utf-8')
+        parts = [INDEX_MAGIC, struct.pack('<I', len(header)), header]
+        for values in (self.offsets, self.lengths, self.features, self.counts):
+            if sys.byteorder != 'little':
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'JobRelevanceIndex':
+        index = cls()
+        if data[:4] != INDEX_MAGIC:
+            raise ValueError('Not a job relevance index')
+        header_length = struct.unpack('<I', data[4:8])[0]
+        header = json.loads(data[8:8 + header_length].decode('utf-8'))
+        if header.get('n_features') != N_FEATURES:
+            raise ValueError('Job relevance index was built with a different feature size')
+
+        n = len(header['job_ids'])
+        position = 8 + header_length
+        arrays = []
+        for typecode, count in (('I', n + 1), ('I', n), ('I', None), ('B', None)):
+            if count is None:
+                # Features and counts share the remaining length
+                count = arrays[0][-1]
+            values = array(typecode)
+            size = values.itemsize * count
+            values.frombytes(data[position:position + size])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            arrays.append(values)
+            position += size
+
+        index.offsets, index.lengths, index.features, index.counts = arrays
+        index.job_ids = header['job_ids']
+        index._positions = {job_id: i for i, job_id in enumerate(index.job_ids)}
+        return index
+
+
+def _parse_index(data: Optional[bytes], user_id: str) -> JobRelevanceIndex:
+    if data is not None:
+        try:
+            return JobRelevanceIndex.from_bytes(data)
+        except ValueError as e:
+            print(f"Discarding job relevance index for {user_id}: {str(e)}")
+    return JobRelevanceIndex()
+
+
+def load_relevance_index(storage, user_id: str = 'demo_user') -> JobRelevanceIndex:
+    """A user's index, or an empty one if none has been saved"""
+    return _parse_index(storage.get_user_index(user_id, INDEX_NAME), user_id)
+
+
+def update_relevance_index(storage, jobs: Iterable[Dict[str, Any]],
+                           user_id: str = 'demo_user') -> Tuple[JobRelevanceIndex, int]:
+    """
+    Add jobs not yet indexed to the user's index
+
+    The index is rewritten with a conditional put and the jobs re-added
+    on a conflict, so concurrent writers don't drop each other's jobs.
+
+    Returns:
+        The updated index and how many jobs were added
+    """
+    jobs = list(jobs)
+    updated: Dict[str, Any] = {}
+
+    def add(data: Optional[bytes]) -> Optional[bytes]:
+        index = _parse_index(data, user_id)
+        updated['index'], updated['added'] = index, index.add_many(jobs)
+        return index.to_bytes() if updated['added'] else None
+
+    storage.update_user_index(user_id, INDEX_NAME, add)
+    return updated['index'], updated['added']
+
+
+def index_jobs_for_relevance(storage, jobs: List[Dict[str, Any]], user_id: str = 'demo_user') -> int:
+    """Add newly saved jobs to the user's index; returns how many were added"""
+    return update_relevance_index(storage, jobs, user_id)[1]
@@ -4,7 +4,9 @@ Lambda function to upload resume
 import json
 import base64
 
-from shared.s3_utils import S3Client
+from shared.bullet_bank import load_bullet_bank
+from shared.kit_generation import resume_content_hash
+from shared.s3_utils import create_storage_client
 
 
 def lambda_handler(event, context):
@@ -40,7 +42,7 @@ def lambda_handler(event, context):
         file_content = base64.b64decode(file_content_b64)
         
         # Initialize S3 client
-        s3_client = S3Client()
+        s3_client = create_storage_client()
         
         # Upload resume
         s3_key = s3_client.upload_resume(
@@ -48,6 +50,13 @@ def lambda_handler(event, context):
             content_type=content_type
         )
         
+        # Build the bullet bank now so the first kit doesn't pay for it
+        try:
+            bank = load_bullet_bank(s3_client, resume_content_hash(file_content), file_content)
+            print(f"Bullet bank for {s3_key}: {len(bank)} bullets")
+        except Exception as e:
+            print(f"Bullet bank build failed for {s3_key}: {str(e)}")
+        
         # Generate presigned URL
         url = s3_client.get_presigned_url(s3_key)
         
@@ -6,5 +6,26 @@ __all__ = [
     'models',
     'dynamodb_utils',
     's3_utils',
-    'yutori_client'
+    'object_cache',
+    'local_storage',
+    'compaction',
+    'screenshot_utils',
+    'http_session',
+    'polling',
+    'yutori_client',
+    'search_results',
+    'search_cache',
+    'search_fanout',
+    'job_extractor',
+    'tinyfish',
+    'async_client',
+    'rate_limit',
+    'resume_text',
+    'kit_generation',
+    'kit_templates',
+    'text_vectors',
+    'bullet_bank',
+    'relevance',
+    'keyword_index',
+    'webhooks'
 ]
@@ -0,0 +1,77 @@
+"""
+Tokenization and sparse TF-IDF helpers for local text matching
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; pure Python math is used without it
+    np = None
+
+
+# Keeps tech terms like c++, c#, node.js and ci/cd pieces intact
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each etc few
+for from further had has have having he her here hers him his how i if in into is it its
+itself just me more most my no nor not of off on once only or other our ours out over own per
+same she should so some such than that the their theirs them then there these they this those
+through to too under until up us very was we were what when where which while who whom why
+will with within without would you your yours
+""".split())
+
+SparseVector = Dict[int, float]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords and single characters removed"""
+    return [
+        token for token in TOKEN_PATTERN.findall((text or '').lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def term_counts(text: str) -> Counter:
+    return Counter(tokenize(text))
+
+
+def smooth_idf(document_frequency: int, document_count: int) -> float:
+    """Smoothed inverse document frequency; never zero, so shared terms still count"""
+    return math.log((1 + document_count) / (1 + document_frequency)) + 1.0
+
+
+def tfidf_vector(counts: Counter, vocabulary: Dict[str, int], idf: List[float]) -> SparseVector:
+    """
+    L2-normalized TF-IDF vector of the terms in vocabulary
+
+    Term frequency is sublinear (1 + log tf) so repeated words don't dominate.
+    """
+    vector = {
+        vocabulary[term]: (1.0 + math.log(count)) * idf[vocabulary[term]]
+        for term, count in counts.items() if term in vocabulary
+    }
+    return normalize(vector)
+
+
+def normalize(vector: SparseVector) -> SparseVector:
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if not norm:
+        return {}
+    return {index: value / norm for index, value in vector.items()}
+
+
+def dot(a: SparseVector, b: SparseVector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+
+def top_indices(scores: Iterable[float], top_n: int) -> List[Tuple[int, float]]:
+    """(index, score) pairs of the highest scores; ties keep the original order"""
+    ranked = sorted(enumerate(scores), key=lambda pair: (-pair[1], pair[0]))
+    return ranked[:top_n]
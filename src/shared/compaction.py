@@ -0,0 +1,193 @@
+"""
+Artifact compaction: pack small, old objects into indexed archive blobs
+
+Archived objects keep their original keys. A sharded catalog under
+archives/catalog/ maps each key to (archive, offset, length), so a read is
+a catalog lookup (cached in /tmp) plus one ranged GET into the archive.
+Records that point at an object (kits, for cover letters) can also store
+its location, so reading it back is just the ranged GET.
+"""
+import hashlib
+import json
+import mimetypes
+import tempfile
+import time
+import uuid
+from typing import Dict, Any, Callable, List, Optional
+
+from .s3_utils import S3Client
+
+
+ARCHIVE_PREFIX = 'archives/'
+CATALOG_PREFIX = 'archives/catalog/'
+# Only prefixes whose readers can reach into an archive: artifacts through
+# get_object_cached, cover letters through the location recorded on their
+# kit. Screenshots are served by presigned URL, which can't, and other
+# prefixes are read without the archive fallback.
+COMPACTABLE_PREFIXES = ('artifacts/', 'cover-letters/')
+
+DEFAULT_MAX_ARCHIVE_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_OBJECT_BYTES = 4 * 1024 * 1024  # Larger objects aren't worth packing
+CATALOG_SHARD_CHARS = 3  # 4096 shards
+
+
+class ArchiveStore:
+    """Catalog of archived objects and ranged reads into archive blobs"""
+
+    def __init__(self, s3_client: S3Client):
+        self.s3_client = s3_client
+
+    @staticmethod
+    def _shard_key(s3_key: str) -> str:
+        shard = hashlib.sha1(s3_key.encode('utf-8')).hexdigest()[:CATALOG_SHARD_CHARS]
+        return f"{CATALOG_PREFIX}{shard}.json"
+
+    def _load_shard(self, shard_key: str) -> Dict[str, Any]:
+        data = self.s3_client._get_optional(shard_key)
+        return json.loads(data.decode('utf-8')) if data else {}
+
+    def locate(self, s3_key: str) -> Optional[Dict[str, Any]]:
+        """Return the archive location of a key, or None if not archived"""
+        return self._load_shard(self._shard_key(s3_key)).get(s3_key)
+
+    def read(self, s3_key: str) -> Optional[bytes]:
+        """Read an archived object with a ranged GET, or None if not archived"""
+        location = self.locate(s3_key)
+        if location is None:
+            return None
+        return self.read_at(location)
+
+    def read_at(self, location: Dict[str, Any]) -> bytes:
+        """Read an archived object from a known location (no catalog lookup)"""
+        start, length = int(location['offset']), int(location['length'])
+        if length == 0:
+            return b''
+        return self.s3_client.get_object_range(location['archive'], start, start + length - 1)
+
+    def record(self, index: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Add archive locations to the catalog, one write per touched shard
+
+        Shard writes are conditional on the shard being unchanged since it
+        was read, so concurrent compactions can't drop each other's
+        entries. Raises if a shard stays contended, before any source
+        object has been deleted.
+        """
+        by_shard: Dict[str, Dict[str, Any]] = {}
+        for s3_key, location in index.items():
+            by_shard.setdefault(self._shard_key(s3_key), {})[s3_key] = location
+
+        for shard_key, entries in by_shard.items():
+            self.s3_client._update_json(
+                shard_key,
+                lambda shard, entries=entries: {**(shard or {}), **entries}
+            )
+
+
+def compact_prefix(s3_client: S3Client, prefix: str, min_age_seconds: int,
+                   max_archive_bytes: int = DEFAULT_MAX_ARCHIVE_BYTES,
+                   max_object_bytes: int = DEFAULT_MAX_OBJECT_BYTES,
+                   should_stop: Optional[Callable[[], bool]] = None,
+                   on_archived: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None
+                   ) -> Dict[str, Any]:
+    """
+    Pack objects under a prefix that are older than min_age_seconds
+
+    Each archive is written, indexed and cataloged before its source
+    objects are deleted, so readers always find an object either live or
+    in an archive.
+
+    Args:
+        s3_client: Storage client
+        prefix: Key prefix to compact; must be under COMPACTABLE_PREFIXES
+        min_age_seconds: Only objects last modified before now - min_age are packed
+        max_archive_bytes: Target maximum size of each archive blob
+        max_object_bytes: Objects larger than this are left alone
+        should_stop: Optional callback checked between objects (e.g. Lambda deadline)
+        on_archived: Optional callback given each archive's {key: location}
+            index after it is cataloged and before the sources are deleted
+
+    Returns:
+        Dict with 'archives', 'objects' and 'bytes' compacted
+    """
+    if not prefix.startswith(COMPACTABLE_PREFIXES):
+        raise ValueError(f"Prefix cannot be compacted: {prefix}")
+
+    store = ArchiveStore(s3_client)
+    cutoff = int(time.time()) - min_age_seconds
+    stats = {'prefix': prefix, 'archives': [], 'objects': 0, 'bytes': 0}
+
+    spool = tempfile.SpooledTemporaryFile(max_size=max_archive_bytes)
+    index: Dict[str, Dict[str, Any]] = {}
+    archive_key = _new_archive_key(prefix)
+
+    def flush() -> None:
+        nonlocal spool, index, archive_key
+        if not index:
+            return
+        spool.seek(0)
+        s3_client._put_object(archive_key, spool, content_type='application/octet-stream',
+                              metadata={'prefix': prefix, 'objects': str(len(index))})
+        s3_client._put_object(
+            archive_key.replace('.pack', '.index.json'),
+            json.dumps(index).encode('utf-8'),
+            content_type='application/json'
+        )
+        store.record(index)
+        if on_archived:
+            on_archived(index)
+        s3_client._delete_objects(list(index))
+
+        stats['archives'].append(archive_key)
+        stats['objects'] += len(index)
+        stats['bytes'] += spool.tell()
+        print(f"Compacted {len(index)} objects into {archive_key}")
+
+        spool.close()
+        spool = tempfile.SpooledTemporaryFile(max_size=max_archive_bytes)
+        index = {}
+        archive_key = _new_archive_key(prefix)
+
+    try:
+        for obj in s3_client._list_prefix(prefix):
+            if should_stop and should_stop():
+                break
+            if obj['last_modified'] >= cutoff or obj['size'] > max_object_bytes:
+                continue
+
+            offset = spool.tell()
+            for chunk in s3_client.iter_object(obj['key']):
+                spool.write(chunk)
+            index[obj['key']] = {
+                'archive': archive_key,
+                'offset': offset,
+                'length': spool.tell() - offset,
+                'content_type': mimetypes.guess_type(obj['key'])[0] or 'application/octet-stream'
+            }
+
+            if spool.tell() >= max_archive_bytes:
+                flush()
+        flush()
+    finally:
+        spool.close()
+
+    return stats
+
+
+def _new_archive_key(prefix: str) -> str:
+    slug = prefix.strip('/').replace('/', '_') or 'root'
+    return f"{ARCHIVE_PREFIX}{slug}/{int(time.time())}_{uuid.uuid4().hex[:8]}.pack"
+
+
+def compact_prefixes(s3_client: S3Client, prefixes: List[str], min_age_seconds: int,
+                     should_stop: Optional[Callable[[], bool]] = None,
+                     on_archived: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None
+                     ) -> List[Dict[str, Any]]:
+    """Compact several prefixes in turn, stopping early if asked"""
+    results = []
+    for prefix in prefixes:
+        if should_stop and should_stop():
+            break
+        results.append(compact_prefix(s3_client, prefix, min_age_seconds,
+                                      should_stop=should_stop, on_archived=on_archived))
+    return results
@@ -0,0 +1,50 @@
+"""
+Shared keep-alive HTTP session for external API calls
+"""
+import os
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_POOL_SIZE = 20
+
+_session: Optional[requests.Session] = None
+
+
+def _build_session() -> requests.Session:
+    """
+    Build a session with pooled connections and retry adapters
+
+    Connection errors are retried for every method (the request never
+    reached the server). Throttling and 5xx responses are only retried for
+    idempotent GETs, honouring Retry-After.
+    """
+    pool_size = int(os.environ.get('HTTP_POOL_SIZE', DEFAULT_POOL_SIZE))
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Return the container-wide session, reused across warm invocations"""
+    global _session
+    if _session is None:
+        _session = _build_session()
+    return _session
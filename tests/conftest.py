@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Lambda code imports shared modules as the top-level "shared" package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
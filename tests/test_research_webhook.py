@@ -0,0 +1,172 @@
+"""
+End-to-end webhook completion against the local Yutori stub server
+"""
+import importlib.util
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def load_module(name, *path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, *path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+yutori_stub = load_module('yutori_stub_server', 'scripts', 'yutori_stub_server.py')
+background_search = load_module('background_search_handler', 'src', 'lambdas', 'background_search', 'handler.py')
+research_webhook = load_module('research_webhook_handler', 'src', 'lambdas', 'research_webhook', 'handler.py')
+
+
+class FakeDynamoDB:
+    """In-memory stand-in for the tasks, jobs and search cache tables"""
+
+    def __init__(self):
+        self.tasks = {}
+        self.jobs = {}
+        self.job_writes = []
+        self.lock = threading.Lock()
+
+    def get_task(self, task_id):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            return dict(task) if task else None
+
+    def update_task_status(self, task_id, status, filled_fields=None, error_message=None,
+                           result=None, screenshot_s3_keys=None):
+        with self.lock:
+            self.tasks[task_id].update(status=status)
+            if result:
+                self.tasks[task_id]['result'] = result
+            if error_message:
+                self.tasks[task_id]['error_message'] = error_message
+
+    def update_task_fields(self, task_id, **fields):
+        with self.lock:
+            self.tasks[task_id].update(fields)
+
+    def mark_task_outstanding(self, task_id, external_task_id, external_task_type, poll_after=0):
+        with self.lock:
+            task = self.tasks[task_id]
+            if task['status'] in ('completed', 'failed'):
+                return False
+            task.update(status='waiting_external', external_task_id=external_task_id,
+                        external_task_type=external_task_type)
+            return True
+
+    def create_job(self, job_data):
+        with self.lock:
+            self.job_writes.append(job_data['job_id'])
+            self.jobs[job_data['job_id']] = job_data
+        return job_data
+
+    def get_cached_search(self, cache_key, consistent_read=False):
+        return None
+
+    def put_cached_search(self, item):
+        pass
+
+    def release_search_lease(self, lease_key, task_id):
+        pass
+
+
+class WebhookReceiver(BaseHTTPRequestHandler):
+    """Hands callbacks to the research_webhook Lambda as API Gateway events"""
+
+    responses = []
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        result = research_webhook.lambda_handler({
+            'pathParameters': {'task_id': url.path.rsplit('/', 1)[-1]},
+            'queryStringParameters': {k: v[0] for k, v in parse_qs(url.query).items()},
+            'body': body
+        }, None)
+        self.responses.append(result)
+
+        self.send_response(result['statusCode'])
+        self.send_header('Content-Length', str(len(result['body'])))
+        self.end_headers()
+        self.wfile.write(result['body'].encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def dynamodb(monkeypatch, tmp_path):
+    fake = FakeDynamoDB()
+    monkeypatch.setattr(background_search, 'DynamoDBClient', lambda: fake)
+    monkeypatch.setattr(research_webhook, 'DynamoDBClient', lambda: fake)
+    monkeypatch.setenv('WEBHOOK_SECRET', 'test-secret')
+    monkeypatch.setenv('YUTORI_API_KEY', 'test-key')
+    monkeypatch.setenv('STORAGE_BACKEND', 'filesystem')
+    monkeypatch.setenv('LOCAL_STORAGE_ROOT', str(tmp_path))
+    monkeypatch.setenv('LOCAL_STORAGE_SECRET', 'test-secret')
+    for name in ('RATE_LIMIT_TABLE_NAME', 'RESEARCH_COMPLETION_MODE', 'SEARCH_BACKEND'):
+        monkeypatch.delenv(name, raising=False)
+    return fake
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    WebhookReceiver.responses = []
+    stub = serve(yutori_stub.make_handler(delay=0.2, deliveries=2))
+    receiver = serve(WebhookReceiver)
+    monkeypatch.setenv('YUTORI_BASE_URL', f"http://127.0.0.1:{stub.server_port}")
+    monkeypatch.setenv('RESEARCH_CALLBACK_URL', f"http://127.0.0.1:{receiver.server_port}/webhooks/research")
+    yield
+    stub.shutdown()
+    receiver.shutdown()
+
+
+def test_duplicate_callback_persists_jobs_once(dynamodb, servers):
+    task_id = 'search_webhook_test'
+    dynamodb.tasks[task_id] = {'task_id': task_id, 'status': 'pending', 'query': 'software engineer',
+                               'location': 'Remote', 'max_results': 10}
+
+    response = background_search.lambda_handler(
+        {'task_id': task_id, 'query': 'software engineer', 'location': 'Remote', 'max_results': 10}, None
+    )
+    assert response['statusCode'] == 202
+
+    deadline = time.monotonic() + 10
+    while len(WebhookReceiver.responses) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert [r['statusCode'] for r in WebhookReceiver.responses] == [200, 200]
+
+    task = dynamodb.get_task(task_id)
+    assert task['status'] == 'completed'
+    assert task['result']['count'] == 2
+    # The second delivery finds the task finished and writes nothing
+    assert sorted(dynamodb.job_writes) == sorted(dynamodb.jobs)
+    assert json.loads(WebhookReceiver.responses[1]['body']) == {'task_id': task_id, 'status': 'completed'}
+
+
+def test_callback_with_bad_token_is_rejected(dynamodb):
+    dynamodb.tasks['search_1'] = {'task_id': 'search_1', 'status': 'waiting_external'}
+    response = research_webhook.lambda_handler({
+        'pathParameters': {'task_id': 'search_1'},
+        'queryStringParameters': {'token': 'not-the-token'},
+        'body': json.dumps({'status': 'succeeded', 'result': yutori_stub.SAMPLE_RESULT})
+    }, None)
+
+    assert response['statusCode'] == 403
+    assert dynamodb.get_task('search_1')['status'] == 'waiting_external'
+    assert not dynamodb.job_writes
@@ -0,0 +1,28 @@
+"""
+Tests for search cache key normalization
+"""
+import pytest
+
+from shared.search_cache import normalize_location, search_cache_key
+
+
+@pytest.mark.parametrize('location, expected', [
+    ('Columbus', 'columbus'),
+    ('Columbus, OH', 'columbus, oh'),
+    ('Campus', 'campus'),
+    ('Texas', 'texas'),
+    ('Seattle, WA, USA', 'seattle, wa'),
+    ('Seattle WA US', 'seattle wa'),
+    ('Austin, United States', 'austin, tx'),
+    ('SF', 'san francisco, ca'),
+    ('USA', 'usa'),
+    ('', ''),
+])
+def test_normalize_location(location, expected):
+    assert normalize_location(location) == expected
+
+
+def test_country_suffix_does_not_merge_distinct_places():
+    assert search_cache_key('engineer', 'Columbus', 20) != search_cache_key('engineer', 'Columb', 20)
+    assert search_cache_key('engineer', 'Campus', 20) != search_cache_key('engineer', 'Camp', 20)
+    assert search_cache_key('engineer', 'Boston, MA, USA', 20) == search_cache_key('engineer', 'boston, ma', 20)